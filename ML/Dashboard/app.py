@@ -1,23 +1,64 @@
 import dash
 import dash_bootstrap_components as dbc
+from flask import jsonify
 from data_processing import load_data
+from data_handle import DataHandle
+from figure_cache import FigureCache, data_version
+from shared_data import load_shared, shared_version
 from layout import serve_layout
+import diskcache
+import os
 import sys
+import tempfile
 
-# Load data
-df = load_data("Csv/Merge_Proccessed.csv")
-if df is None:
+# Load data (set SPENDWISE_DATA to serve a columnar .arrow file instead of the CSV).
+# With SPENDWISE_SHARED_DATA set (e.g. /dev/shm/spendwise.arrow) the preprocessed frame is
+# materialized there once and every gunicorn worker memory-maps the same copy.
+data_file = os.getenv("SPENDWISE_DATA", "Csv/Merge_Proccessed.csv")
+shared_file = os.getenv("SPENDWISE_SHARED_DATA")
+
+def load_version(path):
+    """(df, version) of the statement at path, or None if it cannot be loaded."""
+    if shared_file:
+        df = load_shared(path, shared_file)
+        return (df, shared_version(shared_file)) if df is not None else None
+    df = load_data(path)
+    return (df, data_version(df)) if df is not None else None
+
+# Heavy callbacks run as background jobs on a local disk cache (SPENDWISE_BACKGROUND_DIR)
+background_cache = diskcache.Cache(
+    os.getenv("SPENDWISE_BACKGROUND_DIR", os.path.join(tempfile.gettempdir(), 'spendwise-background'))
+)
+background_manager = dash.DiskcacheManager(background_cache)
+
+# Versioned handle on the data; a changed file is reloaded in the background and
+# swapped in without a restart (SPENDWISE_RELOAD_INTERVAL seconds, 0 disables).
+# Aggregates computed in background jobs come back through their disk cache.
+data = DataHandle.from_file(data_file, load_version,
+                            slice_cache_size=int(os.getenv("SPENDWISE_SLICE_CACHE_SIZE", "32")),
+                            shared=background_cache)
+if data is None:
     print("Failed to load data. Exiting.")
     sys.exit(1)
+data.on_swap(lambda old, new: print(f"Reloaded {data_file}: version {old.version} -> {new.version}"))
+data.watch(float(os.getenv("SPENDWISE_RELOAD_INTERVAL", "5")))
 
 # Initialize the Dash app with Bootstrap
 external_stylesheets = [dbc.themes.BOOTSTRAP]
 app = dash.Dash(__name__, external_stylesheets=external_stylesheets)
-app.layout = serve_layout(df)
+# A function, so each page load is built from the latest data
+app.layout = lambda: serve_layout(data.current().df)
+
+# Figure cache shared by every worker on this host (SPENDWISE_FIGURE_CACHE_DIR / _MB)
+figures = FigureCache.from_env(lambda: data.current().version)
+
+@app.server.route('/figure-cache/stats')
+def figure_cache_stats():
+    return jsonify(figures.stats())
 
-# Import and register callbacks after app and df are defined
+# Import and register callbacks after app and data are defined
 from callbacks import register_callbacks
-register_callbacks(app, df)
+register_callbacks(app, data, figures=figures, background_manager=background_manager)
 
 if __name__ == '__main__':
-    app.run_server(debug=True, port=8060)
+    app.run(debug=True, port=8060)
@@ -1,17 +1,69 @@
-def register_callbacks(app, df):
-    from dash import Input, Output, State
+def register_callbacks(app, data, figures=None, background_manager=None):
+    import functools
+    import os
+    from dash import Input, Output, State, MATCH, no_update
+    import pandas as pd
     import plotly.express as px
-    from helpers import generate_summary, create_bar_chart, summary_box
+    from downsample import downsample_series
+    from helpers import chart_id, create_bar_chart, create_trend_chart, summary_box
+    from category_tab import register_category_callbacks
+    from data_handle import DataHandle
+    from figure_cache import FigureCache, data_version
+
+    # A loaded DataFrame is served as a handle that never reloads. Each callback
+    # below is pinned to one snapshot, and uses its filtered slices and
+    # summaries (read-only).
+    if not isinstance(data, DataHandle):
+        data = DataHandle.static(
+            data,
+            version=data_version(data),
+            slice_cache_size=int(os.getenv("SPENDWISE_SLICE_CACHE_SIZE", "32")),
+        )
+    # Built figures, shared with every worker process serving the same data
+    if figures is None:
+        figures = FigureCache.from_env(lambda: data.current().version)
+
+    def heavy_callback(outputs, inputs, progress_id, cancel):
+        """
+        app.callback for the slow callbacks. With a background manager they run
+        as background jobs that report (step, steps) to the progress_id bar and
+        are cancelled when any of the cancel inputs change again; the function
+        gets set_progress as a keyword argument (None when run in the request).
+        """
+        def register(fn):
+            if background_manager is None:
+                return app.callback(outputs, inputs)(fn)
+
+            @functools.wraps(fn)
+            def job(set_progress, *args):
+                return fn(*args, set_progress=set_progress)
+
+            return app.callback(
+                outputs, inputs,
+                background=True,
+                manager=background_manager,
+                progress=[Output(progress_id, 'value'), Output(progress_id, 'max')],
+                running=[(Output(progress_id, 'style'), {'width': '100%'}, {'display': 'none'})],
+                cancel=cancel
+            )(job)
+
+        return register
+
+    def trend_points(width):
+        # About one point per pixel of the widest view of the chart (its modal)
+        return min(max(int(width or 1200), 200), 4000)
 
     # --- Callback for Summary Boxes (common to both tabs) ---
     @app.callback(
         Output('summary-boxes', 'children'),
         [Input('date-picker-range', 'start_date'),
-         Input('date-picker-range', 'end_date')]
+         Input('date-picker-range', 'end_date'),
+         Input('data-version', 'data')]
     )
-    def update_summary_boxes(start_date, end_date):
+    @data.pin
+    def update_summary_boxes(start_date, end_date, version=None):
         try:
-            df_filtered = df[(df['Transaction_Date'] >= start_date) & (df['Transaction_Date'] <= end_date)]
+            df_filtered = data.slices.date_range(start_date, end_date)
             income = df_filtered['Credit'].sum()
             expenditure = df_filtered['Debit'].sum()
             balance = income - expenditure
@@ -28,38 +80,47 @@ def register_callbacks(app, df):
             return []
 
     # --- Callbacks for General Analysis Tab ---
-    @app.callback(
-        [Output('freq-bar', 'figure'),
-         Output('top-transactions', 'figure'),
-         Output('amount-pie', 'figure'),
-         Output('date-trend', 'figure'),
-         Output('store-freq-bar', 'data'),
-         Output('store-top-transactions', 'data'),
-         Output('store-amount-pie', 'data'),
-         Output('store-date-trend', 'data')],
+    @heavy_callback(
+        [Output(chart_id('freq-bar'), 'figure'),
+         Output(chart_id('top-transactions'), 'figure'),
+         Output(chart_id('amount-pie'), 'figure'),
+         Output(chart_id('date-trend'), 'figure')],
         [Input('date-picker-range', 'start_date'),
-         Input('date-picker-range', 'end_date')]
+         Input('date-picker-range', 'end_date'),
+         Input('viewport-width', 'data'),
+         Input('data-version', 'data')],
+        progress_id='general-progress',
+        cancel=[Input('date-picker-range', 'start_date'),
+                Input('date-picker-range', 'end_date')]
     )
-    def update_general_analysis(start_date, end_date):
+    @data.pin
+    @figures.memoize
+    def update_general_analysis(start_date, end_date, width=None, version=None, set_progress=None):
+        def progress(step):
+            if set_progress is not None:
+                set_progress((str(step), '5'))
+
         try:
-            df_filtered = df[(df['Transaction_Date'] >= start_date) & (df['Transaction_Date'] <= end_date)].copy()
+            df_filtered = data.slices.date_range(start_date, end_date)
         except Exception as e:
             print(f"Error filtering data in general analysis: {e}")
-            return {}, {}, {}, {}, None, None, None, None
+            return {}, {}, {}, {}
+        progress(1)
         
-        # Create Transaction_Key: use Recipient_Name if available; otherwise, Transaction_ID
+        # Transaction key: use Recipient_Name if available; otherwise, Transaction_ID
+        # (kept as a Series, since the cached slice is shared and must not be modified)
         try:
             if 'Recipient_Name' in df_filtered.columns:
-                df_filtered['Transaction_Key'] = df_filtered['Recipient_Name']
+                transaction_keys = df_filtered['Recipient_Name']
             else:
-                df_filtered['Transaction_Key'] = df_filtered['Transaction_ID']
+                transaction_keys = df_filtered['Transaction_ID']
         except Exception as e:
             print(f"Error creating Transaction_Key: {e}")
-            df_filtered['Transaction_Key'] = df_filtered['Transaction_ID']
+            transaction_keys = df_filtered['Transaction_ID']
         
         # Frequency Distribution
         try:
-            transaction_counts = df_filtered['Transaction_Key'].value_counts()
+            transaction_counts = transaction_keys.value_counts()
             frequency_groups = {
                 '1 Transaction': sum(transaction_counts == 1),
                 '1-5 Transactions': sum((transaction_counts > 1) & (transaction_counts <= 5)),
@@ -78,6 +139,8 @@ def register_callbacks(app, df):
             print(f"Error creating frequency distribution chart: {e}")
             freq_fig = {}
         
+        progress(2)
+
         # Top 10 Frequent Transactions
         try:
             top_transactions = transaction_counts.head(10)
@@ -92,6 +155,8 @@ def register_callbacks(app, df):
             print(f"Error creating top transactions chart: {e}")
             top_fig = {}
         
+        progress(3)
+
         # Transaction Amount Distribution (based on Debit amounts)
         try:
             transaction_ranges = {
@@ -112,33 +177,82 @@ def register_callbacks(app, df):
             print(f"Error creating amount distribution chart: {e}")
             amount_pie = {}
         
-        # Date-wise Transaction Trends
+        progress(4)
+
+        # Date-wise Transaction Trends (downsampled to the chart's width, drawn with WebGL)
         try:
-            date_trend_df = df_filtered.groupby('Transaction_Date')['Debit'].sum().reset_index()
-            trend_fig = px.line(
-                date_trend_df,
-                x="Transaction_Date",
-                y="Debit",
-                title="Transaction Trends Over Time",
-                labels={'Transaction_Date': "Date", 'Debit': "Total Amount"}
-            )
+            daily = data.slices.daily_debit(start_date, end_date)
+            trend_fig = create_trend_chart(downsample_series(daily, trend_points(width)))
         except Exception as e:
             print(f"Error creating date trend chart: {e}")
             trend_fig = {}
         
-        return freq_fig, top_fig, amount_pie, trend_fig, freq_fig, top_fig, amount_pie, trend_fig
+        progress(5)
+        return freq_fig, top_fig, amount_pie, trend_fig
+
+    @app.callback(
+        Output(chart_id('date-trend'), 'figure', allow_duplicate=True),
+        Input(chart_id('date-trend'), 'relayoutData'),
+        [State('date-picker-range', 'start_date'),
+         State('date-picker-range', 'end_date'),
+         State('viewport-width', 'data')],
+        prevent_initial_call=True
+    )
+    @data.pin
+    def zoom_date_trend(relayout, start_date, end_date, width):
+        """Redraw the trend at full resolution for the zoomed window only."""
+        relayout = relayout or {}
+        if relayout.get('xaxis.autorange'):
+            x_range = None
+        elif 'xaxis.range[0]' in relayout and 'xaxis.range[1]' in relayout:
+            x_range = [relayout['xaxis.range[0]'], relayout['xaxis.range[1]']]
+        elif 'xaxis.range' in relayout:
+            x_range = relayout['xaxis.range']
+        else:
+            return no_update
+        try:
+            daily = data.slices.daily_debit(start_date, end_date)
+            if x_range:
+                daily = daily.loc[pd.Timestamp(x_range[0]):pd.Timestamp(x_range[1])]
+            return create_trend_chart(downsample_series(daily, trend_points(width)), x_range)
+        except Exception as e:
+            print(f"Error zooming date trend chart: {e}")
+            return no_update
+
+    # --- Category Specification Tab ---
+    register_category_callbacks(app)
+
+    # --- Data Version (hot reload) ---
+    # Pages poll the loaded version; a new one re-runs every callback that reads the data
+    @app.callback(
+        Output('data-version', 'data'),
+        Input('data-version-poll', 'n_intervals'),
+        State('data-version', 'data')
+    )
+    def update_data_version(n_intervals, version):
+        current = data.current().version
+        return current if current != version else no_update
 
     # --- Callbacks for Breakdown Analysis Tab ---
+    @app.callback(
+        Output('year-dropdown', 'options'),
+        Input('data-version', 'data')
+    )
+    @data.pin
+    def update_year_dropdown(version):
+        return [{'label': str(y), 'value': y} for y in data.slices.years()]
+
     @app.callback(
         Output('month-dropdown', 'options'),
-        Input('year-dropdown', 'value')
+        [Input('year-dropdown', 'value'),
+         Input('data-version', 'data')]
     )
-    def update_month_dropdown(selected_year):
+    @data.pin
+    def update_month_dropdown(selected_year, version=None):
         if not selected_year:
             return []
         try:
-            months = df[df['Year'] == selected_year][['Month_Num', 'Month']].drop_duplicates()
-            return [{'label': row['Month'], 'value': row['Month_Num']} for _, row in months.iterrows()]
+            return data.slices.month_options(selected_year)
         except Exception as e:
             print(f"Error updating month dropdown: {e}")
             return []
@@ -146,269 +260,130 @@ def register_callbacks(app, df):
     @app.callback(
         Output('week-dropdown', 'options'),
         [Input('year-dropdown', 'value'),
-         Input('month-dropdown', 'value')]
+         Input('month-dropdown', 'value'),
+         Input('data-version', 'data')]
     )
-    def update_week_dropdown(selected_year, selected_month):
+    @data.pin
+    def update_week_dropdown(selected_year, selected_month, version=None):
         if not selected_year or not selected_month:
             return []
         try:
-            weeks = df[(df['Year'] == selected_year) & (df['Month_Num'] == selected_month)][['Week_Num']].drop_duplicates()
-            return [{'label': f'Week {w}', 'value': w} for w in sorted(weeks['Week_Num'])]
+            return data.slices.week_options(selected_year, selected_month)
         except Exception as e:
             print(f"Error updating week dropdown: {e}")
             return []
 
     @app.callback(
-        [Output('yearly-summary', 'figure'),
-         Output('store-yearly-summary', 'data')],
-        Input('year-dropdown', 'value')
+        Output(chart_id('yearly-summary'), 'figure'),
+        [Input('year-dropdown', 'value'),
+         Input('data-version', 'data')]
     )
-    def update_yearly_summary(selected_year):
+    @data.pin
+    @figures.memoize
+    def update_yearly_summary(selected_year, version=None):
         if not selected_year:
-            return {}, {}
+            return {}
         try:
-            df_filtered = df[df['Year'] == selected_year]
-            df_summary = generate_summary(df_filtered, 'Month')
+            df_summary = data.slices.summary('Month', selected_year)
             fig = create_bar_chart(df_summary, 'Month', f'Year {selected_year} Summary')
-            return fig, fig
+            return fig
         except Exception as e:
             print(f"Error in yearly summary: {e}")
-            return {}, {}
+            return {}
 
     @app.callback(
-        [Output('monthly-summary', 'figure'),
-         Output('store-monthly-summary', 'data')],
+        Output(chart_id('monthly-summary'), 'figure'),
         [Input('year-dropdown', 'value'),
-         Input('month-dropdown', 'value')]
+         Input('month-dropdown', 'value'),
+         Input('data-version', 'data')]
     )
-    def update_monthly_summary(selected_year, selected_month):
+    @data.pin
+    @figures.memoize
+    def update_monthly_summary(selected_year, selected_month, version=None):
         if not selected_year or not selected_month:
-            return {}, {}
+            return {}
         try:
-            df_filtered = df[(df['Year'] == selected_year) & (df['Month_Num'] == selected_month)]
-            df_summary = generate_summary(df_filtered, 'Week_Num')
+            df_filtered = data.slices.period(selected_year, selected_month)
+            df_summary = data.slices.summary('Week_Num', selected_year, selected_month)
             if df_summary is not None:
-                df_summary['Week_Num'] = df_summary['Week_Num'].apply(lambda x: f'Week {x}')
+                df_summary = df_summary.assign(Week_Num=df_summary['Week_Num'].apply(lambda x: f'Week {x}'))
                 fig = create_bar_chart(df_summary, 'Week_Num', f'{df_filtered["Month"].iloc[0]} Summary')
-                return fig, fig
+                return fig
             else:
-                return {}, {}
+                return {}
         except Exception as e:
             print(f"Error in monthly summary: {e}")
-            return {}, {}
+            return {}
 
     @app.callback(
-        [Output('weekly-summary', 'figure'),
-         Output('store-weekly-summary', 'data')],
+        Output(chart_id('weekly-summary'), 'figure'),
         [Input('year-dropdown', 'value'),
          Input('month-dropdown', 'value'),
-         Input('week-dropdown', 'value')]
+         Input('week-dropdown', 'value'),
+         Input('data-version', 'data')]
     )
-    def update_weekly_summary(selected_year, selected_month, selected_week):
+    @data.pin
+    @figures.memoize
+    def update_weekly_summary(selected_year, selected_month, selected_week, version=None):
         if not selected_year or not selected_month or not selected_week:
-            return {}, {}
+            return {}
         try:
-            df_filtered = df[
-                (df['Year'] == selected_year) &
-                (df['Month_Num'] == selected_month) &
-                (df['Week_Num'] == selected_week)
-            ]
-            df_summary = generate_summary(df_filtered, 'Day')
+            df_summary = data.slices.summary('Day', selected_year, selected_month, selected_week)
             fig = create_bar_chart(df_summary, 'Day', f'Week {selected_week} Summary')
-            return fig, fig
+            return fig
         except Exception as e:
             print(f"Error in weekly summary: {e}")
-            return {}, {}
+            return {}
 
     @app.callback(
-        [Output('daily-summary', 'figure'),
-         Output('store-daily-summary', 'data')],
+        Output(chart_id('daily-summary'), 'figure'),
         [Input('year-dropdown', 'value'),
          Input('month-dropdown', 'value'),
-         Input('week-dropdown', 'value')]
+         Input('week-dropdown', 'value'),
+         Input('data-version', 'data')]
     )
-    def update_daily_summary(selected_year, selected_month, selected_week):
+    @data.pin
+    @figures.memoize
+    def update_daily_summary(selected_year, selected_month, selected_week, version=None):
         if not selected_year or not selected_month or not selected_week:
-            return {}, {}
+            return {}
         try:
-            df_filtered = df[
-                (df['Year'] == selected_year) &
-                (df['Month_Num'] == selected_month) &
-                (df['Week_Num'] == selected_week)
-            ]
-            df_summary = generate_summary(df_filtered, 'Day')
+            df_summary = data.slices.summary('Day', selected_year, selected_month, selected_week)
             fig = create_bar_chart(df_summary, 'Day', f'Daily Summary for Week {selected_week}')
-            return fig, fig
+            return fig
         except Exception as e:
             print(f"Error in daily summary: {e}")
-            return {}, {}
+            return {}
 
-    # --- Callbacks to Toggle Modals (General Analysis & Breakdown Analysis) ---
-    @app.callback(
-        Output("modal-freq", "is_open"),
-        [Input("btn-expand-freq", "n_clicks"), Input("close-modal-freq", "n_clicks")],
-        [State("modal-freq", "is_open")]
+    # Browser width, so the trend chart sends about one point per visible pixel
+    app.clientside_callback(
+        "function(_) { return window.innerWidth; }",
+        Output('viewport-width', 'data'),
+        Input('viewport-width', 'id')
     )
-    def toggle_modal_freq(expand, close, is_open):
-        try:
-            if expand or close:
-                return not is_open
-            return is_open
-        except Exception as e:
-            print(f"Error toggling modal-freq: {e}")
-            return is_open
 
-    @app.callback(
-        Output("modal-top", "is_open"),
-        [Input("btn-expand-top", "n_clicks"), Input("close-modal-top", "n_clicks")],
-        [State("modal-top", "is_open")]
-    )
-    def toggle_modal_top(expand, close, is_open):
-        try:
-            if expand or close:
-                return not is_open
-            return is_open
-        except Exception as e:
-            print(f"Error toggling modal-top: {e}")
-            return is_open
-
-    @app.callback(
-        Output("modal-amount", "is_open"),
-        [Input("btn-expand-amount", "n_clicks"), Input("close-modal-amount", "n_clicks")],
-        [State("modal-amount", "is_open")]
-    )
-    def toggle_modal_amount(expand, close, is_open):
-        try:
-            if expand or close:
-                return not is_open
-            return is_open
-        except Exception as e:
-            print(f"Error toggling modal-amount: {e}")
-            return is_open
-
-    @app.callback(
-        Output("modal-trend", "is_open"),
-        [Input("btn-expand-trend", "n_clicks"), Input("close-modal-trend", "n_clicks")],
-        [State("modal-trend", "is_open")]
-    )
-    def toggle_modal_trend(expand, close, is_open):
-        try:
-            if expand or close:
-                return not is_open
-            return is_open
-        except Exception as e:
-            print(f"Error toggling modal-trend: {e}")
-            return is_open
-
-    @app.callback(
-        Output("modal-yearly", "is_open"),
-        [Input("btn-expand-yearly", "n_clicks"), Input("close-modal-yearly", "n_clicks")],
-        [State("modal-yearly", "is_open")]
-    )
-    def toggle_modal_yearly(expand, close, is_open):
-        try:
-            if expand or close:
-                return not is_open
-            return is_open
-        except Exception as e:
-            print(f"Error toggling modal-yearly: {e}")
-            return is_open
-
-    @app.callback(
-        Output("modal-monthly", "is_open"),
-        [Input("btn-expand-monthly", "n_clicks"), Input("close-modal-monthly", "n_clicks")],
-        [State("modal-monthly", "is_open")]
-    )
-    def toggle_modal_monthly(expand, close, is_open):
-        try:
-            if expand or close:
-                return not is_open
-            return is_open
-        except Exception as e:
-            print(f"Error toggling modal-monthly: {e}")
-            return is_open
-
-    @app.callback(
-        Output("modal-weekly", "is_open"),
-        [Input("btn-expand-weekly", "n_clicks"), Input("close-modal-weekly", "n_clicks")],
-        [State("modal-weekly", "is_open")]
-    )
-    def toggle_modal_weekly(expand, close, is_open):
-        try:
-            if expand or close:
-                return not is_open
-            return is_open
-        except Exception as e:
-            print(f"Error toggling modal-weekly: {e}")
-            return is_open
-
-    @app.callback(
-        Output("modal-daily", "is_open"),
-        [Input("btn-expand-daily", "n_clicks"), Input("close-modal-daily", "n_clicks")],
-        [State("modal-daily", "is_open")]
-    )
-    def toggle_modal_daily(expand, close, is_open):
-        try:
-            if expand or close:
-                return not is_open
-            return is_open
-        except Exception as e:
-            print(f"Error toggling modal-daily: {e}")
-            return is_open
-
-    # --- Callbacks to Update Modal Graphs (General & Breakdown) ---
-    @app.callback(
-        Output("modal-freq-bar", "figure"),
-        Input("store-freq-bar", "data")
-    )
-    def update_modal_freq_bar(store_data):
-        return store_data
-
-    @app.callback(
-        Output("modal-top-transactions", "figure"),
-        Input("store-top-transactions", "data")
-    )
-    def update_modal_top(store_data):
-        return store_data
-
-    @app.callback(
-        Output("modal-amount-pie", "figure"),
-        Input("store-amount-pie", "data")
-    )
-    def update_modal_amount(store_data):
-        return store_data
-
-    @app.callback(
-        Output("modal-date-trend", "figure"),
-        Input("store-date-trend", "data")
-    )
-    def update_modal_trend(store_data):
-        return store_data
-
-    @app.callback(
-        Output("modal-yearly-summary", "figure"),
-        Input("store-yearly-summary", "data")
-    )
-    def update_modal_yearly_summary(store_data):
-        return store_data
-
-    @app.callback(
-        Output("modal-monthly-summary", "figure"),
-        Input("store-monthly-summary", "data")
-    )
-    def update_modal_monthly_summary(store_data):
-        return store_data
-
-    @app.callback(
-        Output("modal-weekly-summary", "figure"),
-        Input("store-weekly-summary", "data")
-    )
-    def update_modal_weekly_summary(store_data):
-        return store_data
-
-    @app.callback(
-        Output("modal-daily-summary", "figure"),
-        Input("store-daily-summary", "data")
+    # --- Clientside Modal Toggle (General & Breakdown) ---
+    # One pattern-matching callback runs in the browser for every chart: Expand/Close
+    # toggle its modal, which shows the figure already rendered in the chart, so no
+    # figure is sent twice and opening a modal costs no server round-trip.
+    app.clientside_callback(
+        """
+        function(expand, close, figure, is_open) {
+            var triggered = dash_clientside.callback_context.triggered.map(function(t) { return t.prop_id; });
+            if (triggered.some(function(p) { return p.endsWith('.n_clicks'); })) {
+                if (!(expand || close)) {
+                    return [is_open, dash_clientside.no_update];
+                }
+                return [!is_open, is_open ? dash_clientside.no_update : figure];
+            }
+            // The chart was redrawn; refresh the modal only while it is visible
+            return [dash_clientside.no_update, is_open ? figure : dash_clientside.no_update];
+        }
+        """,
+        [Output({'type': 'modal', 'index': MATCH}, 'is_open'),
+         Output({'type': 'modal-graph', 'index': MATCH}, 'figure')],
+        [Input({'type': 'btn-expand', 'index': MATCH}, 'n_clicks'),
+         Input({'type': 'close-modal', 'index': MATCH}, 'n_clicks'),
+         Input({'type': 'chart', 'index': MATCH}, 'figure')],
+        [State({'type': 'modal', 'index': MATCH}, 'is_open')]
     )
-    def update_modal_daily_summary(store_data):
-        return store_data
@@ -1,74 +1,175 @@
 # category_tab.py
+import os
+import threading
+
+import numpy as np
 import pandas as pd
 import plotly.express as px
 from dash import dcc, html
 
-def load_category_data():
+
+class CategoryRollups:
+    """
+    Daily spending per (category, sub-category) as prefix sums.
+
+    Built once from the categorized statement; the totals of any date range are
+    the difference of two prefix-sum rows, so the category charts never touch
+    the transactions again.
+    """
+
+    def __init__(self, df_cat):
+        daily = df_cat.pivot_table(
+            index='Date',
+            columns=['Transaction_Category', 'Sub_Category'],
+            values='Amount_Spent',
+            aggfunc='sum',
+            fill_value=0.0,
+        ).sort_index()
+        self.days = daily.index
+        self.keys = daily.columns
+        # cumulative[i] is the total of the first i days, so cumulative[0] is all zeros
+        self.cumulative = np.vstack([np.zeros(len(self.keys)), daily.to_numpy().cumsum(axis=0)])
+        self._row_totals = self.cumulative.sum(axis=1)
+        months = daily.index.to_period('M')
+        self._month_starts = np.flatnonzero(np.r_[True, months[1:] != months[:-1]])
+        self._months = months[self._month_starts]
+
+    def _bounds(self, start_date, end_date):
+        start = 0 if not start_date else int(self.days.searchsorted(pd.Timestamp(start_date), 'left'))
+        stop = len(self.days) if not end_date else int(self.days.searchsorted(pd.Timestamp(end_date), 'right'))
+        return start, max(start, stop)
+
+    def subcategory_summary(self, start_date, end_date):
+        """Amount_Spent per (Transaction_Category, Sub_Category) within the range."""
+        start, stop = self._bounds(start_date, end_date)
+        totals = self.cumulative[stop] - self.cumulative[start]
+        summary = self.keys.to_frame(index=False)
+        summary['Amount_Spent'] = totals
+        return summary[summary['Amount_Spent'] > 0]
+
+    def category_summary(self, start_date, end_date):
+        """Amount_Spent per Transaction_Category within the range."""
+        return self.subcategory_summary(start_date, end_date).groupby(
+            'Transaction_Category', as_index=False)['Amount_Spent'].sum()
+
+    def monthly_summary(self, start_date, end_date):
+        """Amount_Spent per calendar month within the range, in date order."""
+        start, stop = self._bounds(start_date, end_date)
+        if start == stop:
+            return pd.DataFrame({'Month': [], 'Amount_Spent': []})
+        first = int(np.searchsorted(self._month_starts, start, 'right')) - 1
+        last = int(np.searchsorted(self._month_starts, stop, 'left'))
+        bounds = np.r_[start, self._month_starts[first + 1:last], stop]
+        row_totals = self._row_totals
+        return pd.DataFrame({
+            'Month': self._months[first:last].strftime('%b %Y'),
+            'Amount_Spent': row_totals[bounds[1:]] - row_totals[bounds[:-1]],
+        })
+
+
+def load_category_data(file_path="Csv/Categorized_Transactions.csv"):
     """
     Load and preprocess the categorized transactions data.
     """
     try:
-        df_cat = pd.read_csv("Csv/Categorized_Transactions.csv")
-        df_cat['Transaction_Date'# Step 1: Import Libraries
-import pandas as pd
-import numpy as np
-import seaborn as sns
-import matplotlib.pyplot as plt
-from sklearn.model_selection import train_test_split, GridSearchCV
-from sklearn.preprocessing import LabelEncoder, RobustScaler
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import accuracy_score, confusion_matrix, classification_report
-from sklearn.feature_selection import RFE
-…] = pd.to_datetime(df_cat['Transaction_Date'], errors='coerce')
-        df_cat['Month'] = df_cat['Transaction_Date'].dt.strftime('%B')
+        df_cat = pd.read_csv(
+            file_path,
+            usecols=['Transaction_Date', 'Debit', 'Transaction_Category', 'Sub_Category'],
+        )
+        # Unparseable dates become NaT and are dropped, so one bad row doesn't
+        # leave the column as strings
+        df_cat['Transaction_Date'] = pd.to_datetime(df_cat['Transaction_Date'], errors='coerce')
+        df_cat = df_cat.dropna(subset=['Transaction_Date'])
+        df_cat['Date'] = df_cat['Transaction_Date'].dt.normalize()
         # Assume Debit represents spending; fill missing with zero.
         df_cat['Amount_Spent'] = df_cat['Debit'].fillna(0)
+        df_cat['Transaction_Category'] = df_cat['Transaction_Category'].fillna('Uncategorized')
+        df_cat['Sub_Category'] = df_cat['Sub_Category'].fillna('Uncategorized')
         return df_cat
     except Exception as e:
         print(f"Error loading category data: {e}")
         return None
 
-def serve_category_tab():
+
+_rollups = {}
+_rollups_lock = threading.Lock()
+
+
+def get_category_rollups(file_path="Csv/Categorized_Transactions.csv"):
     """
-    Returns the layout for the Category Specification tab.
+    CategoryRollups of file_path, built on first use and rebuilt only when the
+    file changes. None if the file cannot be loaded.
     """
-    df_cat = load_category_data()
-    if df_cat is None:
-        return html.Div("Error loading category data.")
+    try:
+        stat = os.stat(file_path)
+    except OSError as e:
+        print(f"Error loading category data: {e}")
+        return None
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _rollups_lock:
+        cached = _rollups.get(file_path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        df_cat = load_category_data(file_path)
+        if df_cat is None:
+            return None
+        rollups = CategoryRollups(df_cat)
+        _rollups[file_path] = (stamp, rollups)
+        return rollups
 
-    # Prepare grouped summaries
-    category_summary = df_cat.groupby("Transaction_Category")["Amount_Spent"].sum().reset_index()
-    subcategory_summary = df_cat.groupby(["Transaction_Category", "Sub_Category"])["Amount_Spent"].sum().reset_index()
-    monthly_summary = df_cat.groupby("Month")["Amount_Spent"].sum().reset_index()
 
-    layout = html.Div([
+def serve_category_tab():
+    """
+    Returns the layout for the Category Specification tab. The charts are
+    filled by the callback in register_category_callbacks.
+    """
+    return html.Div([
         html.H2("Category Specification", style={'textAlign': 'center', 'color': '#333'}),
-        dcc.Graph(
-            id='category-pie-chart',
-            figure=px.pie(category_summary,
-                          values='Amount_Spent',
-                          names='Transaction_Category', 
-                          title="Category-wise Spending Breakdown",
-                          color_discrete_sequence=px.colors.qualitative.Pastel)
-        ),
-        dcc.Graph(
-            id='subcategory-bar-chart',
-            figure=px.bar(subcategory_summary,
-                          x='Sub_Category',
-                          y='Amount_Spent',
-                          title="Subcategory-wise Breakdown",
-                          color='Transaction_Category',
-                          color_discrete_sequence=px.colors.qualitative.Safe)
-        ),
-        dcc.Graph(
-            id='monthly-trend-chart',
-            figure=px.line(monthly_summary,
-                           x='Month',
-                           y='Amount_Spent',
-                           markers=True, 
-                           title="Monthly Spending Trend",
-                           line_shape='spline',
-                           color_discrete_sequence=['#2E91E5'])
-        )
+        dcc.Graph(id='category-pie-chart'),
+        dcc.Graph(id='subcategory-bar-chart'),
+        dcc.Graph(id='monthly-trend-chart')
     ])
-    return layout
+
+
+def register_category_callbacks(app, file_path=None):
+    from dash import Input, Output
+
+    file_path = file_path or os.getenv("SPENDWISE_CATEGORY_DATA", "Csv/Categorized_Transactions.csv")
+
+    @app.callback(
+        [Output('category-pie-chart', 'figure'),
+         Output('subcategory-bar-chart', 'figure'),
+         Output('monthly-trend-chart', 'figure')],
+        [Input('date-picker-range', 'start_date'),
+         Input('date-picker-range', 'end_date')]
+    )
+    def update_category_tab(start_date, end_date):
+        rollups = get_category_rollups(file_path)
+        if rollups is None:
+            return {}, {}, {}
+        try:
+            category_summary = rollups.category_summary(start_date, end_date)
+            subcategory_summary = rollups.subcategory_summary(start_date, end_date)
+            monthly_summary = rollups.monthly_summary(start_date, end_date)
+            pie = px.pie(category_summary,
+                         values='Amount_Spent',
+                         names='Transaction_Category',
+                         title="Category-wise Spending Breakdown",
+                         color_discrete_sequence=px.colors.qualitative.Pastel)
+            bar = px.bar(subcategory_summary,
+                         x='Sub_Category',
+                         y='Amount_Spent',
+                         title="Subcategory-wise Breakdown",
+                         color='Transaction_Category',
+                         color_discrete_sequence=px.colors.qualitative.Safe)
+            trend = px.line(monthly_summary,
+                            x='Month',
+                            y='Amount_Spent',
+                            markers=True,
+                            title="Monthly Spending Trend",
+                            line_shape='spline',
+                            color_discrete_sequence=['#2E91E5'])
+            return pie, bar, trend
+        except Exception as e:
+            print(f"Error updating category tab: {e}")
+            return {}, {}, {}
@@ -0,0 +1,139 @@
+import contextvars
+import functools
+import os
+import threading
+from collections import namedtuple
+
+from slice_cache import SliceCache
+
+# One loaded version of the statement: the frame, its version string and the
+# slice cache over it. Snapshots are never modified, only replaced.
+Snapshot = namedtuple('Snapshot', ['df', 'version', 'slices'])
+
+_pinned = contextvars.ContextVar('spendwise_snapshot', default=None)
+
+
+def _file_stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class DataHandle:
+    """
+    Versioned handle on the dashboard's data.
+
+    A background thread polls the statement file and, when it changes, loads
+    it into a new Snapshot and swaps it in with a single reference assignment.
+    Callbacks decorated with ``pin`` see one snapshot for their whole run, so a
+    callback in flight during a reload finishes on the version it started
+    with. Caches keyed by the snapshot (its SliceCache, figure cache entries
+    keyed by version) are invalidated by the swap itself.
+
+    ``load(path)`` returns (df, version), or None if the file cannot be loaded,
+    in which case the current snapshot is kept. ``shared`` is the diskcache
+    every snapshot's SliceCache shares its aggregates through.
+    """
+
+    def __init__(self, snapshot, path=None, load=None, slice_cache_size=32, shared=None):
+        self.path = path
+        self._load = load
+        self.slice_cache_size = slice_cache_size
+        self.shared = shared
+        self._snapshot = snapshot
+        self._stamp = _file_stamp(path) if path else None
+        self._swap_lock = threading.Lock()
+        self._listeners = []
+        self._thread = None
+        self._stop = threading.Event()
+
+    @classmethod
+    def from_file(cls, path, load, slice_cache_size=32, shared=None):
+        """Load path into the first snapshot; None if it cannot be loaded."""
+        loaded = load(path)
+        if loaded is None:
+            return None
+        df, version = loaded
+        slices = SliceCache(df, version=version, maxsize=slice_cache_size, shared=shared)
+        return cls(Snapshot(df, version, slices), path, load, slice_cache_size, shared)
+
+    @classmethod
+    def static(cls, df, version=None, slice_cache_size=32, shared=None):
+        """A handle on an already loaded frame that never reloads."""
+        slices = SliceCache(df, version=version, maxsize=slice_cache_size, shared=shared)
+        return cls(Snapshot(df, slices.version, slices), slice_cache_size=slice_cache_size, shared=shared)
+
+    def current(self):
+        """The snapshot pinned for this callback, else the latest one."""
+        return _pinned.get() or self._snapshot
+
+    @property
+    def slices(self):
+        """SliceCache of the current snapshot."""
+        return self.current().slices
+
+    def pin(self, fn):
+        """Decorate a callback (below @app.callback) to run on a single snapshot."""
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            token = _pinned.set(self._snapshot)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _pinned.reset(token)
+
+        return wrapper
+
+    def on_swap(self, listener):
+        """Call listener(old, new) after each reload."""
+        self._listeners.append(listener)
+
+    def reload(self, force=False):
+        """Load the file again if it changed since the last load. Returns True if swapped."""
+        with self._swap_lock:
+            stamp = _file_stamp(self.path) if self.path else None
+            if self._load is None or stamp is None or (stamp == self._stamp and not force):
+                return False
+            loaded = self._load(self.path)
+            if loaded is None:
+                print(f"Reload of {self.path} failed; still serving version {self._snapshot.version}")
+                return False
+            self._stamp = stamp
+            df, version = loaded
+            slices = SliceCache(df, version=version, maxsize=self.slice_cache_size, shared=self.shared)
+            snapshot = Snapshot(df, version, slices)
+            old, self._snapshot = self._snapshot, snapshot
+        for listener in self._listeners:
+            try:
+                listener(old, self._snapshot)
+            except Exception as e:
+                print(f"Error in data reload listener: {e}")
+        return True
+
+    def watch(self, interval=5.0):
+        """
+        Poll the file every ``interval`` seconds in a daemon thread. A change is
+        loaded once the file has stayed the same for a whole interval, so a
+        statement that is still being written is not picked up half-way.
+        """
+        if self._thread is not None or not interval or self._load is None:
+            return
+
+        def run():
+            last_seen = self._stamp
+            while not self._stop.wait(interval):
+                stamp = _file_stamp(self.path)
+                try:
+                    if stamp != self._stamp and stamp == last_seen:
+                        self.reload()
+                except Exception as e:
+                    print(f"Error reloading {self.path}: {e}")
+                last_seen = stamp
+
+        self._thread = threading.Thread(target=run, name='spendwise-data-watch', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
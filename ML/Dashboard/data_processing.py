@@ -1,31 +1,106 @@
+import numpy as np
 import pandas as pd
 
+# Explicit in-memory schema of a statement. Low-cardinality text is categorical;
+# identifiers, payees and free-text notes are Arrow-backed strings (their
+# categories would grow with the history); amounts stay float64.
+CATEGORICAL_COLUMNS = ['Transaction_Type', 'Transaction_Mode', 'DR/CR_Indicator', 'Bank']
+STRING_COLUMNS = [
+    'Description', 'Reference No./Cheque No.', 'Transaction_ID',
+    'Recipient_Name', 'UPI_ID', 'Note',
+]
+AMOUNT_COLUMNS = ['Debit', 'Credit', 'Balance']
+CSV_DTYPES = {
+    **{col: 'category' for col in CATEGORICAL_COLUMNS},
+    **{col: 'string[pyarrow]' for col in STRING_COLUMNS},
+    **{col: 'float64' for col in AMOUNT_COLUMNS},
+}
+MONTH_NAMES = pd.CategoricalDtype(
+    ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+     'August', 'September', 'October', 'November', 'December'],
+    ordered=True,
+)
+
+def read_columnar(file_path):
+    """
+    Memory-map a date-sorted Arrow IPC file written by the backend's
+    `manage.py build_columnar` command.
+    """
+    import pyarrow.feather as feather
+
+    table = feather.read_table(file_path, memory_map=True)
+    df = table.to_pandas(split_blocks=True)
+    dtypes = {col: dtype for col, dtype in CSV_DTYPES.items() if col in df.columns}
+    return df.astype(dtypes)
+
+def memory_report(df):
+    """Resident bytes of each column (text included), largest first."""
+    return df.memory_usage(index=False, deep=True).sort_values(ascending=False)
+
 def load_data(file_path):
     """
-    Loads the bank statement CSV and preprocesses the data.
+    Loads the bank statement (CSV, or Arrow IPC ending in .arrow/.feather) and preprocesses the data.
+    Columns follow CSV_DTYPES; the calendar columns are small integers, an
+    ordered Month categorical and a datetime64 Day.
     
     Returns:
         df (DataFrame): Preprocessed DataFrame or None if an error occurs.
     """
     try:
-        df = pd.read_csv(file_path)
+        if str(file_path).endswith(('.arrow', '.feather')):
+            df = read_columnar(file_path)
+        else:
+            df = pd.read_csv(file_path, dtype=CSV_DTYPES, parse_dates=['Transaction_Date'], engine='pyarrow')
     except FileNotFoundError:
         print(f"Error: File {file_path} not found.")
         return None
     except Exception as e:
-        print(f"Error loading CSV: {e}")
+        print(f"Error loading data: {e}")
         return None
 
     try:
         # Convert Transaction_Date to datetime and create extra columns
         df['Transaction_Date'] = pd.to_datetime(df['Transaction_Date'])
-        df['Year'] = df['Transaction_Date'].dt.year
-        df['Month_Num'] = df['Transaction_Date'].dt.month
-        df['Month'] = df['Transaction_Date'].dt.strftime('%B')  # e.g., January, February
-        df['Week_Num'] = df['Transaction_Date'].dt.strftime('%U').astype(int) + 1  # Week number starting at 1
-        df['Day'] = df['Transaction_Date'].dt.date
+        # Date order makes every year, month and week a contiguous run of rows (see build_calendar_index)
+        df = df.sort_values('Transaction_Date', kind='stable', ignore_index=True)
+        dates = df['Transaction_Date'].dt
+        df['Year'] = dates.year.astype('int16')
+        df['Month_Num'] = dates.month.astype('int8')
+        df['Month'] = pd.Categorical.from_codes(df['Month_Num'] - 1, dtype=MONTH_NAMES)  # e.g., January, February
+        # Week number starting at 1; weeks start on Sunday, as strftime('%U') + 1
+        df['Week_Num'] = ((dates.dayofyear + 6 - (dates.dayofweek + 1) % 7) // 7 + 1).astype('int8')
+        df['Day'] = dates.normalize()
     except Exception as e:
         print(f"Error processing date columns: {e}")
         return None
 
     return df
+
+def build_calendar_index(df):
+    """
+    Year -> month -> week index of a date-sorted frame from load_data.
+
+    Returns {year: {'rows': (start, stop), 'months': {month_num: {'name': ...,
+    'rows': (start, stop), 'weeks': {week_num: (start, stop)}}}}}, where
+    (start, stop) are positional row ranges for df.iloc[start:stop].
+    """
+    index = {}
+    if len(df) == 0:
+        return index
+    years = df['Year'].to_numpy()
+    months = df['Month_Num'].to_numpy()
+    weeks = df['Week_Num'].to_numpy()
+    # Row positions where the (year, month, week) run changes
+    changed = (years[1:] != years[:-1]) | (months[1:] != months[:-1]) | (weeks[1:] != weeks[:-1])
+    starts = np.concatenate(([0], np.flatnonzero(changed) + 1))
+    stops = np.append(starts[1:], len(df))
+    names = df['Month']
+    for start, stop in zip(starts.tolist(), stops.tolist()):
+        year, month, week = int(years[start]), int(months[start]), int(weeks[start])
+        year_entry = index.setdefault(year, {'rows': (start, stop), 'months': {}})
+        year_entry['rows'] = (year_entry['rows'][0], stop)
+        month_entry = year_entry['months'].setdefault(
+            month, {'name': names.iat[start], 'rows': (start, stop), 'weeks': {}})
+        month_entry['rows'] = (month_entry['rows'][0], stop)
+        month_entry['weeks'][week] = (start, stop)
+    return index
@@ -0,0 +1,46 @@
+import numpy as np
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Positions of the points kept by Largest-Triangle-Three-Buckets downsampling.
+
+    x must be ascending (numbers or datetime64). The first and last points are
+    always kept; each bucket in between keeps the point that forms the largest
+    triangle with the previously kept point and the next bucket's average, so
+    peaks and dips survive. Returns all positions if threshold >= len(x).
+    """
+    n = len(x)
+    if threshold >= n or n <= 2:
+        return np.arange(n)
+    threshold = max(threshold, 3)
+
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype('datetime64[s]').astype(np.int64)
+    x = x.astype(np.float64) - float(x[0])
+    y = np.asarray(y, dtype=np.float64)
+
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0] = 0
+    kept[-1] = n - 1
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        stop = int((i + 1) * every) + 1
+        next_stop = min(int((i + 2) * every) + 1, n)
+        avg_x = x[stop:next_stop].mean()
+        avg_y = y[stop:next_stop].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:stop] - y[a])
+            - (x[a] - x[start:stop]) * (avg_y - y[a])
+        )
+        a = start + int(area.argmax())
+        kept[i + 1] = a
+    return kept
+
+
+def downsample_series(series, threshold):
+    """A date-indexed Series reduced to at most ``threshold`` points with LTTB."""
+    return series.iloc[lttb_indices(series.index.to_numpy(), series.to_numpy(), threshold)]
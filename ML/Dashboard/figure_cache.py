@@ -0,0 +1,112 @@
+import functools
+import inspect
+import os
+import tempfile
+
+import pandas as pd
+
+
+def data_version(df):
+    """
+    Content hash of the loaded statement. Unlike id(df) it is the same in every
+    worker process that loaded the same data, so their cache entries are shared.
+    """
+    return format(int(pd.util.hash_pandas_object(df, index=True).sum()) & (2 ** 64 - 1), 'x')
+
+
+def _plain(value):
+    """Figures as plain dicts (cheap to pickle and to hand back to Dash)."""
+    if isinstance(value, (list, tuple)):
+        return type(value)(_plain(v) for v in value)
+    if hasattr(value, 'to_dict'):
+        return value.to_dict()
+    return value
+
+
+def _complete(value):
+    """False for empty figures returned on missing inputs or errors; those are not cached."""
+    if isinstance(value, (list, tuple)):
+        return all(_complete(v) for v in value)
+    return bool(value)
+
+
+class FigureCache:
+    """
+    Plotly figures keyed by (callback, inputs, data version) in a disk cache.
+
+    Every worker process pointed at the same directory shares the entries, so
+    a figure built for one user's year or month is served to the next user on
+    any worker. Entries beyond ``size_limit`` bytes are evicted least recently
+    used first; hit/miss counters are kept in the cache itself and so also
+    cover all workers. A ``size_limit`` of 0 disables caching.
+    """
+
+    def __init__(self, version, directory=None, size_limit=256 * 2 ** 20):
+        self.version = version
+        self.directory = directory or os.path.join(tempfile.gettempdir(), 'spendwise-figures')
+        self.size_limit = size_limit
+        self._cache = None
+        if size_limit:
+            import diskcache
+
+            self._cache = diskcache.Cache(
+                self.directory,
+                size_limit=size_limit,
+                eviction_policy='least-recently-used',
+            )
+            self._cache.stats(enable=True)
+
+    @classmethod
+    def from_env(cls, version):
+        return cls(
+            version,
+            directory=os.getenv("SPENDWISE_FIGURE_CACHE_DIR"),
+            size_limit=int(os.getenv("SPENDWISE_FIGURE_CACHE_MB", "256")) * 2 ** 20,
+        )
+
+    def memoize(self, fn):
+        """
+        Decorate a figure callback (below @app.callback) to serve its results
+        from the cache. Keyword arguments are passed through but are not part
+        of the key, and neither is a ``version`` argument (the data-version
+        input, None on first load): entries are keyed by the cache's own
+        version, so one figure is stored once.
+        """
+        if self._cache is None:
+            return fn
+
+        params = list(inspect.signature(fn).parameters)
+        skip = params.index('version') if 'version' in params else None
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            version = self.version() if callable(self.version) else self.version
+            inputs = args if skip is None else args[:skip] + args[skip + 1:]
+            key = (fn.__name__, version, inputs)
+            value = self._cache.get(key)
+            if value is not None:
+                return value
+            value = _plain(fn(*args, **kwargs))
+            if _complete(value):
+                self._cache.set(key, value)
+            return value
+
+        return wrapper
+
+    def clear(self):
+        if self._cache is not None:
+            self._cache.clear()
+
+    def stats(self):
+        if self._cache is None:
+            return {'enabled': False}
+        hits, misses = self._cache.stats()
+        return {
+            'enabled': True,
+            'directory': self.directory,
+            'entries': len(self._cache),
+            'size_bytes': self._cache.volume(),
+            'size_limit': self.size_limit,
+            'hits': hits,
+            'misses': misses,
+        }
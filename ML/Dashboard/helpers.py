@@ -13,12 +13,13 @@ def generate_summary(df_filtered, group_col):
             if col not in df_filtered.columns:
                 raise ValueError(f"Column '{col}' does not exist in the DataFrame")
                 
-        df_grouped = df_filtered.groupby(group_col).agg({
+        # observed=True: categorical groups (e.g. Month) without transactions are left out
+        df_grouped = df_filtered.groupby(group_col, observed=True).agg({
             'Debit': 'sum',
             'Credit': 'sum',
             'Balance': 'last'
         }).reset_index()
-        transaction_counts = df_filtered.groupby(group_col).size().reset_index(name='Total_Transactions')
+        transaction_counts = df_filtered.groupby(group_col, observed=True).size().reset_index(name='Total_Transactions')
         df_summary = df_grouped.merge(transaction_counts, on=group_col)
         # Recalculate Balance as (Credit - Debit)
         df_summary['Balance'] = df_summary['Credit'] - df_summary['Debit']
@@ -56,6 +57,33 @@ def create_bar_chart(df_summary, x_col, title):
         print(f"Error in create_bar_chart: {e}")
         return {}
 
+def create_trend_chart(daily, x_range=None):
+    """
+    WebGL line chart of a date-indexed Debit series (already downsampled),
+    optionally fixed to the zoomed x_range.
+    """
+    try:
+        fig = px.line(
+            x=daily.index,
+            y=daily.values,
+            title="Transaction Trends Over Time",
+            labels={'x': "Date", 'y': "Total Amount"},
+            render_mode='webgl'
+        )
+        if x_range:
+            fig.update_xaxes(range=x_range)
+        return fig
+    except Exception as e:
+        print(f"Error in create_trend_chart: {e}")
+        return {}
+
+def chart_id(name):
+    """
+    Pattern-matching id of a dashboard chart. Its Expand button, modal and modal
+    graph share the index, so one clientside callback serves every chart.
+    """
+    return {'type': 'chart', 'index': name}
+
 def summary_box(title, value, bg_color, text_color):
     """
     Create a styled summary box as a Dash HTML component.
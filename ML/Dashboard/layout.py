@@ -2,6 +2,54 @@
 from dash import dcc, html
 import dash_bootstrap_components as dbc
 from category_tab import serve_category_tab  # Import the category tab layout
+from helpers import chart_id
+
+
+def graph_card(name, button_color):
+    """
+    A chart with an Expand button that opens it in its modal.
+    """
+    return html.Div([
+        dcc.Graph(
+            id=chart_id(name),
+            config={'displayModeBar': True},
+            style={'height': '300px'}
+        ),
+        html.Button(
+            "Expand",
+            id={'type': 'btn-expand', 'index': name},
+            n_clicks=0,
+            style={
+                'position': 'absolute',
+                'bottom': '10px',
+                'right': '10px',
+                'backgroundColor': button_color,
+                'color': '#fff',
+                'border': 'none',
+                'borderRadius': '5px'
+            }
+        )
+    ], className="graph-card", style={
+        'width': '45%',
+        'display': 'inline-block',
+        'position': 'relative',
+        'margin': '10px',
+        'backgroundColor': '#f9f9f9',
+        'borderRadius': '10px',
+        'boxShadow': '1px 1px 3px rgba(0,0,0,0.1)'
+    })
+
+
+def chart_modal(name, title):
+    """
+    Full-size view of a chart; its figure is copied in the browser when opened.
+    """
+    return dbc.Modal([
+        dbc.ModalHeader(title),
+        dbc.ModalBody(dcc.Graph(id={'type': 'modal-graph', 'index': name}, style={'height': '600px'})),
+        dbc.ModalFooter(dbc.Button("Close", id={'type': 'close-modal', 'index': name}, className="ml-auto"))
+    ], id={'type': 'modal', 'index': name}, size="xl", is_open=False)
+
 
 def serve_layout(df):
     # Create a styled container for the date picker
@@ -43,152 +91,22 @@ def serve_layout(df):
     # --- General Analysis Tab ---
     general_tab = html.Div([
         html.H2("General Transaction Analysis", style={'textAlign': 'center', 'color': '#333'}),
+        # Shown while the charts below are computed in the background
+        html.Progress(id='general-progress', value='0', max='5', style={'display': 'none'}),
         html.Div([
-            html.Div([
-                dcc.Graph(
-                    id='freq-bar',
-                    config={'displayModeBar': True},
-                    style={'height': '300px'}
-                ),
-                html.Button(
-                    "Expand",
-                    id="btn-expand-freq",
-                    n_clicks=0,
-                    style={
-                        'position': 'absolute',
-                        'bottom': '10px',
-                        'right': '10px',
-                        'backgroundColor': '#007BFF',
-                        'color': '#fff',
-                        'border': 'none',
-                        'borderRadius': '5px'
-                    }
-                )
-            ], className="graph-card", style={
-                'width': '45%',
-                'display': 'inline-block',
-                'position': 'relative',
-                'margin': '10px',
-                'backgroundColor': '#f9f9f9',
-                'borderRadius': '10px',
-                'boxShadow': '1px 1px 3px rgba(0,0,0,0.1)'
-            }),
-            html.Div([
-                dcc.Graph(
-                    id='top-transactions',
-                    config={'displayModeBar': True},
-                    style={'height': '300px'}
-                ),
-                html.Button(
-                    "Expand",
-                    id="btn-expand-top",
-                    n_clicks=0,
-                    style={
-                        'position': 'absolute',
-                        'bottom': '10px',
-                        'right': '10px',
-                        'backgroundColor': '#28A745',
-                        'color': '#fff',
-                        'border': 'none',
-                        'borderRadius': '5px'
-                    }
-                )
-            ], className="graph-card", style={
-                'width': '45%',
-                'display': 'inline-block',
-                'position': 'relative',
-                'margin': '10px',
-                'backgroundColor': '#f9f9f9',
-                'borderRadius': '10px',
-                'boxShadow': '1px 1px 3px rgba(0,0,0,0.1)'
-            })
+            graph_card('freq-bar', '#007BFF'),
+            graph_card('top-transactions', '#28A745')
         ], style={'textAlign': 'center'}),
         html.Div([
-            html.Div([
-                dcc.Graph(
-                    id='amount-pie',
-                    config={'displayModeBar': True},
-                    style={'height': '300px'}
-                ),
-                html.Button(
-                    "Expand",
-                    id="btn-expand-amount",
-                    n_clicks=0,
-                    style={
-                        'position': 'absolute',
-                        'bottom': '10px',
-                        'right': '10px',
-                        'backgroundColor': '#17A2B8',
-                        'color': '#fff',
-                        'border': 'none',
-                        'borderRadius': '5px'
-                    }
-                )
-            ], className="graph-card", style={
-                'width': '45%',
-                'display': 'inline-block',
-                'position': 'relative',
-                'margin': '10px',
-                'backgroundColor': '#f9f9f9',
-                'borderRadius': '10px',
-                'boxShadow': '1px 1px 3px rgba(0,0,0,0.1)'
-            }),
-            html.Div([
-                dcc.Graph(
-                    id='date-trend',
-                    config={'displayModeBar': True},
-                    style={'height': '300px'}
-                ),
-                html.Button(
-                    "Expand",
-                    id="btn-expand-trend",
-                    n_clicks=0,
-                    style={
-                        'position': 'absolute',
-                        'bottom': '10px',
-                        'right': '10px',
-                        'backgroundColor': '#FFC107',
-                        'color': '#fff',
-                        'border': 'none',
-                        'borderRadius': '5px'
-                    }
-                )
-            ], className="graph-card", style={
-                'width': '45%',
-                'display': 'inline-block',
-                'position': 'relative',
-                'margin': '10px',
-                'backgroundColor': '#f9f9f9',
-                'borderRadius': '10px',
-                'boxShadow': '1px 1px 3px rgba(0,0,0,0.1)'
-            })
+            graph_card('amount-pie', '#17A2B8'),
+            graph_card('date-trend', '#FFC107')
         ], style={'textAlign': 'center'}),
-        # Hidden Stores for full-size figures (for modals)
-        dcc.Store(id='store-freq-bar'),
-        dcc.Store(id='store-top-transactions'),
-        dcc.Store(id='store-amount-pie'),
-        dcc.Store(id='store-date-trend'),
-        # Modals for expanded views
-        dbc.Modal([
-            dbc.ModalHeader("Frequency Distribution"),
-            dbc.ModalBody(dcc.Graph(id='modal-freq-bar', style={'height': '600px'})),
-            dbc.ModalFooter(dbc.Button("Close", id="close-modal-freq", className="ml-auto"))
-        ], id="modal-freq", size="xl", is_open=False),
-        dbc.Modal([
-            dbc.ModalHeader("Top Transactions"),
-            dbc.ModalBody(dcc.Graph(id='modal-top-transactions', style={'height': '600px'})),
-            dbc.ModalFooter(dbc.Button("Close", id="close-modal-top", className="ml-auto"))
-        ], id="modal-top", size="xl", is_open=False),
-        dbc.Modal([
-            dbc.ModalHeader("Transaction Amount Distribution"),
-            dbc.ModalBody(dcc.Graph(id='modal-amount-pie', style={'height': '600px'})),
-            dbc.ModalFooter(dbc.Button("Close", id="close-modal-amount", className="ml-auto"))
-        ], id="modal-amount", size="xl", is_open=False),
-        dbc.Modal([
-            dbc.ModalHeader("Transaction Trends Over Time"),
-            dbc.ModalBody(dcc.Graph(id='modal-date-trend', style={'height': '600px'})),
-            dbc.ModalFooter(dbc.Button("Close", id="close-modal-trend", className="ml-auto"))
-        ], id="modal-trend", size="xl", is_open=False)
+        dcc.Store(id='viewport-width'),
+        # Modals for expanded views (filled client-side from the rendered graphs)
+        chart_modal('freq-bar', "Frequency Distribution"),
+        chart_modal('top-transactions', "Top Transactions"),
+        chart_modal('amount-pie', "Transaction Amount Distribution"),
+        chart_modal('date-trend', "Transaction Trends Over Time")
     ])
     
     # --- Breakdown Analysis Tab ---
@@ -221,115 +139,18 @@ def serve_layout(df):
         ], style={'width': '30%', 'display': 'inline-block', 'verticalAlign': 'top', 'margin': '10px'}),
         # Breakdown graphs arranged in two rows
         html.Div([
-            html.Div([
-                dcc.Graph(id='yearly-summary', config={'displayModeBar': True}, style={'height': '300px'}),
-                html.Button("Expand", id="btn-expand-yearly", n_clicks=0,
-                            style={
-                                'position': 'absolute', 'bottom': '10px', 'right': '10px',
-                                'backgroundColor': '#6f42c1',
-                                'color': '#fff',
-                                'border': 'none',
-                                'borderRadius': '5px'
-                            }
-                )
-            ], className="graph-card", style={
-                'width': '45%',
-                'display': 'inline-block',
-                'position': 'relative',
-                'margin': '10px',
-                'backgroundColor': '#f9f9f9',
-                'borderRadius': '10px',
-                'boxShadow': '1px 1px 3px rgba(0,0,0,0.1)'
-            }),
-            html.Div([
-                dcc.Graph(id='monthly-summary', config={'displayModeBar': True}, style={'height': '300px'}),
-                html.Button("Expand", id="btn-expand-monthly", n_clicks=0,
-                            style={
-                                'position': 'absolute', 'bottom': '10px', 'right': '10px',
-                                'backgroundColor': '#e83e8c',
-                                'color': '#fff',
-                                'border': 'none',
-                                'borderRadius': '5px'
-                            }
-                )
-            ], className="graph-card", style={
-                'width': '45%',
-                'display': 'inline-block',
-                'position': 'relative',
-                'margin': '10px',
-                'backgroundColor': '#f9f9f9',
-                'borderRadius': '10px',
-                'boxShadow': '1px 1px 3px rgba(0,0,0,0.1)'
-            })
+            graph_card('yearly-summary', '#6f42c1'),
+            graph_card('monthly-summary', '#e83e8c')
         ], style={'textAlign': 'center'}),
         html.Div([
-            html.Div([
-                dcc.Graph(id='weekly-summary', config={'displayModeBar': True}, style={'height': '300px'}),
-                html.Button("Expand", id="btn-expand-weekly", n_clicks=0,
-                            style={
-                                'position': 'absolute', 'bottom': '10px', 'right': '10px',
-                                'backgroundColor': '#fd7e14',
-                                'color': '#fff',
-                                'border': 'none',
-                                'borderRadius': '5px'
-                            }
-                )
-            ], className="graph-card", style={
-                'width': '45%',
-                'display': 'inline-block',
-                'position': 'relative',
-                'margin': '10px',
-                'backgroundColor': '#f9f9f9',
-                'borderRadius': '10px',
-                'boxShadow': '1px 1px 3px rgba(0,0,0,0.1)'
-            }),
-            html.Div([
-                dcc.Graph(id='daily-summary', config={'displayModeBar': True}, style={'height': '300px'}),
-                html.Button("Expand", id="btn-expand-daily", n_clicks=0,
-                            style={
-                                'position': 'absolute', 'bottom': '10px', 'right': '10px',
-                                'backgroundColor': '#20c997',
-                                'color': '#fff',
-                                'border': 'none',
-                                'borderRadius': '5px'
-                            }
-                )
-            ], className="graph-card", style={
-                'width': '45%',
-                'display': 'inline-block',
-                'position': 'relative',
-                'margin': '10px',
-                'backgroundColor': '#f9f9f9',
-                'borderRadius': '10px',
-                'boxShadow': '1px 1px 3px rgba(0,0,0,0.1)'
-            })
+            graph_card('weekly-summary', '#fd7e14'),
+            graph_card('daily-summary', '#20c997')
         ], style={'textAlign': 'center'}),
-        # Hidden Stores for breakdown figures
-        dcc.Store(id='store-yearly-summary'),
-        dcc.Store(id='store-monthly-summary'),
-        dcc.Store(id='store-weekly-summary'),
-        dcc.Store(id='store-daily-summary'),
         # Modals for breakdown analysis
-        dbc.Modal([
-            dbc.ModalHeader("Yearly Summary"),
-            dbc.ModalBody(dcc.Graph(id='modal-yearly-summary', style={'height': '600px'})),
-            dbc.ModalFooter(dbc.Button("Close", id="close-modal-yearly", className="ml-auto"))
-        ], id="modal-yearly", size="xl", is_open=False),
-        dbc.Modal([
-            dbc.ModalHeader("Monthly Summary"),
-            dbc.ModalBody(dcc.Graph(id='modal-monthly-summary', style={'height': '600px'})),
-            dbc.ModalFooter(dbc.Button("Close", id="close-modal-monthly", className="ml-auto"))
-        ], id="modal-monthly", size="xl", is_open=False),
-        dbc.Modal([
-            dbc.ModalHeader("Weekly Summary"),
-            dbc.ModalBody(dcc.Graph(id='modal-weekly-summary', style={'height': '600px'})),
-            dbc.ModalFooter(dbc.Button("Close", id="close-modal-weekly", className="ml-auto"))
-        ], id="modal-weekly", size="xl", is_open=False),
-        dbc.Modal([
-            dbc.ModalHeader("Daily Summary"),
-            dbc.ModalBody(dcc.Graph(id='modal-daily-summary', style={'height': '600px'})),
-            dbc.ModalFooter(dbc.Button("Close", id="close-modal-daily", className="ml-auto"))
-        ], id="modal-daily", size="xl", is_open=False)
+        chart_modal('yearly-summary', "Yearly Summary"),
+        chart_modal('monthly-summary', "Monthly Summary"),
+        chart_modal('weekly-summary', "Weekly Summary"),
+        chart_modal('daily-summary', "Daily Summary")
     ])
     
     # Main layout with headers, date picker container, summary boxes, and tabs
@@ -379,6 +200,9 @@ def serve_layout(df):
         }),
         date_picker_container,
         summary_container,
+        # Version of the loaded data, polled so a hot reload reaches open pages
+        dcc.Store(id='data-version'),
+        dcc.Interval(id='data-version-poll', interval=30 * 1000),
         dcc.Tabs([
             dcc.Tab(label="General Analysis", children=[general_tab], style={'backgroundColor': '#F8F9FA', 'fontWeight': 'bold'}),
             dcc.Tab(label="Y_M_W_D Breakdown", children=[breakdown_tab], style={'backgroundColor': '#F8F9FA', 'fontWeight': 'bold'}),
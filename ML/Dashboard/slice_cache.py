@@ -0,0 +1,150 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from data_processing import build_calendar_index
+from helpers import generate_summary
+
+
+class SliceCache:
+    """
+    Memoized filtered slices and summaries of the loaded statement.
+
+    Several callbacks fire on the same input change and filter the data the
+    same way (the summary boxes and the general analysis on the date range,
+    the weekly and daily summaries on year/month/week). Each distinct filter
+    is computed once per data version and shared; the least recently used
+    entries are evicted beyond ``maxsize``.
+
+    The frame is date-sorted, so date ranges are found by binary search and
+    years, months and weeks are looked up in a calendar index built once from
+    it: every slice is a row range, and dropdown options are dictionary
+    lookups.
+
+    Aggregates (the daily totals and summaries) are also kept in ``shared``,
+    a diskcache.Cache, when one is given. Background callbacks run in a forked
+    worker process whose own entries die with it; through ``shared`` what they
+    compute is served to the callbacks in the server process and to other
+    workers (only with an explicit ``version``). Row slices are not shared: a
+    slice is cheaper to take again than to pickle.
+
+    Slices and summaries are shared between callbacks, so callers must treat
+    them as read-only.
+    """
+
+    def __init__(self, df, version=None, maxsize=32, calendar=None, shared=None):
+        self.df = df
+        self.calendar = calendar if calendar is not None else build_calendar_index(df)
+        self.dates = df['Transaction_Date'].to_numpy()
+        # Part of every key, so entries from older data are never served
+        self.version = version if version is not None else (id(df), len(df))
+        # id(df) means nothing to another process, so only a given version is shared
+        self.shared = shared if version is not None else None
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+        self.evictions = 0
+
+    def _get(self, key, compute, share=False):
+        key = (self.version,) + key
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        # Computed outside the lock; concurrent misses on one key may both compute
+        if share and self.shared is not None:
+            shared_key = ('spendwise-slices',) + key
+            value = self.shared.get(shared_key)
+            if value is None:
+                value = compute()
+                self.shared.set(shared_key, value)
+            else:
+                self.shared_hits += 1
+        else:
+            value = compute()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def date_range(self, start_date, end_date):
+        """Rows with start_date <= Transaction_Date <= end_date."""
+        def compute():
+            start = self.dates.searchsorted(pd.Timestamp(start_date).to_datetime64(), 'left')
+            stop = self.dates.searchsorted(pd.Timestamp(end_date).to_datetime64(), 'right')
+            return self.df.iloc[start:stop]
+
+        return self._get(('range', start_date, end_date), compute)
+
+    def daily_debit(self, start_date, end_date):
+        """Total Debit per Transaction_Date within a date range, in date order."""
+        return self._get(
+            ('daily-debit', start_date, end_date),
+            lambda: self.date_range(start_date, end_date).groupby('Transaction_Date')['Debit'].sum(),
+            share=True,
+        )
+
+    def _rows(self, year, month=None, week=None):
+        """Positional (start, stop) of a period, or (0, 0) if it has no rows."""
+        entry = self.calendar.get(year)
+        if entry is None:
+            return 0, 0
+        if month is None:
+            return entry['rows']
+        entry = entry['months'].get(month)
+        if entry is None:
+            return 0, 0
+        if week is None:
+            return entry['rows']
+        return entry['weeks'].get(week, (0, 0))
+
+    def period(self, year, month=None, week=None):
+        """Rows of a year, optionally narrowed to a month and a week of it."""
+        start, stop = self._rows(year, month, week)
+        return self.df.iloc[start:stop]
+
+    def years(self):
+        """Years with transactions, ascending."""
+        return sorted(self.calendar)
+
+    def month_options(self, year):
+        """Dropdown options for the months of a year, in calendar order."""
+        months = self.calendar.get(year, {}).get('months', {})
+        return [{'label': m['name'], 'value': num} for num, m in sorted(months.items())]
+
+    def week_options(self, year, month):
+        """Dropdown options for the weeks of a month, in calendar order."""
+        weeks = self.calendar.get(year, {}).get('months', {}).get(month, {}).get('weeks', {})
+        return [{'label': f'Week {w}', 'value': w} for w in sorted(weeks)]
+
+    def summary(self, group_col, year, month=None, week=None):
+        """generate_summary of a period grouped by group_col."""
+        return self._get(
+            ('summary', group_col, year, month, week),
+            lambda: generate_summary(self.period(year, month, week), group_col),
+            share=True,
+        )
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'shared_hits': self.shared_hits,
+                'evictions': self.evictions,
+            }
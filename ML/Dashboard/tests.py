@@ -0,0 +1,291 @@
+"""
+Unit tests for the dashboard's caches and data helpers.
+
+Run from ML/Dashboard:
+    python -m unittest tests
+"""
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from category_tab import CategoryRollups
+from data_handle import DataHandle
+from data_processing import load_data
+from downsample import downsample_series, lttb_indices
+from figure_cache import FigureCache
+from slice_cache import SliceCache
+
+
+def statement(days, seed=0):
+    """A processed statement frame with a few rows on each of ``days``, in the Merge_Proccessed.csv schema."""
+    rng = np.random.default_rng(seed)
+    records = []
+    for number, day in enumerate(np.repeat(pd.to_datetime(days), 2)):
+        debit = float(rng.integers(0, 500)) if number % 3 else 0.0
+        credit = 0.0 if debit else float(rng.integers(100, 1000))
+        records.append({
+            'Transaction_Date': day,
+            'Description': f"TRANSFER-UPI/{number}",
+            'Reference No./Cheque No.': f"REF{number:06d}",
+            'Debit': debit,
+            'Credit': credit,
+            'Balance': 0.0,
+            'Transaction_Type': 'TO' if debit else 'BY',
+            'Transaction_Mode': 'UPI',
+            'DR/CR_Indicator': 'DR' if debit else 'CR',
+            'Transaction_ID': f"{number:012d}",
+            'Recipient_Name': f"RECIPIENT {number % 4}",
+            'Bank': 'HDFC',
+            'UPI_ID': f"upi{number % 4}",
+            'Note': 'UPI',
+        })
+    return pd.DataFrame.from_records(records)
+
+
+class TempDirTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix='spendwise-dashboard-test-')
+        self.addCleanup(shutil.rmtree, self.tmpdir, ignore_errors=True)
+
+    def load(self, df, name='statement.csv'):
+        path = os.path.join(self.tmpdir, name)
+        df.to_csv(path, index=False)
+        return load_data(path)
+
+
+class SliceCacheTests(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        days = pd.date_range('2023-11-20', '2024-02-10', freq='3D')
+        # Written out of order; load_data sorts by date
+        self.df = self.load(statement(days).sample(frac=1, random_state=1))
+
+    def expected(self, start_date, end_date):
+        df = self.df
+        return df[(df['Transaction_Date'] >= start_date) & (df['Transaction_Date'] <= end_date)]
+
+    def test_date_range_matches_a_boolean_filter(self):
+        slices = SliceCache(self.df)
+        for start_date, end_date in [
+            ('2023-11-20', '2024-02-10'),  # everything
+            ('2023-12-01', '2023-12-31'),  # bounds between transaction days
+            ('2023-11-23', '2023-11-23'),  # a single day
+            ('2023-01-01', '2023-02-01'),  # before the statement
+            ('2024-06-01', '2024-07-01'),  # after it
+            ('2024-01-31', '2024-01-01'),  # reversed
+        ]:
+            with self.subTest(start_date=start_date, end_date=end_date):
+                self.assertTrue(slices.date_range(start_date, end_date).equals(self.expected(start_date, end_date)))
+
+    def test_repeated_filters_are_served_from_the_cache(self):
+        slices = SliceCache(self.df)
+        first = slices.date_range('2023-12-01', '2023-12-31')
+        self.assertIs(slices.date_range('2023-12-01', '2023-12-31'), first)
+        self.assertEqual((slices.stats()['hits'], slices.stats()['misses']), (1, 1))
+
+    def test_aggregates_are_shared_between_caches_of_one_version(self):
+        import diskcache
+
+        shared = diskcache.Cache(os.path.join(self.tmpdir, 'shared'))
+        self.addCleanup(shared.close)
+        worker = SliceCache(self.df, version='v1', shared=shared)
+        daily = worker.daily_debit('2023-12-01', '2023-12-31')
+
+        server = SliceCache(self.df, version='v1', shared=shared)
+        self.assertTrue(server.daily_debit('2023-12-01', '2023-12-31').equals(daily))
+        self.assertEqual(server.stats()['shared_hits'], 1)
+        self.assertTrue(daily.equals(self.expected('2023-12-01', '2023-12-31').groupby('Transaction_Date')['Debit'].sum()))
+
+        # Another data version, or no explicit version, computes its own
+        other = SliceCache(self.df, version='v2', shared=shared)
+        other.daily_debit('2023-12-01', '2023-12-31')
+        self.assertEqual(other.stats()['shared_hits'], 0)
+        self.assertIsNone(SliceCache(self.df, shared=shared).shared)
+
+
+class FigureCacheTests(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.version = 'v1'
+        self.figures = FigureCache(lambda: self.version, directory=os.path.join(self.tmpdir, 'figures'))
+        self.addCleanup(self.figures._cache.close)
+        self.calls = []
+
+        @self.figures.memoize
+        def update_yearly_summary(selected_year, version=None):
+            self.calls.append(selected_year)
+            return {'data': [selected_year]} if selected_year else {}
+
+        self.callback = update_yearly_summary
+
+    def test_the_version_input_is_not_part_of_the_key(self):
+        # None on first load, the version string afterwards: one figure either way
+        self.assertEqual(self.callback(2024, None), {'data': [2024]})
+        self.assertEqual(self.callback(2024, 'v1'), {'data': [2024]})
+        self.assertEqual(self.callback(2024), {'data': [2024]})
+        self.assertEqual(self.calls, [2024])
+        self.assertEqual(self.figures.stats()['entries'], 1)
+
+    def test_inputs_and_the_data_version_are_part_of_the_key(self):
+        self.callback(2024)
+        self.callback(2023)
+        self.version = 'v2'
+        self.callback(2024)
+        self.assertEqual(self.calls, [2024, 2023, 2024])
+
+    def test_empty_figures_are_not_cached(self):
+        self.callback(None)
+        self.callback(None)
+        self.assertEqual(self.calls, [None, None])
+        self.assertEqual(self.figures.stats()['entries'], 0)
+
+    def test_a_zero_size_limit_disables_caching(self):
+        def callback(selected_year, version=None):
+            return {}
+
+        self.assertIs(FigureCache('v1', size_limit=0).memoize(callback), callback)
+
+
+class LTTBTests(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.x = np.arange(1000)
+        self.y = rng.normal(size=1000).cumsum()
+        self.y[437] = 500.0  # a spike that must survive
+
+    def test_keeps_the_endpoints_and_threshold_points_in_order(self):
+        for threshold in (3, 10, 200, 999):
+            with self.subTest(threshold=threshold):
+                kept = lttb_indices(self.x, self.y, threshold)
+                self.assertEqual(len(kept), threshold)
+                self.assertEqual((kept[0], kept[-1]), (0, len(self.x) - 1))
+                self.assertTrue(np.all(np.diff(kept) > 0))
+
+    def test_peaks_survive(self):
+        self.assertIn(437, lttb_indices(self.x, self.y, 50))
+
+    def test_short_series_and_tiny_thresholds(self):
+        self.assertEqual(lttb_indices(self.x, self.y, 1000).tolist(), list(range(1000)))
+        self.assertEqual(lttb_indices(self.x[:2], self.y[:2], 1).tolist(), [0, 1])
+        self.assertEqual(len(lttb_indices(self.x, self.y, 1)), 3)
+
+    def test_date_indexed_series(self):
+        series = pd.Series(self.y, index=pd.date_range('2020-01-01', periods=len(self.y)))
+        reduced = downsample_series(series, 100)
+        self.assertEqual(len(reduced), 100)
+        self.assertEqual((reduced.index[0], reduced.index[-1]), (series.index[0], series.index[-1]))
+        self.assertTrue(reduced.equals(series.loc[reduced.index]))
+
+
+class CategoryRollupsTests(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        size = 400
+        categories = {'Food': ['Groceries', 'Dining'], 'Travel': ['Taxi'], 'Bills': ['Power', 'Phone']}
+        category = rng.choice(list(categories), size)
+        self.df = pd.DataFrame({
+            'Transaction_Date': pd.Timestamp('2023-10-01') + pd.to_timedelta(rng.integers(0, 150, size), unit='D'),
+            'Transaction_Category': category,
+            'Sub_Category': [rng.choice(categories[c]) for c in category],
+            'Amount_Spent': rng.integers(0, 1000, size).astype(float),
+        })
+        self.df['Date'] = self.df['Transaction_Date'].dt.normalize()
+        self.rollups = CategoryRollups(self.df)
+        self.ranges = [
+            (None, None),
+            ('2023-10-15', '2023-12-31'),
+            ('2023-11-05', '2023-11-05'),
+            ('2024-01-10', '2024-06-01'),
+            ('2022-01-01', '2022-12-31'),
+        ]
+
+    def filtered(self, start_date, end_date):
+        df = self.df
+        if start_date:
+            df = df[df['Date'] >= start_date]
+        if end_date:
+            df = df[df['Date'] <= end_date]
+        return df
+
+    def test_summaries_match_a_pandas_groupby(self):
+        for start_date, end_date in self.ranges:
+            with self.subTest(start_date=start_date, end_date=end_date):
+                df = self.filtered(start_date, end_date)
+
+                expected = df.groupby(['Transaction_Category', 'Sub_Category'], as_index=False)['Amount_Spent'].sum()
+                expected = expected[expected['Amount_Spent'] > 0].reset_index(drop=True)
+                pd.testing.assert_frame_equal(
+                    self.rollups.subcategory_summary(start_date, end_date).reset_index(drop=True), expected)
+
+                expected = df.groupby('Transaction_Category', as_index=False)['Amount_Spent'].sum()
+                expected = expected[expected['Amount_Spent'] > 0].reset_index(drop=True)
+                pd.testing.assert_frame_equal(
+                    self.rollups.category_summary(start_date, end_date).reset_index(drop=True), expected)
+
+    def test_monthly_summary_matches_a_pandas_groupby(self):
+        for start_date, end_date in self.ranges:
+            with self.subTest(start_date=start_date, end_date=end_date):
+                df = self.filtered(start_date, end_date)
+                expected = df.groupby(df['Date'].dt.to_period('M'))['Amount_Spent'].sum()
+                monthly = self.rollups.monthly_summary(start_date, end_date)
+                self.assertEqual(list(monthly['Month']), [month.strftime('%b %Y') for month in expected.index])
+                np.testing.assert_allclose(monthly['Amount_Spent'].to_numpy(dtype=float), expected.to_numpy())
+
+
+class DataHandleTests(TempDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.tmpdir, 'statement.csv')
+        self.loads = 0
+
+        def load(path):
+            self.loads += 1
+            df = load_data(path)
+            return (df, f"v{self.loads}") if df is not None else None
+
+        statement(['2024-01-01', '2024-01-02']).to_csv(self.path, index=False)
+        self.handle = DataHandle.from_file(self.path, load)
+
+    def test_a_changed_file_is_swapped_in_and_pinned_callbacks_keep_their_snapshot(self):
+        swaps = []
+        self.handle.on_swap(lambda old, new: swaps.append((old.version, new.version)))
+
+        @self.handle.pin
+        def callback():
+            before = self.handle.current()
+            statement(['2024-01-01', '2024-01-02', '2024-01-03']).to_csv(self.path, index=False)
+            self.assertTrue(self.handle.reload(force=True))
+            # Still the snapshot the callback started with
+            self.assertIs(self.handle.current(), before)
+            return len(self.handle.slices.df)
+
+        self.assertEqual(callback(), 4)
+        self.assertEqual(swaps, [('v1', 'v2')])
+        self.assertEqual(len(self.handle.current().df), 6)
+        self.assertEqual(self.handle.slices.version, 'v2')
+
+    def test_an_unchanged_or_unreadable_file_keeps_the_current_snapshot(self):
+        snapshot = self.handle.current()
+        self.assertFalse(self.handle.reload())
+        with open(self.path, 'w') as f:
+            f.write('not a statement\n')
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            self.assertFalse(self.handle.reload(force=True))
+        self.assertIn('still serving version v1', output.getvalue())
+        self.assertIs(self.handle.current(), snapshot)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,11 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Transaction
+
+
+@admin.register(Transaction)
+class TransactionAdmin(admin.ModelAdmin):
+    list_display = ('transaction_date', 'transaction_type', 'transaction_mode', 'recipient_name', 'debit', 'credit', 'balance')
+    list_filter = ('transaction_type', 'transaction_mode')
+    search_fields = ('recipient_name', 'description', 'upi_id')
+    date_hierarchy = 'transaction_date'
@@ -0,0 +1,181 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.utils.http import parse_etags
+
+from .cache import LRUCache
+from .metrics import timed
+from .models import DEFAULT_ACCOUNT
+from .store import get_transaction_store
+
+# Analytics payloads keyed by (account, data version, start_date, end_date)
+analytics_cache = LRUCache(maxsize=settings.ANALYTICS_CACHE_SIZE)
+
+
+def parse_date_range(start_date, end_date):
+    """
+    Normalise the start_date/end_date query parameters.
+
+    The range only applies when both ends are given; otherwise the whole
+    history is used and (None, None) is returned.
+    """
+    if start_date and end_date:
+        return pd.to_datetime(start_date), pd.to_datetime(end_date)
+    return None, None
+
+
+def build_dashboard_analytics(snapshot, start_date=None, end_date=None):
+    """
+    Compute the dashboard analytics payload for an account's snapshot and date range.
+
+    Every section is read from the same snapshot, which the ingest command and
+    model signals rebuild from the database, so the payload is always one
+    consistent version and the snapshot's version is a valid cache key.
+    """
+    return build_batch_analytics(snapshot, {None: (start_date, end_date)})[None]
+
+
+def savings_goal(total_credit, total_debit):
+    total_savings = total_credit - total_debit
+    savings_target = 10000  # This could be made dynamic based on user preferences
+    savings_progress = (total_savings / savings_target * 100) if savings_target > 0 else 0
+    return {
+        'current': float(total_savings),
+        'target': float(savings_target),
+        'progress': float(savings_progress)
+    }
+
+
+# Sections a batch request may ask for, matching the single-range payload keys
+BATCH_SECTIONS = ('summary', 'monthly_analysis', 'category_analysis', 'recent_transactions', 'savings_goal')
+
+
+def build_batch_analytics(snapshot, ranges, sections=BATCH_SECTIONS):
+    """
+    Compute analytics sections for several date ranges of one snapshot.
+
+    ``ranges`` maps a caller-chosen key to a (start_date, end_date) pair.
+    Every section is read from the snapshot's shared daily rollup, or for
+    recent transactions from a slice of the date-sorted frame, so a range
+    costs a few binary searches and small array differences rather than a
+    scan of the transactions.
+    """
+    # Formatted once for every month in the snapshot, then indexed per range
+    month_labels = pd.DatetimeIndex(snapshot.rollup.months).strftime('%b %Y').to_numpy()
+    recent_rows = _RecentRows(snapshot) if 'recent_transactions' in sections else None
+    results = {}
+    for key, (start_date, end_date) in ranges.items():
+        result = {}
+        if 'summary' in sections or 'savings_goal' in sections:
+            with timed('summary'):
+                total_credit, total_debit, total_transactions = snapshot.rollup.summarize(start_date, end_date)
+        if 'summary' in sections:
+            result['summary'] = {
+                'total_transactions': total_transactions,
+                'total_credit': total_credit,
+                'total_debit': total_debit,
+                'current_balance': total_credit - total_debit,
+            }
+        if 'monthly_analysis' in sections:
+            with timed('monthly'):
+                months, credit, debit = snapshot.rollup.monthly(start_date, end_date)
+                labels = month_labels[np.searchsorted(snapshot.rollup.months, months)]
+                result['monthly_analysis'] = [
+                    {'month': month, 'total_credit': month_credit, 'total_debit': month_debit}
+                    for month, month_credit, month_debit in zip(labels.tolist(), credit.tolist(), debit.tolist())
+                ]
+        if 'category_analysis' in sections:
+            with timed('category'):
+                types, debit = snapshot.rollup.by_type(start_date, end_date)
+                result['category_analysis'] = [
+                    {'Transaction_Type': transaction_type, 'Debit': type_debit}
+                    for transaction_type, type_debit in zip(types.tolist(), debit.tolist())
+                ]
+        if 'recent_transactions' in sections:
+            with timed('recent'):
+                result['recent_transactions'] = recent_rows.between(start_date, end_date)
+        if 'savings_goal' in sections:
+            result['savings_goal'] = savings_goal(total_credit, total_debit)
+        results[key] = result
+    return results
+
+
+class _RecentRows:
+    """
+    Newest transactions of a date range, read positionally from the snapshot.
+
+    The frame is sorted by (date, id), so the newest rows of a range are the
+    last positions of its slice. Columns are pulled out once per batch and
+    each range only indexes a handful of positions.
+    """
+
+    def __init__(self, snapshot, limit=5):
+        frame = snapshot.frame
+        self.date_index = snapshot.date_index
+        self.limit = limit
+        self.ids = frame.index.to_numpy()
+        self.dates = frame['Transaction_Date'].to_numpy(dtype='datetime64[ns]')
+        self.recipients = frame['Recipient_Name'].to_numpy()
+        self.types = frame['Transaction_Type'].to_numpy()
+        self.debit = frame['Debit'].to_numpy(dtype='float64')
+        self.credit = frame['Credit'].to_numpy(dtype='float64')
+
+    def between(self, start_date=None, end_date=None):
+        lo, hi = self.date_index.bounds(start_date, end_date)
+        positions = np.arange(hi - 1, max(lo, hi - self.limit) - 1, -1)
+        recipients = [
+            # Fallback to Transaction_Type if Recipient_Name is empty
+            name if isinstance(name, str) and name.strip() else transaction_type
+            for name, transaction_type in zip(self.recipients[positions], self.types[positions])
+        ]
+        return [
+            {
+                'transaction_id': str(transaction_id),
+                'transaction_date': transaction_date,
+                'recipient_name': recipient_name,
+                'debit': debit,
+                'credit': credit,
+            }
+            for transaction_id, transaction_date, recipient_name, debit, credit in zip(
+                self.ids[positions].tolist(),
+                np.datetime_as_string(self.dates[positions], unit='D').tolist(),
+                recipients,
+                np.nan_to_num(self.debit[positions]).tolist(),
+                np.nan_to_num(self.credit[positions]).tolist(),
+            )
+        ]
+
+
+def analytics_etag(*parts):
+    # The payload is a pure function of the data version and date range, so a
+    # digest of those is a valid strong validator for a given representation
+    digest = hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def get_dashboard_analytics(start_date=None, end_date=None, account=DEFAULT_ACCOUNT,
+                            representation='json', if_none_match=None):
+    """
+    Resolve an account's analytics payload for a date range through the
+    response cache.
+
+    Returns (etag, payload). payload is None when if_none_match already names
+    the current etag, in which case nothing is computed.
+    """
+    # Shared, read-only frame; parsed once per partition file version
+    with timed('snapshot'):
+        snapshot = get_transaction_store().snapshot(account)
+    cache_key = (account, snapshot.version, start_date, end_date)
+    etag = analytics_etag(*cache_key, representation)
+
+    if if_none_match and etag in parse_etags(if_none_match):
+        return etag, None
+
+    with timed('cache'):
+        payload = analytics_cache.get(cache_key)
+    if payload is None:
+        payload = build_dashboard_analytics(snapshot, start_date, end_date)
+        analytics_cache.set(cache_key, payload)
+    return etag, payload
@@ -0,0 +1,122 @@
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, HttpResponseNotAllowed, HttpResponseNotModified, JsonResponse
+
+from ..analytics import get_dashboard_analytics, parse_date_range
+from ..executor import PoolSaturated, analytics_executor
+from ..store import AccountForbidden, UnknownAccount
+from ..voice import get_voice_manager
+from .renderers import dumps
+from .views import request_account, voice_owner
+
+logger = logging.getLogger(__name__)
+
+# Async counterparts of the views in views.py for ASGI deployments. Blocking
+# work runs on bounded thread pools so the event loop stays free for cheap
+# requests such as voice status checks.
+
+
+def _saturated(e):
+    logger.warning(f"Rejecting request, worker pool saturated: {str(e)}")
+    response = JsonResponse({
+        'error': 'Server busy',
+        'detail': 'Too many requests are being processed. Please retry shortly.'
+    }, status=503)
+    response['Retry-After'] = '1'
+    return response
+
+
+async def dashboard_analytics(request):
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    try:
+        start_date, end_date = parse_date_range(request.GET.get('start_date'), request.GET.get('end_date'))
+        # Resolving request.user may query the session and user tables
+        account = await sync_to_async(request_account)(request, request.GET.get('account'))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    except AccountForbidden as e:
+        return JsonResponse({'error': str(e)}, status=403)
+
+    try:
+        etag, response_data = await analytics_executor.run(
+            get_dashboard_analytics, start_date, end_date, account,
+            if_none_match=request.headers.get('If-None-Match'),
+        )
+        headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+        if response_data is None:
+            return HttpResponseNotModified(headers=headers)
+        return HttpResponse(dumps(response_data), content_type='application/json', headers=headers)
+    except PoolSaturated as e:
+        return _saturated(e)
+    except UnknownAccount as e:
+        return JsonResponse({'error': str(e)}, status=404)
+    except Exception as e:
+        logger.error(f"Error in dashboard analytics: {str(e)}", exc_info=True)
+        return JsonResponse({
+            'error': 'Failed to fetch dashboard analytics',
+            'detail': str(e)
+        }, status=500)
+
+
+async def start_voice_assistant(request):
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    try:
+        # Only records the session and queues the connect on the voice pool
+        owner = await sync_to_async(voice_owner)(request)
+        session = get_voice_manager().start(owner)
+        return JsonResponse(session.to_dict(), status=202)
+    except PoolSaturated as e:
+        return _saturated(e)
+    except Exception as e:
+        logger.error(f"Error starting voice assistant: {str(e)}", exc_info=True)
+        return JsonResponse({
+            'error': str(e),
+            'detail': 'Failed to start voice assistant. Please check the configuration.'
+        }, status=500)
+
+
+async def stop_voice_assistant(request):
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    try:
+        owner = await sync_to_async(voice_owner)(request)
+        manager = get_voice_manager()
+        session = manager.get(owner, _json_body(request).get('session_id'))
+        if session is None:
+            return JsonResponse({'error': 'Voice assistant not initialized'}, status=400)
+        return JsonResponse(manager.stop(session).to_dict(), status=202)
+    except PoolSaturated as e:
+        return _saturated(e)
+    except ValueError as e:
+        return JsonResponse({'error': f"Invalid request body: {str(e)}"}, status=400)
+    except Exception as e:
+        logger.error(f"Error stopping voice assistant: {str(e)}", exc_info=True)
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+async def get_voice_status(request):
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    # Session lookup reads in-process state only, so it is answered on the event loop
+    owner = await sync_to_async(voice_owner)(request)
+    session = get_voice_manager().get(owner, request.GET.get('session_id'))
+    if session is None:
+        return JsonResponse({'is_active': False})
+    return JsonResponse(session.to_dict())
+
+
+def _json_body(request):
+    if not request.body:
+        return {}
+    body = json.loads(request.body)
+    return body if isinstance(body, dict) else {}
+
+
+# Matches the DRF function views, which are CSRF exempt. Set directly because
+# Django 4.2's csrf_exempt wraps views in a sync function.
+start_voice_assistant.csrf_exempt = True
+stop_voice_assistant.csrf_exempt = True
@@ -0,0 +1,21 @@
+import base64
+import json
+from datetime import date
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(transaction_date, pk):
+    payload = json.dumps([transaction_date.isoformat(), pk], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        transaction_date, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return date.fromisoformat(transaction_date), int(pk)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
@@ -0,0 +1,49 @@
+import datetime
+import decimal
+
+import numpy as np
+import orjson
+import pandas as pd
+from rest_framework.renderers import BaseRenderer
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    # orjson handles str/int/float/dict/list, datetime/date and NumPy scalars and
+    # arrays natively; this only covers the remaining types our payloads carry
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, datetime.timedelta):
+        return obj.total_seconds()
+    if obj is pd.NaT or obj is pd.NA:
+        return None
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(data, indent=False):
+    options = ORJSON_OPTIONS | orjson.OPT_INDENT_2 if indent else ORJSON_OPTIONS
+    return orjson.dumps(data, default=_default, option=options)
+
+
+class ORJSONRenderer(BaseRenderer):
+    """JSON renderer built on orjson, with native NumPy scalar and datetime support."""
+
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = False
+        if accepted_media_type:
+            # Honour "application/json; indent=N" like DRF's JSONRenderer
+            indent = 'indent=' in accepted_media_type
+        return dumps(data, indent=indent)
@@ -1,8 +1,26 @@
 from rest_framework import serializers
 
+from ..models import Transaction
+
 class DashboardDataSerializer(serializers.Serializer):
     summary = serializers.DictField()
     monthly_analysis = serializers.ListField()
     category_analysis = serializers.ListField()
     recent_transactions = serializers.ListField()
     savings_goal = serializers.DictField()
+
+
+class TransactionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Transaction
+        fields = [
+            'id', 'transaction_date', 'description', 'reference_no', 'debit', 'credit', 'balance',
+            'transaction_type', 'transaction_mode', 'dr_cr_indicator', 'transaction_id',
+            'recipient_name', 'bank', 'upi_id', 'note',
+        ]
+        # Amounts as JSON numbers, matching the analytics endpoint
+        extra_kwargs = {
+            'debit': {'coerce_to_string': False},
+            'credit': {'coerce_to_string': False},
+            'balance': {'coerce_to_string': False},
+        }
@@ -0,0 +1,14 @@
+from django.urls import path
+from .views import (
+    TransactionListView,
+    export_transactions,
+    upload_transactions,
+    get_transaction_summary,
+)
+
+urlpatterns = [
+    path('', TransactionListView.as_view(), name='transaction-list'),
+    path('export/', export_transactions, name='transaction-export'),
+    path('ingest/', upload_transactions, name='transaction-ingest'),
+    path('summary/', get_transaction_summary, name='transaction-summary'),
+]
@@ -1,14 +1,26 @@
 from django.urls import path
 from .views import (
     DashboardAnalyticsView,
+    BatchAnalyticsView,
     start_voice_assistant,
     stop_voice_assistant,
     get_voice_status,
+    get_partition_stats,
+    answer_voice_query,
 )
+from . import async_views
 
 urlpatterns = [
     path('analytics/', DashboardAnalyticsView.as_view(), name='dashboard-analytics'),
+    path('analytics/batch/', BatchAnalyticsView.as_view(), name='batch-analytics'),
+    path('partitions/', get_partition_stats, name='partition-stats'),
     path('voice/start/', start_voice_assistant, name='start-voice-assistant'),
     path('voice/stop/', stop_voice_assistant, name='stop-voice-assistant'),
     path('voice/status/', get_voice_status, name='voice-status'),
+    path('voice/query/', answer_voice_query, name='voice-query'),
+    # Async variants for ASGI servers (daphne/uvicorn)
+    path('async/analytics/', async_views.dashboard_analytics, name='async-dashboard-analytics'),
+    path('async/voice/start/', async_views.start_voice_assistant, name='async-start-voice-assistant'),
+    path('async/voice/stop/', async_views.stop_voice_assistant, name='async-stop-voice-assistant'),
+    path('async/voice/status/', async_views.get_voice_status, name='async-voice-status'),
 ]
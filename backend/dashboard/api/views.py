@@ -1,98 +1,81 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-import pandas as pd
-from datetime import datetime
-from collections import defaultdict
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, parser_classes, permission_classes
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
-from vapi_python import Vapi
 import os
 import json
 import logging
+import tempfile
+from datetime import date
 from dotenv import load_dotenv
+from django.db.models import Q
+from django.http import HttpResponse, StreamingHttpResponse
+from ..analytics import BATCH_SECTIONS, analytics_cache, build_batch_analytics, get_dashboard_analytics, parse_date_range
+from ..executor import PoolSaturated
+from ..ingest import CSV_FIELDS, ingest_statement
+from ..insights import aggregates_cache, answer_query
+from ..metrics import RequestTimings, render_metrics
+from ..models import Transaction
+from ..store import (
+    AccountForbidden, UnknownAccount, authorize_account, clean_account, get_transaction_store,
+    read_transactions, user_account,
+)
+from ..voice import get_voice_manager
+from .pagination import decode_cursor, encode_cursor
+from .renderers import dumps
+from .serializers import TransactionSerializer
 
 # Load environment variables
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+
+def request_account(request, account):
+    """
+    The account named by a request parameter (DEFAULT_ACCOUNT if empty), once
+    the requesting user is allowed to read it. Raises ValueError for an
+    invalid name and AccountForbidden for someone else's account.
+    """
+    return authorize_account(request.user, clean_account(account))
+
+
+def _forbidden(e):
+    return Response({'error': str(e)}, status=status.HTTP_403_FORBIDDEN)
+
+
 class DashboardAnalyticsView(APIView):
     def get(self, request):
+        # Per-stage durations, sent back in a Server-Timing header
+        timings = RequestTimings('dashboard_analytics')
         try:
             # Get date parameters
-            start_date = request.query_params.get('start_date')
-            end_date = request.query_params.get('end_date')
-
-            # Read the CSV file
-            df = pd.read_csv('csvs/Merge_Proccessed.csv')
-            df['Transaction_Date'] = pd.to_datetime(df['Transaction_Date'])
-
-            # Filter data based on date range if provided
-            if start_date and end_date:
-                start_date = pd.to_datetime(start_date)
-                end_date = pd.to_datetime(end_date)
-                df = df[(df['Transaction_Date'] >= start_date) & (df['Transaction_Date'] <= end_date)]
-
-            # Calculate summary
-            total_credit = df['Credit'].sum()
-            total_debit = df['Debit'].sum()
-            current_balance = total_credit - total_debit
-            total_transactions = len(df)
-
-            # Monthly analysis
-            monthly_data = df.groupby(df['Transaction_Date'].dt.strftime('%b %Y')).agg({
-                'Credit': 'sum',
-                'Debit': 'sum'
-            }).reset_index()
-            
-            monthly_analysis = []
-            for _, row in monthly_data.iterrows():
-                monthly_analysis.append({
-                    'month': row['Transaction_Date'],
-                    'total_credit': float(row['Credit']),
-                    'total_debit': float(row['Debit'])
-                })
-
-            # Category analysis
-            category_analysis = df.groupby('Transaction_Type')['Debit'].sum().reset_index()
-            
-            # Get recent transactions
-            recent_transactions = df.sort_values('Transaction_Date', ascending=False).head(5)
-            recent_transactions_list = []
-            for _, row in recent_transactions.iterrows():
-                # Get recipient name, fallback to Transaction_Type if Recipient_Name is empty
-                recipient = row['Recipient_Name'] if pd.notna(row['Recipient_Name']) and row['Recipient_Name'].strip() else row['Transaction_Type']
-                recent_transactions_list.append({
-                    'transaction_id': str(row.name),
-                    'transaction_date': row['Transaction_Date'].strftime('%Y-%m-%d'),
-                    'recipient_name': recipient,
-                    'debit': float(row['Debit']),
-                    'credit': float(row['Credit'])
-                })
-
-            # Calculate savings goal
-            total_savings = total_credit - total_debit
-            savings_target = 10000  # This could be made dynamic based on user preferences
-            savings_progress = (total_savings / savings_target * 100) if savings_target > 0 else 0
-
-            response_data = {
-                'summary': {
-                    'total_transactions': total_transactions,
-                    'total_credit': float(total_credit),
-                    'total_debit': float(total_debit),
-                    'current_balance': float(current_balance)
-                },
-                'monthly_analysis': monthly_analysis,
-                'category_analysis': category_analysis.to_dict('records'),
-                'recent_transactions': recent_transactions_list,
-                'savings_goal': {
-                    'current': float(total_savings),
-                    'target': float(savings_target),
-                    'progress': float(savings_progress)
-                }
-            }
-
-            return Response(response_data)
+            start_date, end_date = parse_date_range(
+                request.query_params.get('start_date'),
+                request.query_params.get('end_date'),
+            )
+            account = request_account(request, request.query_params.get('account'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except AccountForbidden as e:
+            return _forbidden(e)
+
+        try:
+            with timings.activate():
+                etag, response_data = get_dashboard_analytics(
+                    start_date, end_date, account,
+                    representation=request.accepted_renderer.format,
+                    if_none_match=request.headers.get('If-None-Match'),
+                )
+            headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+            if response_data is None:
+                return timings.attach(Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers))
+
+            return timings.attach(Response(response_data, headers=headers))
+        except UnknownAccount as e:
+            return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             logger.error(f"Error in dashboard analytics: {str(e)}", exc_info=True)
             return Response({
@@ -100,56 +83,304 @@ class DashboardAnalyticsView(APIView):
                 'detail': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-# Voice Assistant Configuration
-VAPI_API_KEY = os.getenv('VAPI_API_KEY')
-VAPI_ASSISTANT_ID = os.getenv('VAPI_ASSISTANT_ID')
+MAX_BATCH_RANGES = 100
+
+
+def parse_batch_request(data):
+    """Validate a batch analytics body into (account, {key: (start, end)}, sections)."""
+    if not isinstance(data, dict):
+        raise ValueError("Request body must be a JSON object")
+    account = clean_account(data.get('account'))
+
+    sections = data.get('sections')
+    if sections is not None and not isinstance(sections, list):
+        raise ValueError(f"sections must be a list of section names: {', '.join(BATCH_SECTIONS)}")
+    sections = sections or list(BATCH_SECTIONS)
+    unknown = [section for section in sections if section not in BATCH_SECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown sections: {', '.join(map(str, unknown))}")
+
+    items = data.get('ranges')
+    if not isinstance(items, list) or not items:
+        raise ValueError("ranges must be a non-empty list")
+    if len(items) > MAX_BATCH_RANGES:
+        raise ValueError(f"At most {MAX_BATCH_RANGES} ranges per request")
+
+    ranges = {}
+    for item in items:
+        if not isinstance(item, dict):
+            raise ValueError("Each range must be an object with start_date and end_date")
+        start, end = item.get('start_date'), item.get('end_date')
+        key = str(item.get('key') or (f"{start}..{end}" if start and end else 'all'))
+        if key in ranges:
+            raise ValueError(f"Duplicate range key: {key}")
+        ranges[key] = parse_date_range(start, end)
+    return account, ranges, sections
+
+
+class BatchAnalyticsView(APIView):
+    """
+    Analytics for several date ranges in one request.
+
+    POST ``{"account": ..., "sections": [...], "ranges": [{"key": ...,
+    "start_date": ..., "end_date": ...}, ...]}``. Results are keyed by each
+    range's ``key``, defaulting to ``"<start_date>..<end_date>"``. All ranges
+    are answered from one snapshot's shared rollups.
+    """
+
+    def post(self, request):
+        try:
+            account, ranges, sections = parse_batch_request(request.data)
+            account = authorize_account(request.user, account)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except AccountForbidden as e:
+            return _forbidden(e)
+
+        try:
+            snapshot = get_transaction_store().snapshot(account)
+            return Response({'results': build_batch_analytics(snapshot, ranges, sections)})
+        except UnknownAccount as e:
+            return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            logger.error(f"Error in batch analytics: {str(e)}", exc_info=True)
+            return Response({
+                'error': 'Failed to fetch dashboard analytics',
+                'detail': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+TRANSACTION_PAGE_SIZE = 50
+MAX_TRANSACTION_PAGE_SIZE = 500
+EXPORT_CHUNK_SIZE = 2000
+
+
+def transaction_queryset(request):
+    """The requested account's transactions, with the list filters from the query string applied."""
+    params = request.query_params
+    transactions = Transaction.objects.filter(account=request_account(request, params.get('account')))
+    if params.get('start_date'):
+        transactions = transactions.filter(transaction_date__gte=date.fromisoformat(params['start_date']))
+    if params.get('end_date'):
+        transactions = transactions.filter(transaction_date__lte=date.fromisoformat(params['end_date']))
+    if params.get('transaction_type'):
+        transactions = transactions.filter(transaction_type=params['transaction_type'])
+    if params.get('transaction_mode'):
+        transactions = transactions.filter(transaction_mode=params['transaction_mode'])
+    if params.get('recipient'):
+        transactions = transactions.filter(recipient_name=params['recipient'])
+    # Newest first; (transaction_date, id) is unique and indexed, which is what
+    # makes keyset pagination possible
+    return transactions.order_by('-transaction_date', '-id')
+
+
+class TransactionListView(APIView):
+    """
+    Keyset-paginated transactions, newest first.
+
+    Pass the returned ``next_cursor`` as ``cursor`` to get the following page.
+    Each page is one indexed range scan, however deep into the history it is.
+    """
+
+    def get(self, request):
+        try:
+            params = request.query_params
+            page_size = min(int(params.get('page_size', TRANSACTION_PAGE_SIZE)), MAX_TRANSACTION_PAGE_SIZE)
+            if page_size < 1:
+                raise ValueError("page_size must be positive")
+            transactions = transaction_queryset(request)
+            if params.get('cursor'):
+                cursor_date, cursor_id = decode_cursor(params['cursor'])
+                transactions = transactions.filter(
+                    Q(transaction_date__lt=cursor_date) | Q(transaction_date=cursor_date, id__lt=cursor_id)
+                )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except AccountForbidden as e:
+            return _forbidden(e)
+
+        try:
+            # One extra row tells us whether another page exists
+            page = list(transactions[:page_size + 1])
+            has_next = len(page) > page_size
+            page = page[:page_size]
+
+            next_cursor = None
+            next_url = None
+            if has_next:
+                next_cursor = encode_cursor(page[-1].transaction_date, page[-1].id)
+                query = params.copy()
+                query['cursor'] = next_cursor
+                next_url = request.build_absolute_uri(f"{request.path}?{query.urlencode()}")
+
+            return Response({
+                'results': TransactionSerializer(page, many=True).data,
+                'next_cursor': next_cursor,
+                'next': next_url,
+            })
+        except Exception as e:
+            logger.error(f"Error listing transactions: {str(e)}", exc_info=True)
+            return Response({
+                'error': 'Failed to fetch transactions',
+                'detail': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def _ndjson_lines(transactions):
+    fields = TransactionSerializer.Meta.fields
+    lines = []
+    for row in transactions.values(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        lines.append(dumps(row))
+        if len(lines) == EXPORT_CHUNK_SIZE:
+            yield b'\n'.join(lines) + b'\n'
+            lines = []
+    if lines:
+        yield b'\n'.join(lines) + b'\n'
+
+
+@api_view(['GET'])
+def export_transactions(request):
+    """Stream every matching transaction as newline-delimited JSON."""
+    try:
+        transactions = transaction_queryset(request)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except AccountForbidden as e:
+        return _forbidden(e)
+
+    # Rows are fetched in chunks with a database-side iterator and written out
+    # as they arrive, so memory stays flat regardless of history length
+    response = StreamingHttpResponse(_ndjson_lines(transactions), content_type='application/x-ndjson')
+    response['Content-Disposition'] = 'attachment; filename="transactions.ndjson"'
+    return response
+
+
+@api_view(['POST'])
+@parser_classes([MultiPartParser])
+@permission_classes([IsAuthenticated])
+def upload_transactions(request):
+    """
+    Ingest an uploaded processed statement (CSV or Arrow IPC) into the
+    signed-in user's account, which is named after their username.
+
+    Rows already stored are skipped. Running in the server process, the
+    resulting delta is pushed to the account's analytics websockets through
+    whichever channel layer is configured, the in-memory one included.
+    """
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({'error': 'Upload a statement as the "file" field'}, status=status.HTTP_400_BAD_REQUEST)
+    account = user_account(request.user)
+    if account is None:
+        return Response({'error': f"Username {request.user.get_username()!r} cannot name an account"},
+                        status=status.HTTP_403_FORBIDDEN)
+
+    suffix = os.path.splitext(upload.name)[1] or '.csv'
+    with tempfile.NamedTemporaryFile(suffix=suffix) as statement_file:
+        for chunk in upload.chunks():
+            statement_file.write(chunk)
+        statement_file.flush()
+        try:
+            df = read_transactions(statement_file.name)
+        except Exception as e:
+            return Response({'error': f"Could not read statement: {e}"}, status=status.HTTP_400_BAD_REQUEST)
+
+    missing = [column for column in CSV_FIELDS if column not in df.columns]
+    if missing:
+        return Response({'error': f"Statement is missing columns: {', '.join(missing)}"},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        created = ingest_statement(df, account=account)
+        return Response({
+            'account': account,
+            'created': len(created),
+            'skipped': len(df) - len(created),
+        }, status=status.HTTP_201_CREATED if len(created) else status.HTTP_200_OK)
+    except Exception as e:
+        logger.error(f"Error ingesting uploaded statement: {str(e)}", exc_info=True)
+        return Response({
+            'error': 'Failed to ingest statement',
+            'detail': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+def get_transaction_summary(request):
+    try:
+        start_date, end_date = parse_date_range(
+            request.query_params.get('start_date'),
+            request.query_params.get('end_date'),
+        )
+        account = request_account(request, request.query_params.get('account'))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except AccountForbidden as e:
+        return _forbidden(e)
+
+    try:
+        snapshot = get_transaction_store().snapshot(account)
+        total_credit, total_debit, total_transactions = snapshot.rollup.summarize(start_date, end_date)
+        return Response({
+            'total_transactions': total_transactions,
+            'total_credit': total_credit,
+            'total_debit': total_debit,
+            'current_balance': total_credit - total_debit,
+        }, status=status.HTTP_200_OK)
+    except UnknownAccount as e:
+        return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        logger.error(f"Error in transaction summary: {str(e)}", exc_info=True)
+        return Response({
+            'error': 'Failed to fetch transaction summary',
+            'detail': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+def get_partition_stats(request):
+    """Resident account partitions and their cache hit/eviction counters."""
+    return Response(get_transaction_store().stats(), status=status.HTTP_200_OK)
+
+
+def prometheus_metrics(request):
+    """Stage latency histograms, cache hit rates and loaded dataset size in Prometheus text format."""
+    partitions = get_transaction_store().stats()
+    body = render_metrics(
+        caches={
+            'analytics': analytics_cache.stats(),
+            'spending_aggregates': aggregates_cache.stats(),
+            'partitions': partitions,
+        },
+        partitions=partitions,
+    )
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
+
+def voice_owner(request):
+    # Voice sessions belong to the signed-in user, or to the browser session
+    # for anonymous clients
+    if request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+    if request.session.session_key is None:
+        request.session.save()
+    return f"session:{request.session.session_key}"
+
+
+def _voice_busy(e):
+    logger.warning(f"Rejecting voice request, worker pool saturated: {str(e)}")
+    return Response({
+        'error': 'Server busy',
+        'detail': 'Too many voice sessions are starting or stopping. Please retry shortly.'
+    }, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '1'})
 
-vapi_instance = None
 
 @api_view(['POST'])
 def start_voice_assistant(request):
-    global vapi_instance
+    """Start a voice session in the background and return its id straight away."""
     try:
-        logger.info("Starting voice assistant...")
-        
-        if not VAPI_API_KEY or not VAPI_ASSISTANT_ID:
-            raise ValueError("Voice assistant configuration is missing")
-        
-        # Reset the instance if it exists to ensure a fresh start
-        if vapi_instance:
-            try:
-                vapi_instance.stop()
-            except:
-                pass
-            vapi_instance = None
-            
-        # Create new instance
-        vapi_instance = Vapi(api_key=VAPI_API_KEY)
-        logger.info("Created new Vapi instance")
-        
-        # Configure callbacks
-        def on_speech_start():
-            logger.info("Speech started")
-            
-        def on_speech_end():
-            logger.info("Speech ended")
-            
-        def on_transcription(text):
-            logger.info(f"Transcription: {text}")
-            
-        def on_response(response):
-            logger.info(f"Assistant response: {response}")
-            
-        vapi_instance.on_speech_start = on_speech_start
-        vapi_instance.on_speech_end = on_speech_end
-        vapi_instance.on_transcription = on_transcription
-        vapi_instance.on_response = on_response
-        
-        logger.info("Starting Vapi with assistant ID...")
-        vapi_instance.start(assistant_id=VAPI_ASSISTANT_ID)
-        logger.info("Vapi started successfully")
-        
-        return Response({'status': 'started'}, status=status.HTTP_200_OK)
+        session = get_voice_manager().start(voice_owner(request))
+        return Response(session.to_dict(), status=status.HTTP_202_ACCEPTED)
+    except PoolSaturated as e:
+        return _voice_busy(e)
     except Exception as e:
         logger.error(f"Error starting voice assistant: {str(e)}", exc_info=True)
         return Response({
@@ -159,31 +390,96 @@ def start_voice_assistant(request):
 
 @api_view(['POST'])
 def stop_voice_assistant(request):
-    global vapi_instance
     try:
-        if vapi_instance:
-            logger.info("Stopping voice assistant...")
-            response = vapi_instance.stop()
-            logger.info("Voice assistant stopped successfully")
-            return Response({
-                'status': 'stopped',
-                'transcription': response.get('transcription', ''),
-                'response': response.get('response', '')
-            }, status=status.HTTP_200_OK)
-        logger.warning("Attempted to stop non-initialized voice assistant")
-        return Response({'error': 'Voice assistant not initialized'}, status=status.HTTP_400_BAD_REQUEST)
+        manager = get_voice_manager()
+        session = manager.get(voice_owner(request), request.data.get('session_id'))
+        if session is None:
+            return Response({'error': 'Voice assistant not initialized'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(manager.stop(session).to_dict(), status=status.HTTP_202_ACCEPTED)
+    except PoolSaturated as e:
+        return _voice_busy(e)
     except Exception as e:
         logger.error(f"Error stopping voice assistant: {str(e)}", exc_info=True)
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 @api_view(['GET'])
 def get_voice_status(request):
-    global vapi_instance
     try:
-        if vapi_instance:
-            is_active = vapi_instance.is_active if hasattr(vapi_instance, 'is_active') else False
-            return Response({'is_active': is_active}, status=status.HTTP_200_OK)
-        return Response({'is_active': False}, status=status.HTTP_200_OK)
+        session = get_voice_manager().get(voice_owner(request), request.query_params.get('session_id'))
+        if session is None:
+            return Response({'is_active': False}, status=status.HTTP_200_OK)
+        return Response(session.to_dict(), status=status.HTTP_200_OK)
     except Exception as e:
         logger.error(f"Error getting voice status: {str(e)}", exc_info=True)
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def _tool_arguments(arguments):
+    # Tool-call arguments arrive either as an object or as a JSON string
+    if isinstance(arguments, str):
+        arguments = json.loads(arguments) if arguments.strip() else {}
+    if not isinstance(arguments, dict):
+        raise ValueError("Tool arguments must be an object")
+    return arguments
+
+
+def _answer_tool_call(call, user, default_account=None):
+    """
+    Result of one Vapi tool call, on an account user may read. A call that
+    fails gets an error result of its own, so the other calls in the batch are
+    still answered.
+    """
+    call_id = call.get('id') if isinstance(call, dict) else None
+    try:
+        if not isinstance(call, dict):
+            raise ValueError("Tool call must be an object")
+        function = call.get('function') or {}
+        arguments = _tool_arguments(function.get('arguments'))
+        account = authorize_account(user, clean_account(arguments.pop('account', None) or default_account))
+        answer = answer_query(function.get('name'), arguments, account)
+        return {'toolCallId': call_id, 'result': answer['speech']}
+    except (ValueError, UnknownAccount, AccountForbidden) as e:
+        error = str(e)
+    except Exception as e:
+        logger.error(f"Error answering voice tool call: {str(e)}", exc_info=True)
+        error = 'Failed to answer voice query'
+    return {'toolCallId': call_id, 'result': f"Error: {error}"}
+
+
+@api_view(['POST'])
+def answer_voice_query(request):
+    """
+    Answer the voice assistant's spending questions from precomputed aggregates.
+
+    Accepts ``{"intent": ..., "parameters": {...}, "account": ...}`` or a Vapi
+    ``tool-calls`` message, where each tool name is an intent and its
+    arguments are the parameters. Tool-call results are the spoken answers.
+    """
+    try:
+        data = request.data if isinstance(request.data, dict) else {}
+        message = data.get('message')
+        if isinstance(message, dict) and message.get('type') == 'tool-calls':
+            default_account = request.query_params.get('account')
+            results = [
+                _answer_tool_call(call, request.user, default_account)
+                for call in message.get('toolCallList') or []
+            ]
+            return Response({'results': results}, status=status.HTTP_200_OK)
+
+        account = request_account(request, data.get('account') or request.query_params.get('account'))
+        parameters = data.get('parameters') or {}
+        if not isinstance(parameters, dict):
+            raise ValueError("parameters must be an object")
+        return Response(answer_query(data.get('intent'), parameters, account), status=status.HTTP_200_OK)
+    except AccountForbidden as e:
+        return _forbidden(e)
+    except UnknownAccount as e:
+        return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        logger.error(f"Error answering voice query: {str(e)}", exc_info=True)
+        return Response({
+            'error': 'Failed to answer voice query',
+            'detail': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,53 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+COLUMNAR_SUFFIXES = ('.arrow', '.feather')
+
+
+def is_columnar(path):
+    return str(path).endswith(COLUMNAR_SUFFIXES)
+
+
+def write_columnar(df, path):
+    """
+    Write transactions as an uncompressed Arrow IPC file sorted by Transaction_Date.
+
+    The original row labels are kept so transaction ids stay stable. The file is
+    written next to the target and renamed into place, so readers never see a
+    partially written file.
+    """
+    df = df.sort_values('Transaction_Date', kind='stable')
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    tmp_path = f"{path}.tmp"
+    # Uncompressed so the file can be memory-mapped without decoding
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, path)
+    return len(df)
+
+
+def read_columnar(path):
+    table = feather.read_table(path, memory_map=True)
+    # split_blocks keeps one block per column, which lets numeric and date
+    # columns stay zero-copy views over the mapped file
+    return table.to_pandas(split_blocks=True)
+
+
+class DateIndex:
+    """Binary-search index over a frame sorted by Transaction_Date."""
+
+    def __init__(self, dates):
+        self.dates = np.asarray(dates, dtype='datetime64[ns]')
+
+    def bounds(self, start_date=None, end_date=None):
+        """Return the [lo, hi) row range with start_date <= date <= end_date."""
+        lo = 0
+        hi = len(self.dates)
+        if start_date is not None:
+            lo = int(np.searchsorted(self.dates, pd.Timestamp(start_date).to_datetime64(), side='left'))
+        if end_date is not None:
+            hi = int(np.searchsorted(self.dates, pd.Timestamp(end_date).to_datetime64(), side='right'))
+        return lo, max(lo, hi)
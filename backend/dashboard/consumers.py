@@ -0,0 +1,138 @@
+import logging
+from collections import defaultdict
+
+import pandas as pd
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from .analytics import get_dashboard_analytics, parse_date_range
+from .executor import PoolSaturated, analytics_executor
+from .ingest import analytics_group
+from .models import DEFAULT_ACCOUNT
+from .store import AccountForbidden, UnknownAccount, authorize_account, clean_account
+
+logger = logging.getLogger(__name__)
+
+
+def delta_for_range(delta, start_date=None, end_date=None):
+    """
+    Fold an ingest delta into the analytics sections it changes for a date range.
+
+    Returns None when none of the new transactions fall inside the range.
+    """
+    def in_range(day):
+        return start_date is None or start_date <= day <= end_date
+
+    days = [row for row in delta['days'] if in_range(row['date'])]
+    if not days:
+        return None
+
+    total_credit = sum(row['credit'] for row in days)
+    total_debit = sum(row['debit'] for row in days)
+
+    months = defaultdict(lambda: {'total_credit': 0.0, 'total_debit': 0.0})
+    for row in days:
+        month = months[row['date'][:7]]
+        month['total_credit'] += row['credit']
+        month['total_debit'] += row['debit']
+
+    categories = defaultdict(float)
+    for row in delta['categories']:
+        if in_range(row['date']):
+            categories[row['transaction_type']] += row['debit']
+
+    return {
+        'summary': {
+            'total_transactions': sum(row['count'] for row in days),
+            'total_credit': total_credit,
+            'total_debit': total_debit,
+            'current_balance': total_credit - total_debit,
+        },
+        # Same labels as monthly_analysis / category_analysis so clients can add
+        # these onto the matching entries
+        'monthly_analysis': [
+            {'month': pd.Timestamp(key).strftime('%b %Y'), **totals}
+            for key, totals in sorted(months.items())
+        ],
+        'category_analysis': [
+            {'Transaction_Type': transaction_type, 'Debit': debit}
+            for transaction_type, debit in sorted(categories.items())
+        ],
+    }
+
+
+class AnalyticsConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Live dashboard analytics over a websocket.
+
+    Clients send ``{"action": "subscribe", "account": ..., "start_date": ...,
+    "end_date": ...}`` and receive an ``analytics.snapshot`` with the full payload for that range.
+    After that, each ingest pushes an ``analytics.delta`` holding only the
+    summary, month and category changes that fall inside the range. The
+    account must be readable by the connection's user (see authorize_account).
+    """
+
+    async def connect(self):
+        self.start_date = None
+        self.end_date = None
+        self.subscribed = False
+        self.account = DEFAULT_ACCOUNT
+        await self.channel_layer.group_add(analytics_group(self.account), self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        await self.channel_layer.group_discard(analytics_group(self.account), self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        if not isinstance(content, dict):
+            await self.send_json({'type': 'error', 'error': 'Messages must be JSON objects'})
+            return
+        if content.get('action') != 'subscribe':
+            await self.send_json({'type': 'error', 'error': 'Unknown action'})
+            return
+        try:
+            start_date, end_date = parse_date_range(content.get('start_date'), content.get('end_date'))
+            account = clean_account(content.get('account'))
+            await database_sync_to_async(authorize_account)(self.scope.get('user'), account)
+        except (ValueError, TypeError, AccountForbidden) as e:
+            await self.send_json({'type': 'error', 'error': str(e)})
+            return
+        if account != self.account:
+            # Only the subscribed account's ingests are delivered
+            await self.channel_layer.group_discard(analytics_group(self.account), self.channel_name)
+            await self.channel_layer.group_add(analytics_group(account), self.channel_name)
+            self.account = account
+        self.start_date = start_date
+        self.end_date = end_date
+        self.subscribed = True
+        await self.send_snapshot()
+
+    async def send_snapshot(self):
+        try:
+            _, payload = await analytics_executor.run(
+                get_dashboard_analytics, self.start_date, self.end_date, self.account,
+            )
+        except PoolSaturated:
+            await self.send_json({'type': 'error', 'error': 'Server busy'})
+            return
+        except UnknownAccount as e:
+            await self.send_json({'type': 'error', 'error': str(e)})
+            return
+        except Exception as e:
+            logger.error(f"Error computing analytics snapshot: {str(e)}", exc_info=True)
+            await self.send_json({'type': 'error', 'error': 'Failed to fetch dashboard analytics'})
+            return
+        await self.send_json({'type': 'analytics.snapshot', 'data': payload})
+
+    async def analytics_ingested(self, event):
+        if not self.subscribed:
+            return
+        if event['delta'] is None:
+            await self.send_snapshot()
+            return
+
+        start = self.start_date.strftime('%Y-%m-%d') if self.start_date is not None else None
+        end = self.end_date.strftime('%Y-%m-%d') if self.end_date is not None else None
+        changes = delta_for_range(event['delta'], start, end)
+        if changes is not None:
+            await self.send_json({'type': 'analytics.delta', 'data': changes})
@@ -0,0 +1,62 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+
+class PoolSaturated(Exception):
+    """Raised when a BoundedExecutor has no free worker or queue slot."""
+
+
+class BoundedExecutor:
+    """
+    Thread pool for running blocking work (pandas, ORM, network clients) off
+    the ASGI event loop.
+
+    At most ``max_workers`` calls run at once and ``max_pending`` more may
+    wait for a worker. Beyond that ``run`` raises PoolSaturated immediately
+    rather than queueing without limit, so callers can shed load.
+    """
+
+    def __init__(self, max_workers, max_pending, name='pool'):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+
+    @staticmethod
+    def _call(func, args, kwargs):
+        # Worker threads keep their own database connections; drop stale ones
+        # the same way Django does around each request
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    def submit(self, func, *args, **kwargs):
+        """Schedule func on the pool and return its concurrent.futures.Future."""
+        if not self._slots.acquire(blocking=False):
+            raise PoolSaturated(f"{self.max_workers} workers busy and {self.max_pending} calls queued")
+        try:
+            future = self._executor.submit(self._call, func, args, kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        # Release the slot when the work really finishes, not when the awaiting
+        # request goes away, so abandoned calls still count against the bound
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    async def run(self, func, *args, **kwargs):
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+
+analytics_executor = BoundedExecutor(
+    settings.ANALYTICS_POOL_WORKERS, settings.ANALYTICS_POOL_MAX_PENDING, name='analytics'
+)
+voice_executor = BoundedExecutor(
+    settings.VOICE_POOL_WORKERS, settings.VOICE_POOL_MAX_PENDING, name='voice'
+)
@@ -0,0 +1,47 @@
+import threading
+import time
+
+
+class FakeVapi:
+    """
+    Offline stand-in for ``vapi_python.Vapi``.
+
+    Selected with VOICE_CLIENT=fake. It needs no API key, network access or
+    audio device. ``start`` waits ``connect_delay`` seconds to imitate
+    connecting a call, then reports a canned transcription and response
+    through the same callbacks the real client uses.
+    """
+
+    def __init__(self, api_key=None, connect_delay=0.0, transcription='How much did I spend this month?',
+                 response='Here is your spending summary for this month.'):
+        self.api_key = api_key
+        self.connect_delay = connect_delay
+        self.transcription = transcription
+        self.response = response
+        self.is_active = False
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.on_speech_start = None
+        self.on_speech_end = None
+        self.on_transcription = None
+        self.on_response = None
+
+    def start(self, assistant_id=None):
+        if self.connect_delay:
+            time.sleep(self.connect_delay)
+        with self._lock:
+            self.is_active = True
+            self.calls += 1
+        for callback, args in (
+            (self.on_speech_start, ()),
+            (self.on_transcription, (self.transcription,)),
+            (self.on_speech_end, ()),
+            (self.on_response, (self.response,)),
+        ):
+            if callback:
+                callback(*args)
+
+    def stop(self):
+        with self._lock:
+            self.is_active = False
+        return {'transcription': self.transcription, 'response': self.response}
@@ -0,0 +1,214 @@
+import logging
+import os
+import threading
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+from .columnar import write_columnar
+from .models import DEFAULT_ACCOUNT, Transaction
+from .store import partition_paths
+
+logger = logging.getLogger(__name__)
+
+
+def analytics_group(account=DEFAULT_ACCOUNT):
+    # Channels group the analytics websockets of one account join
+    return f"analytics.{account}"
+
+# Merge_Proccessed.csv column -> Transaction field
+CSV_FIELDS = {
+    'Transaction_Date': 'transaction_date',
+    'Description': 'description',
+    'Reference No./Cheque No.': 'reference_no',
+    'Debit': 'debit',
+    'Credit': 'credit',
+    'Balance': 'balance',
+    'Transaction_Type': 'transaction_type',
+    'Transaction_Mode': 'transaction_mode',
+    'DR/CR_Indicator': 'dr_cr_indicator',
+    'Transaction_ID': 'transaction_id',
+    'Recipient_Name': 'recipient_name',
+    'Bank': 'bank',
+    'UPI_ID': 'upi_id',
+    'Note': 'note',
+}
+AMOUNT_FIELDS = ('debit', 'credit', 'balance')
+
+
+# Fields that identify one statement line; re-loading a statement skips rows
+# whose key is already stored for the account
+NATURAL_KEY = ('transaction_date', 'description', 'reference_no', 'debit', 'credit', 'balance')
+
+
+def _to_rows(df, account):
+    df = df.rename(columns=CSV_FIELDS)[list(CSV_FIELDS.values())]
+    text_fields = [f for f in CSV_FIELDS.values() if f not in AMOUNT_FIELDS and f != 'transaction_date']
+    df[text_fields] = df[text_fields].fillna('').astype(str)
+    df[list(AMOUNT_FIELDS)] = df[list(AMOUNT_FIELDS)].fillna(0).round(2)
+    df['transaction_date'] = pd.to_datetime(df['transaction_date']).dt.date
+    df['account'] = account
+    return df
+
+
+def _natural_keys(rows):
+    # Dates, text and amounts formatted the same way whether they come from a
+    # statement (floats) or from the database (Decimals)
+    key = rows['transaction_date'].astype(str)
+    for field in NATURAL_KEY[1:]:
+        column = rows[field].map('{:.2f}'.format) if field in AMOUNT_FIELDS else rows[field]
+        key = key + '\x1f' + column
+    return key
+
+
+def _unstored(rows, account):
+    """
+    Mask of rows not yet stored for the account.
+
+    Keys are compared as multisets: a statement line that legitimately
+    appears twice is inserted twice, but loading the same statement again
+    inserts nothing.
+    """
+    if rows.empty:
+        return np.ones(0, dtype=bool)
+    stored = Transaction.objects.filter(
+        account=account,
+        transaction_date__range=(rows['transaction_date'].min(), rows['transaction_date'].max()),
+    ).values_list(*NATURAL_KEY)
+    stored = pd.DataFrame.from_records(stored.iterator(chunk_size=10000), columns=list(NATURAL_KEY))
+    stored_counts = Counter(_natural_keys(stored)) if not stored.empty else {}
+    keys = _natural_keys(rows)
+    occurrence = keys.groupby(keys, sort=False).cumcount().to_numpy()
+    return occurrence >= keys.map(stored_counts).fillna(0).to_numpy()
+
+
+def ingest_transactions(df, account=DEFAULT_ACCOUNT, batch_size=5000):
+    """
+    Bulk-insert a processed statement frame into an account.
+
+    Rows already stored for the account are skipped, so ingesting the same
+    statement twice is a no-op. Each batch of ``batch_size`` rows is written
+    by one multi-row INSERT inside its own database transaction, so a large
+    history never holds one huge transaction open or builds every model
+    instance up front. Returns the rows of ``df`` that were inserted.
+    """
+    rows = _to_rows(df, account)
+    new = _unstored(rows, account)
+    records = rows[new].to_dict('records')
+    created = 0
+    for offset in range(0, len(records), batch_size):
+        batch = [Transaction(**record) for record in records[offset:offset + batch_size]]
+        with transaction.atomic():
+            Transaction.objects.bulk_create(batch, batch_size=batch_size)
+        created += len(batch)
+        logger.info(f"Ingested {created}/{len(records)} transactions")
+    return df[new]
+
+
+def transactions_frame(queryset=None):
+    """
+    Load transactions from the database as a frame in the Merge_Proccessed
+    schema, indexed by primary key and sorted by date.
+    """
+    queryset = Transaction.objects.all() if queryset is None else queryset
+    fields = list(CSV_FIELDS.values())
+    rows = queryset.order_by('transaction_date', 'id').values_list('id', *fields)
+    df = pd.DataFrame.from_records(rows.iterator(chunk_size=10000), columns=['id', *fields])
+    df = df.set_index('id').rename(columns={field: column for column, field in CSV_FIELDS.items()})
+    df['Transaction_Date'] = pd.to_datetime(df['Transaction_Date'])
+    for column in ('Debit', 'Credit', 'Balance'):
+        df[column] = df[column].astype('float64')
+    return df
+
+
+def refresh_partition(account=DEFAULT_ACCOUNT):
+    """
+    Rewrite an account's partition file from the database.
+
+    The analytics store serves every section from this file and reloads it
+    when it changes, so this is what makes new, edited or deleted rows visible
+    to the API. Returns the number of rows written.
+    """
+    output = partition_paths(account)[0]
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    return write_columnar(transactions_frame(Transaction.objects.filter(account=account)), output)
+
+
+_stale_partitions = set()
+_stale_lock = threading.Lock()
+
+
+def schedule_partition_refresh(account=DEFAULT_ACCOUNT):
+    """
+    Refresh an account's partition once the current database transaction
+    commits, and tell the account's live dashboards to reload. Many row
+    changes in one transaction (an admin bulk delete, say) lead to a single
+    rewrite.
+    """
+    with _stale_lock:
+        _stale_partitions.add(account)
+
+    def refresh():
+        with _stale_lock:
+            if account not in _stale_partitions:
+                return
+            _stale_partitions.discard(account)
+        try:
+            refresh_partition(account)
+            # Edits can't be expressed as a delta; subscribers reload instead
+            broadcast_ingest(None, account)
+        except Exception as e:
+            logger.error(f"Failed to refresh transactions partition {account}: {str(e)}", exc_info=True)
+
+    transaction.on_commit(refresh)
+
+
+def ingest_delta(df):
+    """
+    Per-day totals of newly ingested rows.
+
+    Subscribers fold these into the aggregates for their own date range, so
+    only what changed is sent instead of a full analytics payload.
+    """
+    days = pd.to_datetime(df['Transaction_Date']).dt.strftime('%Y-%m-%d').rename('date')
+    daily = df.groupby(days).agg(credit=('Credit', 'sum'), debit=('Debit', 'sum'), count=('Debit', 'size'))
+    by_type = df.groupby([days, df['Transaction_Type'].rename('transaction_type')])['Debit'].sum()
+    # to_dict('records') converts whole columns to native Python scalars at once
+    return {
+        'days': daily.astype({'credit': 'float64', 'debit': 'float64'}).reset_index().to_dict('records'),
+        'categories': by_type.rename('debit').astype('float64').reset_index().to_dict('records'),
+    }
+
+
+def broadcast_ingest(delta, account=DEFAULT_ACCOUNT):
+    """
+    Push an ingest delta to the analytics websockets watching an account. A
+    delta of None tells subscribers to reload their full analytics instead.
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    async_to_sync(channel_layer.group_send)(analytics_group(account), {'type': 'analytics.ingested', 'delta': delta})
+
+
+def ingest_statement(df, account=DEFAULT_ACCOUNT, batch_size=5000):
+    """
+    Ingest a statement, refresh the account's partition and push the delta
+    to its live dashboards. Returns the rows that were inserted.
+
+    Called from the server process (the upload endpoint), the delta reaches
+    its websocket consumers through any channel layer, the in-memory one
+    included.
+    """
+    created = ingest_transactions(df, account=account, batch_size=batch_size)
+    if len(created):
+        refresh_partition(account)
+        try:
+            broadcast_ingest(ingest_delta(created), account)
+        except Exception as e:
+            logger.error(f"Failed to notify analytics subscribers: {str(e)}", exc_info=True)
+    return created
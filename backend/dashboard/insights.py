@@ -0,0 +1,240 @@
+import numpy as np
+import pandas as pd
+from django.utils import timezone
+
+from .cache import LRUCache
+from .models import DEFAULT_ACCOUNT
+from .rollups import to_paise
+from .store import get_transaction_store
+
+# Spending aggregates keyed by (account, data version); rebuilt once per version
+aggregates_cache = LRUCache(maxsize=32)
+
+# Longest ranked list an answer returns
+MAX_LIMIT = 20
+
+
+class MonthlyBreakdown:
+    """
+    Debit totals per (month, key) pair, sorted by month.
+
+    Only pairs that occur are stored, so high-cardinality keys such as
+    merchants stay compact. The pairs of any run of months are one contiguous
+    slice, and ranking keys over it is a bincount of that slice.
+    """
+
+    def __init__(self, month_codes, month_count, keys, debit):
+        self.keys, key_codes = np.unique(keys, return_inverse=True)
+        pairs, pair_codes = np.unique(month_codes * len(self.keys) + key_codes, return_inverse=True)
+        self.pair_month = pairs // max(len(self.keys), 1)
+        self.pair_key = pairs % max(len(self.keys), 1)
+        self.pair_debit = np.bincount(pair_codes, weights=debit, minlength=len(pairs)).astype(np.int64)
+        self.pair_count = np.bincount(pair_codes, minlength=len(pairs))
+        # Slice of pairs belonging to months [m, m + 1)
+        self.month_offsets = np.searchsorted(self.pair_month, np.arange(month_count + 1))
+
+    def top(self, month_lo, month_hi, limit):
+        """Return [(key, debit_paise, count)] for the largest keys over months [month_lo, month_hi)."""
+        part = slice(self.month_offsets[month_lo], self.month_offsets[month_hi])
+        debit = np.bincount(self.pair_key[part], weights=self.pair_debit[part], minlength=len(self.keys))
+        count = np.bincount(self.pair_key[part], weights=self.pair_count[part], minlength=len(self.keys))
+        limit = min(limit, len(self.keys))
+        if limit == 0:
+            return []
+        # Partial sort: only the top `limit` keys are ordered
+        top = np.argpartition(-debit, limit - 1)[:limit]
+        top = top[np.argsort(-debit[top], kind='stable')]
+        return [
+            (self.keys[i], int(debit[i]), int(count[i]))
+            for i in top.tolist() if debit[i] > 0
+        ]
+
+
+class SpendingAggregates:
+    """
+    Per-month, per-category and per-merchant debit totals of a snapshot.
+
+    Categories are Transaction_Category when the statement has been
+    categorized, otherwise Transaction_Type, matching category_analysis.
+    Merchants are Recipient_Name. Amounts are kept in integer paise.
+    """
+
+    def __init__(self, frame):
+        debit = to_paise(frame['Debit'])
+        spent = debit > 0
+        debit = debit[spent]
+        months = frame['Transaction_Date'].to_numpy(dtype='datetime64[ns]')[spent].astype('datetime64[M]')
+        self.months, month_codes = np.unique(months, return_inverse=True)
+        self.month_debit = np.bincount(month_codes, weights=debit, minlength=len(self.months)).astype(np.int64)
+        self.month_count = np.bincount(month_codes, minlength=len(self.months))
+
+        category_column = 'Transaction_Category' if 'Transaction_Category' in frame.columns else 'Transaction_Type'
+        categories = frame[category_column].fillna('Other').astype(str).to_numpy()[spent]
+        merchants = frame['Recipient_Name'].fillna('').astype(str).str.strip().to_numpy()[spent]
+        self.categories = MonthlyBreakdown(month_codes, len(self.months), categories, debit)
+        # Rows without a recipient can't be named as a merchant
+        named = merchants != ''
+        self.merchants = MonthlyBreakdown(month_codes[named], len(self.months), merchants[named], debit[named])
+
+    def month_range(self, first_month, last_month):
+        """Positions [lo, hi) of the months from first_month to last_month inclusive."""
+        lo = int(np.searchsorted(self.months, first_month, side='left'))
+        hi = int(np.searchsorted(self.months, last_month, side='right'))
+        return lo, max(lo, hi)
+
+    def month_total(self, month):
+        lo, hi = self.month_range(month, month)
+        if lo == hi:
+            return 0, 0
+        return int(self.month_debit[lo]), int(self.month_count[lo])
+
+
+def get_spending_aggregates(account=DEFAULT_ACCOUNT):
+    """Return (snapshot, aggregates) for the account's current data version."""
+    snapshot = get_transaction_store().snapshot(account)
+    cache_key = (account, snapshot.version)
+    aggregates = aggregates_cache.get(cache_key)
+    if aggregates is None:
+        aggregates = SpendingAggregates(snapshot.frame)
+        aggregates_cache.set(cache_key, aggregates)
+    return snapshot, aggregates
+
+
+def parse_month(value=None):
+    """A 'YYYY-MM' string as numpy month; the current month when not given."""
+    if not value:
+        return np.datetime64(timezone.localdate(), 'M')
+    try:
+        return np.datetime64(str(value), 'M')
+    except ValueError:
+        raise ValueError(f"Invalid month {value!r}, expected YYYY-MM")
+
+
+def _limit(parameters, default):
+    """The 'limit' parameter clamped to [1, MAX_LIMIT]; default when missing or null."""
+    value = parameters.get('limit')
+    if value is None:
+        value = default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid limit {value!r}, expected a whole number")
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def _rupees(paise):
+    return paise / 100
+
+
+def _say_amount(paise):
+    return f"₹{paise / 100:,.2f}"
+
+
+def _month_label(month):
+    return pd.Timestamp(month).strftime('%B %Y')
+
+
+def top_category(aggregates, snapshot, parameters):
+    month = parse_month(parameters.get('month'))
+    lo, hi = aggregates.month_range(month, month)
+    ranked = aggregates.categories.top(lo, hi, limit=_limit(parameters, 3))
+    total, _ = aggregates.month_total(month)
+    categories = [
+        {'category': name, 'debit': _rupees(debit), 'transactions': count,
+         'share': debit / total if total else 0.0}
+        for name, debit, count in ranked
+    ]
+    if categories:
+        top = ranked[0]
+        speech = (f"In {_month_label(month)} you spent the most on {top[0]}: "
+                  f"{_say_amount(top[1])} across {top[2]} transactions.")
+    else:
+        speech = f"I don't see any spending in {_month_label(month)}."
+    return {'month': str(month), 'categories': categories, 'speech': speech}
+
+
+def spend_in_period(aggregates, snapshot, parameters):
+    if parameters.get('start_date') and parameters.get('end_date'):
+        start_date = pd.Timestamp(parameters['start_date'])
+        end_date = pd.Timestamp(parameters['end_date'])
+    else:
+        month = parse_month(parameters.get('month'))
+        start_date = pd.Timestamp(month)
+        end_date = start_date + pd.offsets.MonthEnd(0)
+    # Day-level range, answered from the daily prefix sums
+    total_credit, total_debit, total_transactions = snapshot.rollup.summarize(start_date, end_date)
+    start, end = start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')
+    return {
+        'start_date': start,
+        'end_date': end,
+        'total_debit': total_debit,
+        'total_credit': total_credit,
+        'total_transactions': total_transactions,
+        'speech': (f"Between {start} and {end} you spent ₹{total_debit:,.2f} "
+                   f"and received ₹{total_credit:,.2f}."),
+    }
+
+
+def top_merchants(aggregates, snapshot, parameters):
+    last_month = parse_month(parameters.get('end_month') or parameters.get('month'))
+    first_month = parse_month(parameters['start_month']) if parameters.get('start_month') else last_month
+    lo, hi = aggregates.month_range(first_month, last_month)
+    ranked = aggregates.merchants.top(lo, hi, limit=_limit(parameters, 5))
+    merchants = [
+        {'merchant': name, 'debit': _rupees(debit), 'transactions': count}
+        for name, debit, count in ranked
+    ]
+    period = _month_label(last_month) if first_month == last_month else \
+        f"{_month_label(first_month)} to {_month_label(last_month)}"
+    if merchants:
+        speech = f"Your top merchants for {period} were " + ', '.join(
+            f"{name} at {_say_amount(debit)}" for name, debit, _ in ranked
+        ) + '.'
+    else:
+        speech = f"I don't see any merchant payments for {period}."
+    return {'start_month': str(first_month), 'end_month': str(last_month), 'merchants': merchants, 'speech': speech}
+
+
+def month_over_month(aggregates, snapshot, parameters):
+    month = parse_month(parameters.get('month'))
+    previous = month - 1
+    debit, _ = aggregates.month_total(month)
+    previous_debit, _ = aggregates.month_total(previous)
+    change = debit - previous_debit
+    change_pct = change / previous_debit * 100 if previous_debit else None
+    if change_pct is None:
+        speech = f"You spent {_say_amount(debit)} in {_month_label(month)}, with no spending the month before."
+    else:
+        direction = 'more' if change >= 0 else 'less'
+        speech = (f"You spent {_say_amount(debit)} in {_month_label(month)}, "
+                  f"{abs(change_pct):.0f}% {direction} than {_say_amount(previous_debit)} in {_month_label(previous)}.")
+    return {
+        'month': str(month),
+        'previous_month': str(previous),
+        'debit': _rupees(debit),
+        'previous_debit': _rupees(previous_debit),
+        'change': _rupees(change),
+        'change_pct': change_pct,
+        'speech': speech,
+    }
+
+
+INTENTS = {
+    'top_category': top_category,
+    'spend_in_period': spend_in_period,
+    'top_merchants': top_merchants,
+    'month_over_month': month_over_month,
+}
+
+
+def answer_query(intent, parameters=None, account=DEFAULT_ACCOUNT):
+    """
+    Answer one of the fixed voice assistant intents.
+
+    Raises ValueError for unknown intents or malformed parameters. Each answer
+    carries a ``speech`` sentence the assistant can read out as is.
+    """
+    if intent not in INTENTS:
+        raise ValueError(f"Unknown intent {intent!r}, expected one of: {', '.join(INTENTS)}")
+    snapshot, aggregates = get_spending_aggregates(account)
+    return {'intent': intent, **INTENTS[intent](aggregates, snapshot, parameters or {})}
@@ -0,0 +1,35 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.columnar import write_columnar
+from dashboard.models import DEFAULT_ACCOUNT, Transaction
+from dashboard.store import partition_paths, read_transactions
+
+
+class Command(BaseCommand):
+    help = 'Convert the processed statement CSV into a date-sorted Arrow IPC file for the analytics API'
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', nargs='?', default=settings.TRANSACTIONS_FILE,
+                            help='Processed statement CSV (default: TRANSACTIONS_FILE)')
+        parser.add_argument('--output', default=settings.TRANSACTIONS_COLUMNAR_FILE,
+                            help='Arrow IPC file to write (default: TRANSACTIONS_COLUMNAR_FILE)')
+        parser.add_argument('--force', action='store_true',
+                            help='Overwrite the default account partition even though the database holds its rows')
+
+    def handle(self, *args, **options):
+        output = options['output']
+        partition = partition_paths(DEFAULT_ACCOUNT)[0]
+        if (not options['force'] and os.path.abspath(output) == os.path.abspath(partition)
+                and Transaction.objects.filter(account=DEFAULT_ACCOUNT).exists()):
+            # Once statements are ingested this file is rebuilt from the
+            # database; the CSV would replace those rows and their ids
+            raise CommandError(
+                f"{output} is the {DEFAULT_ACCOUNT} account's partition, rebuilt from the database by "
+                "ingest_statements. Pass --output for a separate file, or --force to overwrite it anyway."
+            )
+        df = read_transactions(options['source'])
+        rows = write_columnar(df, output)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {rows} transactions to {output}"))
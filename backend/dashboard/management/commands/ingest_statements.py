@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from dashboard.ingest import broadcast_ingest, ingest_delta, ingest_transactions, refresh_partition
+from dashboard.models import DEFAULT_ACCOUNT, Transaction
+from dashboard.signals import row_signals_suspended
+from dashboard.store import clean_account, partition_paths, read_transactions
+
+
+class Command(BaseCommand):
+    help = 'Bulk-load processed bank statements into the database and refresh the columnar snapshot'
+
+    def add_arguments(self, parser):
+        parser.add_argument('sources', nargs='*', default=[settings.TRANSACTIONS_FILE],
+                            help='Processed statement files, CSV or Arrow IPC (default: TRANSACTIONS_FILE)')
+        parser.add_argument('--account', default=DEFAULT_ACCOUNT,
+                            help='Account holder the statements belong to')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Rows per INSERT batch and database transaction')
+        parser.add_argument('--replace', action='store_true',
+                            help='Delete existing transactions before loading; otherwise rows already stored are skipped')
+
+    def handle(self, *args, **options):
+        try:
+            account = clean_account(options['account'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        transactions = Transaction.objects.filter(account=account)
+
+        if options['replace']:
+            # The partition is rebuilt once below, so the per-row receivers
+            # are disconnected and the rows are deleted in a single query
+            with row_signals_suspended(), transaction.atomic():
+                deleted, _ = transactions.delete()
+            self.stdout.write(f"Deleted {deleted} existing transactions for {account}")
+
+        frames = []
+        for source in options['sources']:
+            df = read_transactions(source)
+            created = ingest_transactions(df, account=account, batch_size=options['batch_size'])
+            frames.append(created)
+            self.stdout.write(
+                f"Loaded {len(created)} new transactions from {source} into {account} "
+                f"({len(df) - len(created)} already present)"
+            )
+
+        # The analytics store serves every section from the account's
+        # partition, so rebuild it from the database to keep it in step
+        rows = refresh_partition(account)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {rows} transactions to {partition_paths(account)[0]}"))
+
+        # Notify live dashboards. Reaching server processes requires a shared
+        # channel layer (e.g. Redis); the in-memory layer only spans this
+        # process, so with it upload to /api/transactions/ingest/ instead.
+        try:
+            if options['replace']:
+                # Replaced history can't be expressed as a delta
+                broadcast_ingest(None, account)
+            else:
+                for df in frames:
+                    if len(df):
+                        broadcast_ingest(ingest_delta(df), account)
+        except Exception as e:
+            self.stderr.write(f"Failed to notify analytics subscribers: {e}")
@@ -0,0 +1,166 @@
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Upper bounds in seconds, from sub-millisecond rollup lookups to cold CSV loads
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """
+    Prometheus-style latency histogram with one label.
+
+    Values are kept per process; each server worker exposes its own series
+    and Prometheus sums them across scrape targets.
+    """
+
+    def __init__(self, name, documentation, label, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # label value -> [bucket counts..., +Inf count, sum]
+        self._series = {}
+
+    def observe(self, label_value, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def collect(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        for label_value, values in sorted(series.items()):
+            label = f'{self.label}="{label_value}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {cumulative}')
+            cumulative += values[len(self.buckets)]
+            lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{label}}} {values[-1]}')
+            lines.append(f'{self.name}_count{{{label}}} {cumulative}')
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    'spendwise_stage_duration_seconds', 'Time spent in each stage of serving analytics.', 'stage'
+)
+REQUEST_SECONDS = Histogram(
+    'spendwise_request_duration_seconds', 'End-to-end time of instrumented API views.', 'view'
+)
+
+# Timings of the request being served, if it is instrumented
+_current_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+@contextmanager
+def timed(stage):
+    """
+    Time a block as ``stage``.
+
+    The duration always feeds STAGE_SECONDS, and is also added to the current
+    request's Server-Timing header when a RequestTimings is active.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        STAGE_SECONDS.observe(stage, duration)
+        timings = _current_timings.get()
+        if timings is not None:
+            timings.add(stage, duration)
+
+
+class RequestTimings:
+    """Stage durations of one request, reported in a Server-Timing header."""
+
+    def __init__(self, view):
+        self.view = view
+        self.started = time.perf_counter()
+        self.stages = []
+
+    def add(self, stage, duration):
+        self.stages.append((stage, duration))
+
+    @contextmanager
+    def activate(self):
+        token = _current_timings.set(self)
+        try:
+            yield self
+        finally:
+            _current_timings.reset(token)
+
+    def header(self):
+        return ', '.join(f"{stage};dur={duration * 1000:.2f}" for stage, duration in self.stages)
+
+    def attach(self, response):
+        """
+        Set Server-Timing on a response once it has been rendered, so the
+        serialization stage and the total are included.
+        """
+        render_started = time.perf_counter()
+
+        def finish(rendered):
+            now = time.perf_counter()
+            STAGE_SECONDS.observe('render', now - render_started)
+            self.add('render', now - render_started)
+            total = now - self.started
+            REQUEST_SECONDS.observe(self.view, total)
+            self.add('total', total)
+            rendered['Server-Timing'] = self.header()
+
+        if getattr(response, 'is_rendered', True):
+            finish(response)
+        else:
+            response.add_post_render_callback(finish)
+        return response
+
+
+def _gauge(name, documentation, value):
+    return [f"# HELP {name} {documentation}", f"# TYPE {name} gauge", f"{name} {value}"]
+
+
+def _labelled(name, documentation, kind, samples):
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    lines.extend(f'{name}{{{labels}}} {value}' for labels, value in samples)
+    return lines
+
+
+def render_metrics(caches, partitions):
+    """
+    Prometheus text exposition of the stage histograms, cache counters and
+    loaded dataset size.
+
+    ``caches`` maps a cache name to its stats() dict; ``partitions`` is the
+    transaction store's stats() including resident row and byte totals.
+    """
+    lines = STAGE_SECONDS.collect() + REQUEST_SECONDS.collect()
+
+    for metric, key, kind, documentation in (
+        ('spendwise_cache_hits_total', 'hits', 'counter', 'Cache lookups that found an entry.'),
+        ('spendwise_cache_misses_total', 'misses', 'counter', 'Cache lookups that found nothing.'),
+        ('spendwise_cache_evictions_total', 'evictions', 'counter', 'Entries dropped to stay within the cache bound.'),
+    ):
+        lines += _labelled(metric, documentation, kind, [
+            (f'cache="{name}"', stats[key]) for name, stats in sorted(caches.items())
+        ])
+    lines += _labelled('spendwise_cache_hit_ratio', 'Hits over lookups since the process started.', 'gauge', [
+        (f'cache="{name}"', stats['hits'] / (stats['hits'] + stats['misses']) if stats['hits'] + stats['misses'] else 0)
+        for name, stats in sorted(caches.items())
+    ])
+
+    lines += _gauge('spendwise_dataset_partitions', 'Account partitions loaded in memory.', partitions['partitions'])
+    lines += _gauge('spendwise_dataset_rows', 'Transactions in loaded partitions.', partitions['resident_rows'])
+    lines += _gauge('spendwise_dataset_bytes', 'Approximate memory of loaded partitions.', partitions['resident_bytes'])
+    lines += _gauge('spendwise_dataset_max_bytes', 'Memory budget for loaded partitions.', partitions['max_bytes'])
+    return '\n'.join(lines) + '\n'
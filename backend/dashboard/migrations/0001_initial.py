@@ -0,0 +1,38 @@
+# Generated by Django 4.2.10 on 2026-10-18 19:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Transaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('transaction_date', models.DateField()),
+                ('description', models.TextField(blank=True)),
+                ('reference_no', models.CharField(blank=True, max_length=64)),
+                ('debit', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('credit', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('balance', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('transaction_type', models.CharField(max_length=8)),
+                ('transaction_mode', models.CharField(blank=True, max_length=16)),
+                ('dr_cr_indicator', models.CharField(blank=True, max_length=2)),
+                ('transaction_id', models.CharField(blank=True, max_length=64)),
+                ('recipient_name', models.CharField(blank=True, max_length=255)),
+                ('bank', models.CharField(blank=True, max_length=64)),
+                ('upi_id', models.CharField(blank=True, max_length=255)),
+                ('note', models.CharField(blank=True, max_length=255)),
+            ],
+            options={
+                'ordering': ['-transaction_date', '-id'],
+                'indexes': [models.Index(fields=['transaction_date', 'id'], name='transaction_date_idx'), models.Index(fields=['recipient_name'], name='transaction_recipient_idx'), models.Index(fields=['transaction_type'], name='transaction_type_idx')],
+            },
+        ),
+    ]
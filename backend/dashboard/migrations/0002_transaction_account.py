@@ -0,0 +1,22 @@
+# Generated by Django 4.2.10 on 2026-10-18 19:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='account',
+            field=models.CharField(default='default', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['account', 'transaction_date', 'id'], name='transaction_account_date_idx'),
+        ),
+    ]
@@ -1,3 +1,38 @@
 from django.db import models
 
-# Create your models here.
+# Account that statements are loaded into when none is given
+DEFAULT_ACCOUNT = 'default'
+
+
+class Transaction(models.Model):
+    """A single bank statement line, mirroring the Merge_Proccessed.csv schema."""
+
+    account = models.CharField(max_length=64, default=DEFAULT_ACCOUNT)
+    transaction_date = models.DateField()
+    description = models.TextField(blank=True)
+    reference_no = models.CharField(max_length=64, blank=True)
+    debit = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    credit = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    balance = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    transaction_type = models.CharField(max_length=8)
+    transaction_mode = models.CharField(max_length=16, blank=True)
+    dr_cr_indicator = models.CharField(max_length=2, blank=True)
+    transaction_id = models.CharField(max_length=64, blank=True)
+    recipient_name = models.CharField(max_length=255, blank=True)
+    bank = models.CharField(max_length=64, blank=True)
+    upi_id = models.CharField(max_length=255, blank=True)
+    note = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        ordering = ['-transaction_date', '-id']
+        indexes = [
+            # (date, id) also serves ORDER BY date, id ... LIMIT for recent transactions
+            models.Index(fields=['transaction_date', 'id'], name='transaction_date_idx'),
+            # Same ordering scoped to one account holder
+            models.Index(fields=['account', 'transaction_date', 'id'], name='transaction_account_date_idx'),
+            models.Index(fields=['recipient_name'], name='transaction_recipient_idx'),
+            models.Index(fields=['transaction_type'], name='transaction_type_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.transaction_date} {self.transaction_type} {self.recipient_name or self.description}"
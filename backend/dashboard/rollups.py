@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+
+class DailyRollup:
+    """
+    Prefix sums of credit, debit and transaction count per calendar day.
+
+    Amounts are accumulated in integer paise so range totals are exact
+    differences instead of carrying floating-point drift. A summary for any
+    [start_date, end_date] is two binary searches over the day array and a
+    subtraction of prefix entries. Debit and count are also kept per
+    Transaction_Type, and the first day of each month is recorded, so month
+    and category breakdowns of a range are array differences as well.
+    """
+
+    def __init__(self, df):
+        days = df['Transaction_Date'].to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+        credit = to_paise(df['Credit'])
+        debit = to_paise(df['Debit'])
+
+        self.days, labels = np.unique(days, return_inverse=True)
+        size = len(self.days)
+        self.cum_credit = _prefix_sum(np.bincount(labels, weights=credit, minlength=size))
+        self.cum_debit = _prefix_sum(np.bincount(labels, weights=debit, minlength=size))
+        self.cum_count = _prefix_sum(np.bincount(labels, minlength=size))
+
+        # Day positions where each month starts
+        self.months, self.month_starts = np.unique(self.days.astype('datetime64[M]'), return_index=True)
+
+        # (day, type) cells flattened into one bincount, then prefix-summed per type
+        types = df['Transaction_Type'].fillna('').astype(str).to_numpy()
+        self.types, type_codes = np.unique(types, return_inverse=True)
+        cells = labels * len(self.types) + type_codes
+        shape = (size, len(self.types))
+        self.cum_debit_by_type = _prefix_sum(
+            np.bincount(cells, weights=debit, minlength=size * len(self.types)).reshape(shape)
+        )
+        self.cum_count_by_type = _prefix_sum(
+            np.bincount(cells, minlength=size * len(self.types)).reshape(shape)
+        )
+
+    def bounds(self, start_date=None, end_date=None):
+        lo = 0
+        hi = len(self.days)
+        if start_date is not None:
+            lo = int(np.searchsorted(self.days, _as_day(start_date), side='left'))
+        if end_date is not None:
+            hi = int(np.searchsorted(self.days, _as_day(end_date), side='right'))
+        return lo, max(lo, hi)
+
+    def summarize(self, start_date=None, end_date=None):
+        """Return (total_credit, total_debit, total_transactions) for the inclusive date range."""
+        lo, hi = self.bounds(start_date, end_date)
+        total_credit = (self.cum_credit[hi] - self.cum_credit[lo]) / 100
+        total_debit = (self.cum_debit[hi] - self.cum_debit[lo]) / 100
+        total_transactions = self.cum_count[hi] - self.cum_count[lo]
+        return float(total_credit), float(total_debit), int(total_transactions)
+
+    def monthly(self, start_date=None, end_date=None):
+        """Return (months, credit, debit) for each month with transactions in the range."""
+        lo, hi = self.bounds(start_date, end_date)
+        # Month boundaries clipped to the range; empty months drop out
+        edges = np.clip(np.append(self.month_starts, len(self.days)), lo, hi)
+        present = np.diff(edges) > 0
+        credit = np.diff(self.cum_credit[edges]) / 100
+        debit = np.diff(self.cum_debit[edges]) / 100
+        return self.months[present], credit[present], debit[present]
+
+    def by_type(self, start_date=None, end_date=None):
+        """Return (types, debit) for each Transaction_Type with transactions in the range."""
+        lo, hi = self.bounds(start_date, end_date)
+        present = (self.cum_count_by_type[hi] - self.cum_count_by_type[lo]) > 0
+        debit = (self.cum_debit_by_type[hi] - self.cum_debit_by_type[lo]) / 100
+        return self.types[present], debit[present]
+
+
+def to_paise(amounts):
+    return np.rint(amounts.fillna(0).to_numpy(dtype='float64') * 100).astype(np.int64)
+
+
+def _prefix_sum(values):
+    # bincount returns float64 when weighted; paise totals stay exact well
+    # beyond any realistic statement history (2**53 paise). Sums run along the
+    # first (day) axis, with a leading row of zeros.
+    values = values.astype(np.int64)
+    zeros = np.zeros((1,) + values.shape[1:], dtype=np.int64)
+    return np.concatenate((zeros, np.cumsum(values, axis=0)))
+
+
+def _as_day(value):
+    return np.datetime64(pd.Timestamp(value).date(), 'D')
@@ -0,0 +1,38 @@
+from contextlib import contextmanager
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .ingest import schedule_partition_refresh
+from .models import Transaction
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+def transaction_changed(sender, instance, **kwargs):
+    # Row-by-row writes (the admin, the shell) bypass the ingest command, so
+    # the account's partition is rebuilt from the database here instead.
+    # The rebuild rewrites the account's whole Arrow file, O(rows in the
+    # account), once per committed transaction: changes made inside one
+    # transaction.atomic() block share a single rewrite. Bulk loads should go
+    # through ingest_statements, which doesn't fire these signals.
+    schedule_partition_refresh(instance.account)
+
+
+@contextmanager
+def row_signals_suspended():
+    """
+    Disconnect transaction_changed for a bulk write that refreshes the
+    partition itself. Without receivers, queryset.delete() can delete in one
+    query instead of loading every row and scheduling a refresh per row.
+
+    The receivers are process-wide, so only use this where nothing else writes
+    transactions concurrently (a management command, say).
+    """
+    post_save.disconnect(transaction_changed, sender=Transaction)
+    post_delete.disconnect(transaction_changed, sender=Transaction)
+    try:
+        yield
+    finally:
+        post_save.connect(transaction_changed, sender=Transaction)
+        post_delete.connect(transaction_changed, sender=Transaction)
@@ -0,0 +1,267 @@
+import os
+import re
+import threading
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from .columnar import DateIndex, is_columnar, read_columnar
+from .metrics import timed
+from .models import DEFAULT_ACCOUNT
+from .rollups import DailyRollup
+
+logger = logging.getLogger(__name__)
+
+# Account names double as partition file names and channel group suffixes
+ACCOUNT_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+class UnknownAccount(LookupError):
+    pass
+
+
+class AccountForbidden(PermissionError):
+    pass
+
+
+def clean_account(account):
+    """Validate an account query parameter, defaulting to DEFAULT_ACCOUNT."""
+    if not account:
+        return DEFAULT_ACCOUNT
+    if not ACCOUNT_PATTERN.match(account):
+        raise ValueError(f"Invalid account: {account!r}")
+    return account
+
+
+def user_account(user):
+    """
+    The account a signed-in user's own statements go to, named after their
+    username; None if the username cannot name one.
+    """
+    username = user.get_username()
+    if username == DEFAULT_ACCOUNT or not ACCOUNT_PATTERN.match(username):
+        return None
+    return username
+
+
+def authorize_account(user, account):
+    """
+    Return account if user may read it, else raise AccountForbidden. Accounts
+    in PUBLIC_ACCOUNTS are open to everyone; any other account only to the
+    user it is named after and to staff.
+    """
+    if account in settings.PUBLIC_ACCOUNTS:
+        return account
+    if user is not None and user.is_authenticated and (user.is_staff or user_account(user) == account):
+        return account
+    raise AccountForbidden(f"Not allowed to read account {account!r}")
+
+
+def partition_paths(account):
+    """
+    Files backing an account's partition, in order of preference.
+
+    The default account keeps serving the original columnar snapshot and CSV;
+    every other account has its own Arrow file under TRANSACTIONS_PARTITION_DIR.
+    """
+    if account == DEFAULT_ACCOUNT:
+        return settings.TRANSACTIONS_COLUMNAR_FILE, settings.TRANSACTIONS_FILE
+    return (os.path.join(settings.TRANSACTIONS_PARTITION_DIR, f"{account}.arrow"),)
+
+
+def read_transactions(path):
+    """
+    Read a processed statement file (CSV or Arrow IPC) and apply the column
+    types the API relies on. Rows are returned sorted by Transaction_Date.
+    """
+    if is_columnar(path):
+        # Already typed and sorted at ingest time
+        with timed('read'):
+            return read_columnar(path)
+    with timed('read'):
+        df = pd.read_csv(path)
+    with timed('parse_dates'):
+        df['Transaction_Date'] = pd.to_datetime(df['Transaction_Date'])
+        return df.sort_values('Transaction_Date', kind='stable')
+
+
+def _freeze(df):
+    # Mark the backing arrays read-only so a view that writes into the shared
+    # frame fails loudly instead of corrupting it for every other request.
+    # Each column becomes its own read-only view, so nothing is copied.
+    columns = {}
+    for name, column in df.items():
+        if isinstance(column.dtype, np.dtype):
+            values = column.to_numpy(copy=False)
+            values.flags.writeable = False
+            columns[name] = values
+        else:
+            # Extension arrays (categorical, Arrow-backed) are kept as they are
+            columns[name] = column.array
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    frame: pd.DataFrame
+    version: str
+    date_index: DateIndex
+    rollup: DailyRollup
+    # Approximate resident size, used to bound the partition cache
+    nbytes: int = 0
+
+    def between(self, start_date=None, end_date=None):
+        """Rows dated within [start_date, end_date], as a zero-copy slice."""
+        lo, hi = self.date_index.bounds(start_date, end_date)
+        return self.frame.iloc[lo:hi]
+
+
+class TransactionStore:
+    """
+    Process-wide, thread-safe cache of the processed transactions.
+
+    The file is parsed and typed once and shared read-only by every request.
+    It is reloaded when it is replaced or its modification time or size
+    changes. When several paths are given the first existing one is served, so
+    a columnar file produced by ``build_columnar`` takes over from the CSV as
+    soon as it exists.
+    """
+
+    def __init__(self, *paths):
+        self.paths = paths
+        self._lock = threading.Lock()
+        # (signature, snapshot) swapped as one reference so readers never pair
+        # a new snapshot with a stale signature
+        self._state = (None, None)
+
+    def _stat(self):
+        for path in self.paths[:-1]:
+            if os.path.exists(path):
+                break
+        else:
+            path = self.paths[-1]
+        st = os.stat(path)
+        # Partition rewrites replace the file, so the inode changes even when a
+        # rewrite lands within the same mtime tick and keeps the same size
+        return path, st.st_ino, st.st_mtime_ns, st.st_size
+
+    def snapshot(self):
+        signature = self._stat()
+        current_signature, snapshot = self._state
+        if snapshot is not None and signature == current_signature:
+            return snapshot
+
+        with self._lock:
+            # Another thread may have reloaded while we waited for the lock
+            current_signature, snapshot = self._state
+            if snapshot is None or signature != current_signature:
+                path, inode, mtime_ns, size = signature
+                logger.info(f"Loading transactions from {path}")
+                frame = read_transactions(path)
+                with timed('index'):
+                    # Measured before freezing; deep inspection of object
+                    # columns needs writable buffers
+                    nbytes = int(frame.memory_usage(index=True, deep=True).sum())
+                    frame = _freeze(frame)
+                    snapshot = Snapshot(
+                        frame=frame,
+                        version=f"{inode:x}-{mtime_ns:x}-{size:x}",
+                        date_index=DateIndex(frame['Transaction_Date'].to_numpy()),
+                        rollup=DailyRollup(frame),
+                        nbytes=nbytes,
+                    )
+                self._state = (signature, snapshot)
+            return snapshot
+
+    def clear(self):
+        with self._lock:
+            self._state = (None, None)
+
+
+class PartitionedStore:
+    """
+    Per-account TransactionStores with least-recently-used eviction.
+
+    Loaded partitions are kept until their combined size exceeds max_bytes,
+    then the least recently used ones are dropped, so a process serving many
+    accounts only keeps the hot ones resident. The most recently used
+    partition is always kept, even when it alone is over the budget.
+    """
+
+    def __init__(self, max_bytes, paths_for=partition_paths):
+        self.max_bytes = max_bytes
+        self.paths_for = paths_for
+        self._lock = threading.Lock()
+        # account -> (store, nbytes, rows of its last loaded snapshot)
+        self._partitions = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _store(self, account):
+        with self._lock:
+            if account in self._partitions:
+                self._partitions.move_to_end(account)
+                self.hits += 1
+                return self._partitions[account][0]
+            self.misses += 1
+        paths = self.paths_for(account)
+        if not any(os.path.exists(path) for path in paths):
+            raise UnknownAccount(f"No transactions for account {account!r}")
+        return TransactionStore(*paths)
+
+    def snapshot(self, account=DEFAULT_ACCOUNT):
+        store = self._store(account)
+        # Loading happens under the store's own lock, so one slow partition
+        # doesn't block requests for accounts that are already resident
+        snapshot = store.snapshot()
+        with self._lock:
+            current = self._partitions.get(account)
+            if current is not None and current[0] is not store:
+                # Another thread loaded the same account first; keep its store
+                store = current[0]
+            self._partitions[account] = (store, snapshot.nbytes, len(snapshot.frame))
+            self._partitions.move_to_end(account)
+            self._evict()
+        return snapshot
+
+    def _evict(self):
+        total = sum(nbytes for _, nbytes, _ in self._partitions.values())
+        while total > self.max_bytes and len(self._partitions) > 1:
+            account, (_, nbytes, _) = self._partitions.popitem(last=False)
+            total -= nbytes
+            self.evictions += 1
+            logger.info(f"Evicted transactions partition {account} ({nbytes} bytes)")
+
+    def clear(self):
+        with self._lock:
+            self._partitions.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'partitions': len(self._partitions),
+                'resident_bytes': sum(nbytes for _, nbytes, _ in self._partitions.values()),
+                'resident_rows': sum(rows for _, _, rows in self._partitions.values()),
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_transaction_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PartitionedStore(settings.TRANSACTIONS_PARTITION_MEMORY_MB * 1024 * 1024)
+    return _store
@@ -1,3 +1,871 @@
-from django.test import TestCase
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+from unittest import mock
 
-# Create your tests here.
+import pandas as pd
+from asgiref.sync import sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from .analytics import analytics_cache, get_dashboard_analytics
+from .api.serializers import TransactionSerializer
+from .consumers import AnalyticsConsumer
+from .executor import BoundedExecutor, PoolSaturated
+from .fake_vapi import FakeVapi
+from .ingest import ingest_transactions, refresh_partition
+from .models import Transaction
+from .signals import row_signals_suspended
+from .store import PartitionedStore, get_transaction_store
+from .voice import ACTIVE, FAILED, STARTING, STOPPED, STOPPING, VoiceSessionManager
+
+
+def statement(rows):
+    """
+    A processed statement frame in the Merge_Proccessed.csv schema.
+
+    ``rows`` are (date, transaction_type, debit, credit) tuples; the other
+    columns are filled in from them.
+    """
+    records = []
+    balance = 10000.0
+    for number, (day, transaction_type, debit, credit) in enumerate(rows):
+        balance += credit - debit
+        records.append({
+            'Transaction_Date': day,
+            'Description': f"{transaction_type} TRANSFER-UPI/{number}",
+            'Reference No./Cheque No.': f"REF{number:06d}",
+            'Debit': debit,
+            'Credit': credit,
+            'Balance': round(balance, 2),
+            'Transaction_Type': transaction_type,
+            'Transaction_Mode': 'UPI',
+            'DR/CR_Indicator': 'DR' if debit else 'CR',
+            'Transaction_ID': f"{number:012d}",
+            'Recipient_Name': f"RECIPIENT {number % 3}",
+            'Bank': 'HDFC',
+            'UPI_ID': f"upi{number % 3}",
+            'Note': 'UPI',
+        })
+    df = pd.DataFrame.from_records(records)
+    df['Transaction_Date'] = pd.to_datetime(df['Transaction_Date'])
+    return df
+
+
+STATEMENT_ROWS = [
+    ('2024-01-05', 'TO', 120.0, 0.0),
+    ('2024-01-20', 'BY', 0.0, 5000.0),
+    ('2024-02-03', 'TO', 300.0, 0.0),
+    ('2024-02-03', 'TO', 45.5, 0.0),
+    ('2024-03-11', 'ATM', 2000.0, 0.0),
+    ('2024-03-28', 'TO', 80.0, 0.0),
+]
+
+
+class StatementTestCase(TestCase):
+    """
+    Points the transaction store at a temporary statement CSV and partition
+    directory, and starts each test with empty store and response caches.
+    """
+
+    rows = STATEMENT_ROWS
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix='spendwise-test-')
+        self.addCleanup(shutil.rmtree, self.tmpdir, ignore_errors=True)
+        self.csv_path = os.path.join(self.tmpdir, 'statement.csv')
+        self.df = statement(self.rows)
+        self.df.to_csv(self.csv_path, index=False)
+
+        settings_override = override_settings(
+            TRANSACTIONS_FILE=self.csv_path,
+            TRANSACTIONS_COLUMNAR_FILE=os.path.join(self.tmpdir, 'statement.arrow'),
+            TRANSACTIONS_PARTITION_DIR=os.path.join(self.tmpdir, 'partitions'),
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.clear_caches()
+        self.addCleanup(self.clear_caches)
+
+    def clear_caches(self):
+        get_transaction_store().clear()
+        analytics_cache.clear()
+
+    def ingest(self, df=None, account='default'):
+        """Load a statement into the database and rebuild the account's partition."""
+        created = ingest_transactions(self.df if df is None else df, account=account)
+        refresh_partition(account)
+        return created
+
+
+class IngestTests(StatementTestCase):
+
+    def test_ingesting_the_same_statement_twice_adds_nothing(self):
+        self.assertEqual(len(self.ingest()), len(self.df))
+        self.assertEqual(len(self.ingest()), 0)
+        self.assertEqual(Transaction.objects.count(), len(self.df))
+
+    def test_repeated_lines_within_a_statement_are_kept(self):
+        df = pd.concat([self.df, self.df.iloc[[2]]], ignore_index=True)
+        self.assertEqual(len(self.ingest(df)), len(df))
+        self.assertEqual(len(self.ingest(df)), 0)
+        self.assertEqual(Transaction.objects.count(), len(df))
+
+    def test_only_new_lines_of_an_extended_statement_are_added(self):
+        self.ingest(self.df.iloc[:4])
+        created = self.ingest()
+        self.assertEqual(created['Reference No./Cheque No.'].tolist(), ['REF000004', 'REF000005'])
+        self.assertEqual(Transaction.objects.count(), len(self.df))
+
+    def test_replace_deletes_in_one_query_and_rebuilds_the_partition_once(self):
+        self.ingest()
+        other = statement([('2024-06-01', 'TO', 99.0, 0.0)])
+        other_csv = os.path.join(self.tmpdir, 'other.csv')
+        other.to_csv(other_csv, index=False)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            call_command('ingest_statements', other_csv, '--replace', stdout=io.StringIO())
+        self.assertEqual(callbacks, [])
+        self.assertEqual(Transaction.objects.count(), 1)
+        self.assertEqual(len(get_transaction_store().snapshot().frame), 1)
+
+        with row_signals_suspended(), self.assertNumQueries(1):
+            Transaction.objects.all().delete()
+
+    def test_row_changes_in_one_transaction_share_a_refresh(self):
+        self.ingest()
+        with mock.patch('dashboard.ingest.refresh_partition', wraps=refresh_partition) as refresh, \
+                self.captureOnCommitCallbacks(execute=True):
+            for row in Transaction.objects.all()[:3]:
+                row.note = 'edited'
+                row.save()
+            Transaction.objects.filter(pk=row.pk).delete()
+        refresh.assert_called_once_with('default')
+        self.assertEqual(len(get_transaction_store().snapshot().frame), len(self.df) - 1)
+
+    def test_build_columnar_does_not_overwrite_an_ingested_partition(self):
+        out = os.path.join(self.tmpdir, 'copy.arrow')
+        call_command('build_columnar', stdout=io.StringIO())
+        self.ingest(self.df.iloc[:4])
+        partition = get_transaction_store().snapshot().version
+        with self.assertRaisesMessage(CommandError, 'rebuilt from the database'):
+            call_command('build_columnar')
+        self.assertEqual(get_transaction_store().snapshot().version, partition)
+
+        call_command('build_columnar', '--output', out, stdout=io.StringIO())
+        self.assertTrue(os.path.exists(out))
+        call_command('build_columnar', '--force', stdout=io.StringIO())
+        self.assertEqual(len(get_transaction_store().snapshot().frame), len(self.df))
+
+
+class DashboardAnalyticsSourceTests(StatementTestCase):
+
+    def test_every_section_comes_from_the_statement_before_ingest(self):
+        _, payload = get_dashboard_analytics()
+        self.assertEqual(payload['summary']['total_transactions'], len(self.df))
+        self.assertEqual(len(payload['monthly_analysis']), 3)
+        self.assertEqual(
+            sum(month['total_debit'] for month in payload['monthly_analysis']),
+            payload['summary']['total_debit'],
+        )
+        self.assertEqual(len(payload['recent_transactions']), 5)
+
+    def test_row_edits_change_the_payload_and_etag(self):
+        self.ingest()
+        etag, payload = get_dashboard_analytics()
+
+        row = Transaction.objects.order_by('-transaction_date', '-id').first()
+        row.debit += 1000
+        with self.captureOnCommitCallbacks(execute=True):
+            row.save()
+
+        new_etag, new_payload = get_dashboard_analytics(if_none_match=etag)
+        self.assertNotEqual(new_etag, etag)
+        self.assertIsNotNone(new_payload)
+        self.assertEqual(new_payload['summary']['total_debit'], payload['summary']['total_debit'] + 1000)
+        self.assertEqual(new_payload['recent_transactions'][0]['transaction_id'], str(row.id))
+        self.assertEqual(new_payload['recent_transactions'][0]['debit'], float(row.debit))
+
+
+class TransactionListTests(StatementTestCase):
+
+    # Seven rows on one day and three on the next, so pages must split a day
+    rows = [('2024-04-01', 'TO', float(10 + n), 0.0) for n in range(7)] + [
+        ('2024-04-02', 'TO', float(100 + n), 0.0) for n in range(3)
+    ]
+
+    def setUp(self):
+        super().setUp()
+        self.ingest()
+
+    def walk(self, **params):
+        """Follow next_cursor from the first page to the last; returns the pages' ids."""
+        pages = []
+        cursor = None
+        while True:
+            query = dict(params, **({'cursor': cursor} if cursor else {}))
+            response = self.client.get('/api/transactions/', query)
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            pages.append([row['id'] for row in body['results']])
+            cursor = body['next_cursor']
+            if cursor is None:
+                self.assertIsNone(body['next'])
+                return pages
+            self.assertIn(f"cursor={cursor}", body['next'])
+
+    def test_cursor_walks_every_row_once_newest_first(self):
+        pages = self.walk(page_size=3)
+        self.assertEqual([len(page) for page in pages], [3, 3, 3, 1])
+        expected = list(
+            Transaction.objects.order_by('-transaction_date', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual([pk for page in pages for pk in page], expected)
+
+    def test_rows_with_the_same_date_are_ordered_by_id_across_pages(self):
+        pages = self.walk(page_size=2, start_date='2024-04-01', end_date='2024-04-01')
+        ids = [pk for page in pages for pk in page]
+        self.assertEqual(len(ids), 7)
+        self.assertEqual(ids, sorted(ids, reverse=True))
+
+    def test_filters_apply_to_every_page(self):
+        Transaction.objects.filter(debit__gte=100).update(transaction_type='BY')
+        pages = self.walk(page_size=2, transaction_type='BY')
+        self.assertEqual(sum(len(page) for page in pages), 3)
+
+    def test_invalid_cursor_is_rejected(self):
+        for cursor in ('not-a-cursor', 'W10', 'WyIyMDI0LTA0LTAxIiwieCJd'):
+            response = self.client.get('/api/transactions/', {'cursor': cursor})
+            self.assertEqual(response.status_code, 400, cursor)
+            self.assertIn('Invalid cursor', response.json()['error'])
+
+    def test_export_streams_every_matching_row_as_ndjson(self):
+        response = self.client.get('/api/transactions/export/', {'start_date': '2024-04-02'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row['debit'] for row in rows], [102.0, 101.0, 100.0])
+        self.assertEqual(set(rows[0]), set(TransactionSerializer.Meta.fields))
+
+
+class AnalyticsETagTests(StatementTestCase):
+
+    url = '/api/dashboard/analytics/'
+
+    def test_matching_if_none_match_gets_304(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        cached = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached['ETag'], etag)
+        self.assertEqual(cached.content, b'')
+
+        # Any one of several listed validators matches too
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=f'"stale", {etag}').status_code, 304)
+
+    def test_etag_depends_on_the_date_range(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(
+            self.url, {'start_date': '2024-02-01', 'end_date': '2024-02-29'}, HTTP_IF_NONE_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['summary']['total_transactions'], 2)
+
+    def test_data_change_invalidates_the_etag(self):
+        self.ingest()
+        first = self.client.get(self.url)
+        etag = first['ETag']
+
+        extra = statement([('2024-04-02', 'TO', 999.0, 0.0)])
+        extra['Reference No./Cheque No.'] = 'REF-NEW'
+        self.ingest(extra)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        summary = response.json()['summary']
+        self.assertEqual(summary['total_transactions'], first.json()['summary']['total_transactions'] + 1)
+        self.assertEqual(summary['total_debit'], first.json()['summary']['total_debit'] + 999)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    async def test_async_view_honours_if_none_match(self):
+        response = await self.async_client.get('/api/dashboard/async/analytics/')
+        self.assertEqual(response.status_code, 200)
+        cached = await self.async_client.get(
+            '/api/dashboard/async/analytics/', headers={'If-None-Match': response['ETag']},
+        )
+        self.assertEqual(cached.status_code, 304)
+
+
+class BackPressureTests(StatementTestCase):
+
+    url = '/api/dashboard/async/analytics/'
+
+    def setUp(self):
+        super().setUp()
+        # One worker and no queue, held busy until the test releases it
+        self.executor = BoundedExecutor(max_workers=1, max_pending=0, name='test')
+        self.addCleanup(self.executor._executor.shutdown)
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def occupy(self):
+        """Take the only slot; returns an event set once the slot is free again."""
+        freed = threading.Event()
+        # Done callbacks run in order, so this one runs after the slot is released
+        self.executor.submit(self.release.wait).add_done_callback(lambda _: freed.set())
+        return freed
+
+    def test_saturated_pool_rejects_further_calls(self):
+        freed = self.occupy()
+        with self.assertRaises(PoolSaturated):
+            self.executor.submit(len, [])
+        self.release.set()
+        self.assertTrue(freed.wait(timeout=5))
+        # The slot is freed once the busy call finishes
+        self.assertEqual(self.executor.submit(len, [1, 2]).result(timeout=5), 2)
+
+    async def test_async_analytics_answers_503_with_retry_after_when_saturated(self):
+        freed = self.occupy()
+        with mock.patch('dashboard.api.async_views.analytics_executor', self.executor):
+            with self.assertLogs('dashboard.api.async_views', 'WARNING'):
+                response = await self.async_client.get(self.url)
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response['Retry-After'], '1')
+            self.assertEqual(response.json()['error'], 'Server busy')
+
+            self.release.set()
+            self.assertTrue(await sync_to_async(freed.wait)(timeout=5))
+            self.assertEqual((await self.async_client.get(self.url)).status_code, 200)
+
+
+def histogram(exposition, name, label):
+    """(cumulative bucket counts by le, sum, count) of one histogram series in a /metrics body."""
+    buckets, total, count = {}, None, None
+    for line in exposition.splitlines():
+        sample, _, value = line.rpartition(' ')
+        if sample.startswith(f'{name}_bucket{{{label},le="'):
+            buckets[sample.split('le="')[1].rstrip('"}')] = int(value)
+        elif sample == f'{name}_sum{{{label}}}':
+            total = float(value)
+        elif sample == f'{name}_count{{{label}}}':
+            count = int(value)
+    return buckets, total, count
+
+
+class MetricsTests(StatementTestCase):
+
+    url = '/api/dashboard/analytics/'
+
+    def test_server_timing_reports_each_stage(self):
+        response = self.client.get(self.url)
+        stages = [entry.split(';dur=') for entry in response['Server-Timing'].split(', ')]
+        names = [name for name, _ in stages]
+        self.assertEqual(names, [
+            'read', 'parse_dates', 'index', 'snapshot', 'cache',
+            'summary', 'monthly', 'category', 'recent', 'render', 'total',
+        ])
+        durations = dict((name, float(duration)) for name, duration in stages)
+        self.assertTrue(all(duration >= 0 for duration in durations.values()))
+        self.assertGreaterEqual(durations['total'], durations['snapshot'])
+
+        # Served from the response cache: no load and no analytics stages
+        names = [entry.split(';')[0] for entry in self.client.get(self.url)['Server-Timing'].split(', ')]
+        self.assertEqual(names, ['snapshot', 'cache', 'render', 'total'])
+
+    def test_metrics_expose_histograms_after_a_request(self):
+        name, label = 'spendwise_request_duration_seconds', 'view="dashboard_analytics"'
+        _, _, before = histogram(self.client.get('/metrics').content.decode(), name, label)
+        self.client.get(self.url)
+        response = self.client.get('/metrics')
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+
+        self.assertIn(f'# TYPE {name} histogram', body)
+        buckets, total, count = histogram(body, name, label)
+        self.assertEqual(count, (before or 0) + 1)
+        self.assertEqual(list(buckets)[-1], '+Inf')
+        self.assertEqual(buckets['+Inf'], count)
+        # Buckets are cumulative
+        self.assertEqual(list(buckets.values()), sorted(buckets.values()))
+        self.assertGreater(total, 0)
+
+        buckets, total, count = histogram(body, 'spendwise_stage_duration_seconds', 'stage="summary"')
+        self.assertGreaterEqual(count, 1)
+        self.assertEqual(buckets['+Inf'], count)
+        self.assertIsNotNone(total)
+        self.assertIn('spendwise_cache_misses_total{cache="analytics"}', body)
+        self.assertIn('spendwise_dataset_rows ', body)
+
+
+class AnalyticsPushTests(StatementTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Uploads go to the signed-in user's own account
+        self.user = get_user_model().objects.create_user('alice')
+        self.client.force_login(self.user)
+        self.async_client.force_login(self.user)
+
+    async def subscribe(self, **dates):
+        communicator = WebsocketCommunicator(AnalyticsConsumer.as_asgi(), '/ws/analytics/')
+        # As AuthMiddlewareStack would set it for a signed-in session
+        communicator.scope['user'] = self.user
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        await communicator.send_json_to({'action': 'subscribe', 'account': 'alice', **dates})
+        snapshot = await communicator.receive_json_from(timeout=5)
+        self.assertEqual(snapshot['type'], 'analytics.snapshot')
+        return communicator, snapshot['data']
+
+    def upload(self, df, name='statement.csv'):
+        return self.async_client.post('/api/transactions/ingest/', {
+            'file': SimpleUploadedFile(name, df.to_csv(index=False).encode(), content_type='text/csv'),
+        })
+
+    async def test_uploaded_rows_are_pushed_as_a_delta(self):
+        await sync_to_async(self.ingest)(account='alice')
+        communicator, initial = await self.subscribe(start_date='2024-03-01', end_date='2024-04-30')
+        self.assertEqual(initial['summary']['total_transactions'], 2)
+
+        extra = statement([('2024-04-02', 'TO', 250.0, 0.0), ('2024-04-09', 'BY', 0.0, 1000.0)])
+        extra['Reference No./Cheque No.'] = ['REF-APR-1', 'REF-APR-2']
+        response = await self.upload(extra)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['account'], 'alice')
+        self.assertEqual(response.json()['created'], 2)
+
+        delta = await communicator.receive_json_from(timeout=5)
+        self.assertEqual(delta['type'], 'analytics.delta')
+        self.assertEqual(delta['data']['summary'], {
+            'total_transactions': 2,
+            'total_credit': 1000.0,
+            'total_debit': 250.0,
+            'current_balance': 750.0,
+        })
+        self.assertEqual(delta['data']['monthly_analysis'], [
+            {'month': 'Apr 2024', 'total_credit': 1000.0, 'total_debit': 250.0},
+        ])
+
+        # The pushed delta agrees with a fresh snapshot of the same range
+        _, payload = await sync_to_async(get_dashboard_analytics)(
+            pd.Timestamp('2024-03-01'), pd.Timestamp('2024-04-30'), 'alice',
+        )
+        self.assertEqual(payload['summary']['total_transactions'], 4)
+        await communicator.disconnect()
+
+    async def test_rows_outside_the_range_and_repeated_uploads_push_nothing(self):
+        await sync_to_async(self.ingest)(account='alice')
+        communicator, _ = await self.subscribe(start_date='2024-01-01', end_date='2024-01-31')
+        extra = statement([('2024-05-01', 'TO', 10.0, 0.0)])
+        extra['Reference No./Cheque No.'] = 'REF-MAY'
+        self.assertEqual((await self.upload(extra)).json()['created'], 1)
+        self.assertEqual((await self.upload(extra)).json()['created'], 0)
+        self.assertTrue(await communicator.receive_nothing(timeout=0.5))
+        await communicator.disconnect()
+
+    async def test_messages_that_are_not_objects_get_an_error_frame(self):
+        communicator = WebsocketCommunicator(AnalyticsConsumer.as_asgi(), '/ws/analytics/')
+        await communicator.connect()
+        for message in (['subscribe'], 'subscribe', 3, None):
+            await communicator.send_json_to(message)
+            self.assertEqual(await communicator.receive_json_from(timeout=5), {
+                'type': 'error', 'error': 'Messages must be JSON objects',
+            })
+        # The connection is still usable afterwards
+        await communicator.send_json_to({'action': 'unsubscribe'})
+        self.assertEqual((await communicator.receive_json_from(timeout=5))['error'], 'Unknown action')
+        await communicator.disconnect()
+
+    def test_upload_rejects_a_statement_without_the_expected_columns(self):
+        response = self.client.post('/api/transactions/ingest/', {
+            'file': SimpleUploadedFile('statement.csv', b'Transaction_Date,Debit\n2024-05-01,10\n',
+                                       content_type='text/csv'),
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('missing columns', response.json()['error'])
+
+    def test_upload_requires_a_user_and_ignores_the_account_field(self):
+        extra = statement([('2024-05-01', 'TO', 10.0, 0.0)])
+
+        def post(client):
+            return client.post('/api/transactions/ingest/', {
+                'account': 'default',
+                'file': SimpleUploadedFile('statement.csv', extra.to_csv(index=False).encode(),
+                                           content_type='text/csv'),
+            })
+
+        self.client.logout()
+        self.assertEqual(post(self.client).status_code, 403)
+        self.assertFalse(Transaction.objects.exists())
+
+        self.client.force_login(self.user)
+        self.assertEqual(post(self.client).json()['account'], 'alice')
+        self.assertEqual(list(Transaction.objects.values_list('account', flat=True)), ['alice'])
+
+
+class BatchAnalyticsTests(StatementTestCase):
+
+    url = '/api/dashboard/analytics/batch/'
+
+    def post(self, body):
+        return self.client.post(self.url, body, content_type='application/json')
+
+    def test_each_range_matches_the_single_range_endpoint(self):
+        self.ingest()
+        ranges = [
+            {'key': 'january', 'start_date': '2024-01-01', 'end_date': '2024-01-31'},
+            {'key': 'q1', 'start_date': '2024-01-01', 'end_date': '2024-03-31'},
+            {'key': 'all'},
+        ]
+        response = self.post({'ranges': ranges})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        for item in ranges:
+            query = {key: item[key] for key in ('start_date', 'end_date') if key in item}
+            single = self.client.get('/api/dashboard/analytics/', query).json()
+            self.assertEqual(results[item['key']], single, item['key'])
+
+    def test_sections_select_the_returned_keys(self):
+        response = self.post({'sections': ['summary'], 'ranges': [{'key': 'all'}]})
+        self.assertEqual(list(response.json()['results']['all']), ['summary'])
+
+    def test_sections_must_be_a_list_of_known_names(self):
+        response = self.post({'sections': 'monthly_analysis', 'ranges': [{'key': 'all'}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('sections must be a list', response.json()['error'])
+
+        response = self.post({'sections': ['summary', 'weekly'], 'ranges': [{'key': 'all'}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], 'Unknown sections: weekly')
+
+
+class AccountAccessTests(StatementTestCase):
+
+    def setUp(self):
+        super().setUp()
+        User = get_user_model()
+        self.alice = User.objects.create_user('alice')
+        self.bob = User.objects.create_user('bob')
+        self.ingest(account='alice')
+
+    def requests(self, account):
+        """Every read endpoint, as (name, response) for one account."""
+        query = {'account': account}
+        yield 'analytics', self.client.get('/api/dashboard/analytics/', query)
+        yield 'async analytics', self.client.get('/api/dashboard/async/analytics/', query)
+        yield 'batch', self.client.post('/api/dashboard/analytics/batch/', {
+            'account': account, 'ranges': [{'key': 'all'}],
+        }, content_type='application/json')
+        yield 'list', self.client.get('/api/transactions/', query)
+        yield 'export', self.client.get('/api/transactions/export/', query)
+        yield 'voice', self.client.post('/api/dashboard/voice/query/', {
+            'account': account, 'intent': 'spend_in_period', 'parameters': {'month': '2024-02'},
+        }, content_type='application/json')
+
+    def test_another_users_account_is_forbidden(self):
+        self.client.force_login(self.bob)
+        for name, response in self.requests('alice'):
+            self.assertEqual(response.status_code, 403, name)
+
+    def test_anonymous_callers_only_read_public_accounts(self):
+        for name, response in self.requests('alice'):
+            self.assertEqual(response.status_code, 403, name)
+        self.ingest()
+        for name, response in self.requests('default'):
+            self.assertEqual(response.status_code, 200, name)
+
+    def test_owner_and_staff_read_the_account(self):
+        staff = get_user_model().objects.create_user('auditor', is_staff=True)
+        for user in (self.alice, staff):
+            self.client.force_login(user)
+            for name, response in self.requests('alice'):
+                self.assertEqual(response.status_code, 200, (user.username, name))
+
+    def test_voice_tool_calls_are_checked_per_call(self):
+        self.client.force_login(self.bob)
+        call = {'id': 'other', 'function': {'name': 'spend_in_period', 'arguments': {'account': 'alice'}}}
+        response = self.client.post('/api/dashboard/voice/query/', {
+            'message': {'type': 'tool-calls', 'toolCallList': [call]},
+        }, content_type='application/json')
+        self.assertEqual(response.json()['results'][0]['result'], "Error: Not allowed to read account 'alice'")
+
+    async def test_websocket_subscription_is_checked(self):
+        communicator = WebsocketCommunicator(AnalyticsConsumer.as_asgi(), '/ws/analytics/')
+        communicator.scope['user'] = self.bob
+        await communicator.connect()
+        await communicator.send_json_to({'action': 'subscribe', 'account': 'alice'})
+        self.assertEqual(await communicator.receive_json_from(timeout=5), {
+            'type': 'error', 'error': "Not allowed to read account 'alice'",
+        })
+        await communicator.disconnect()
+
+
+class PartitionedStoreTests(StatementTestCase):
+
+    def setUp(self):
+        super().setUp()
+        for account in ('alice', 'bob', 'carol'):
+            self.ingest(account=account)
+
+    def test_hits_and_misses_are_counted_per_lookup(self):
+        store = PartitionedStore(max_bytes=2 ** 30)
+        first = store.snapshot('alice')
+        self.assertIs(store.snapshot('alice'), first)
+        store.snapshot('bob')
+        stats = store.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions']), (1, 2, 0))
+        self.assertEqual(stats['partitions'], 2)
+        self.assertEqual(stats['resident_rows'], 2 * len(self.df))
+        self.assertEqual(stats['resident_bytes'], 2 * first.nbytes)
+
+    def test_least_recently_used_partitions_are_evicted_beyond_the_budget(self):
+        nbytes = PartitionedStore(max_bytes=2 ** 30).snapshot('alice').nbytes
+        # Room for two partitions, not three
+        store = PartitionedStore(max_bytes=2 * nbytes + nbytes // 2)
+        store.snapshot('alice')
+        store.snapshot('bob')
+        store.snapshot('alice')
+        store.snapshot('carol')
+        stats = store.stats()
+        self.assertEqual((stats['partitions'], stats['evictions']), (2, 1))
+        self.assertLessEqual(stats['resident_bytes'], store.max_bytes)
+
+        # bob was the least recently used, so only he is loaded again
+        store.snapshot('alice')
+        store.snapshot('bob')
+        self.assertEqual(store.stats()['misses'], 4)
+
+    def test_the_most_recent_partition_is_kept_over_budget(self):
+        store = PartitionedStore(max_bytes=1)
+        store.snapshot('alice')
+        store.snapshot('bob')
+        stats = store.stats()
+        self.assertEqual((stats['partitions'], stats['evictions']), (1, 1))
+
+    def test_unknown_accounts_are_not_cached(self):
+        store = PartitionedStore(max_bytes=2 ** 30)
+        with self.assertRaises(LookupError):
+            store.snapshot('dave')
+        self.assertEqual(store.stats()['partitions'], 0)
+
+
+class ManualExecutor:
+    """
+    Stands in for a BoundedExecutor: submitted calls are queued and run on the
+    test's own thread by ``run_pending``, so each step of a session can be
+    observed. ``capacity`` bounds queued calls like the pool's slots do.
+    """
+
+    def __init__(self, capacity=None):
+        self.capacity = capacity
+        self.pending = []
+
+    def submit(self, func, *args, **kwargs):
+        if self.capacity is not None and len(self.pending) >= self.capacity:
+            raise PoolSaturated("no free slot")
+        self.pending.append((func, args, kwargs))
+
+    def run_pending(self):
+        while self.pending:
+            func, args, kwargs = self.pending.pop(0)
+            func(*args, **kwargs)
+
+
+@override_settings(VOICE_CLIENT='fake', VAPI_ASSISTANT_ID='assistant')
+class VoiceSessionManagerTests(TestCase):
+
+    def setUp(self):
+        self.executor = ManualExecutor()
+        self.clients = []
+        self.manager = self.make_manager()
+
+    def make_manager(self, **kwargs):
+        def client_factory():
+            self.clients.append(FakeVapi())
+            return self.clients[-1]
+
+        manager = VoiceSessionManager(self.executor, client_factory=client_factory, reap_interval=3600, **kwargs)
+        self.addCleanup(manager._shutdown.set)
+        return manager
+
+    def test_start_returns_at_once_and_connects_in_the_pool(self):
+        session = self.manager.start('alice')
+        self.assertEqual(session.state, STARTING)
+        self.assertEqual(self.clients, [])
+
+        self.executor.run_pending()
+        self.assertEqual(self.manager.get('alice').to_dict(), {
+            'session_id': session.id,
+            'status': ACTIVE,
+            'is_active': True,
+            'transcription': FakeVapi().transcription,
+            'response': FakeVapi().response,
+            'error': None,
+        })
+        self.assertTrue(self.clients[0].is_active)
+
+    def test_start_while_running_returns_the_same_session(self):
+        session = self.manager.start('alice')
+        self.assertIs(self.manager.start('alice'), session)
+        self.executor.run_pending()
+        self.assertIs(self.manager.start('alice'), session)
+        self.assertEqual(len(self.clients), 1)
+
+    def test_stop_disconnects_and_keeps_the_result(self):
+        session = self.manager.start('alice')
+        self.executor.run_pending()
+
+        self.assertEqual(self.manager.stop(session).state, STOPPING)
+        self.executor.run_pending()
+        self.assertEqual(session.state, STOPPED)
+        self.assertFalse(self.clients[0].is_active)
+        self.assertEqual(session.transcription, self.clients[0].transcription)
+        self.assertIsNone(session.client)
+
+    def test_stop_while_starting_stops_once_connected(self):
+        session = self.manager.start('alice')
+        self.manager.stop(session)
+        self.assertEqual(session.state, STOPPING)
+        self.assertTrue(session.stop_requested)
+
+        self.executor.run_pending()
+        self.assertEqual(session.state, STOPPED)
+        self.assertEqual(self.clients[0].calls, 1)
+        self.assertFalse(self.clients[0].is_active)
+        # A new start is a new session rather than the one being stopped
+        self.assertIsNot(self.manager.start('alice'), session)
+
+    def test_sessions_are_private_to_their_owner(self):
+        session = self.manager.start('alice')
+        self.assertIsNone(self.manager.get('bob', session.id))
+        self.assertIsNone(self.manager.get('bob'))
+        self.assertIs(self.manager.get('alice', session.id), session)
+
+    def test_stopped_clients_are_reused_up_to_the_pool_size(self):
+        manager = self.make_manager(pool_size=1)
+        first, second = manager.start('alice'), manager.start('bob')
+        self.executor.run_pending()
+        manager.stop(first)
+        manager.stop(second)
+        self.executor.run_pending()
+        self.assertEqual(len(self.clients), 2)
+        self.assertEqual(len(manager._clients), 1)
+
+        third = manager.start('carol')
+        self.executor.run_pending()
+        self.assertEqual(third.state, ACTIVE)
+        self.assertEqual(len(self.clients), 2)
+        self.assertEqual(sum(client.calls for client in self.clients), 3)
+
+    def test_client_that_fails_to_stop_is_not_reused(self):
+        session = self.manager.start('alice')
+        self.executor.run_pending()
+        with mock.patch.object(self.clients[0], 'stop', side_effect=RuntimeError('hung up')), \
+                self.assertLogs('dashboard.voice', 'ERROR'):
+            self.manager.stop(session)
+            self.executor.run_pending()
+        self.assertEqual(session.state, FAILED)
+        self.assertEqual(session.error, 'hung up')
+        self.assertEqual(len(self.manager._clients), 0)
+
+    def test_failed_start_is_reported(self):
+        with mock.patch.object(FakeVapi, 'start', side_effect=ConnectionError('no route')), \
+                self.assertLogs('dashboard.voice', 'ERROR'):
+            session = self.manager.start('alice')
+            self.executor.run_pending()
+        self.assertEqual(session.state, FAILED)
+        self.assertEqual(session.to_dict()['error'], 'no route')
+
+    def test_idle_sessions_are_reaped_then_forgotten(self):
+        manager = self.make_manager(idle_timeout=60)
+        idle, busy = manager.start('alice'), manager.start('bob')
+        self.executor.run_pending()
+        idle.last_seen -= 120
+
+        self.assertEqual(manager.reap(), 1)
+        self.assertEqual(idle.state, STOPPING)
+        self.assertEqual(busy.state, ACTIVE)
+        self.executor.run_pending()
+        self.assertEqual(idle.state, STOPPED)
+
+        manager.reap()
+        self.assertIsNone(manager.get('alice'))
+        self.assertIs(manager.get('bob'), busy)
+
+    def test_saturated_pool_rejects_the_start(self):
+        manager = VoiceSessionManager(ManualExecutor(capacity=0), client_factory=FakeVapi)
+        with self.assertRaises(PoolSaturated):
+            manager.start('alice')
+        self.assertIsNone(manager.get('alice'))
+
+    def test_voice_endpoints_report_the_session(self):
+        with mock.patch('dashboard.api.views.get_voice_manager', return_value=self.manager):
+            response = self.client.post('/api/dashboard/voice/start/')
+            self.assertEqual(response.status_code, 202)
+            session_id = response.json()['session_id']
+            self.executor.run_pending()
+
+            status = self.client.get('/api/dashboard/voice/status/', {'session_id': session_id}).json()
+            self.assertTrue(status['is_active'])
+
+            response = self.client.post('/api/dashboard/voice/stop/', {'session_id': session_id})
+            self.assertEqual(response.json()['status'], STOPPING)
+            self.executor.run_pending()
+            status = self.client.get('/api/dashboard/voice/status/', {'session_id': session_id}).json()
+            self.assertEqual(status['status'], STOPPED)
+
+
+class VoiceQueryTests(StatementTestCase):
+
+    url = '/api/dashboard/voice/query/'
+
+    def test_tool_calls_are_answered_independently(self):
+        calls = [
+            {'id': 'ok', 'function': {'name': 'spend_in_period', 'arguments': {'month': '2024-02'}}},
+            {'id': 'unknown', 'function': {'name': 'net_worth', 'arguments': {}}},
+            {'id': 'bad-month', 'function': {'name': 'top_category', 'arguments': '{"month": "February"}'}},
+            {'id': 'bad-json', 'function': {'name': 'top_merchants', 'arguments': '{"limit": '}},
+            {'id': 'bad-account', 'function': {'name': 'top_merchants', 'arguments': {'account': 'no such'}}},
+        ]
+        response = self.client.post(
+            self.url, {'message': {'type': 'tool-calls', 'toolCallList': calls}}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        results = {result['toolCallId']: result['result'] for result in response.json()['results']}
+        self.assertEqual(list(results), [call['id'] for call in calls])
+        self.assertIn('you spent ₹345.50', results['ok'])
+        self.assertIn("Unknown intent 'net_worth'", results['unknown'])
+        self.assertIn("Invalid month 'February'", results['bad-month'])
+        for call_id in ('unknown', 'bad-month', 'bad-json', 'bad-account'):
+            self.assertTrue(results[call_id].startswith('Error: '), call_id)
+
+    def test_single_intent_errors_are_still_rejected(self):
+        response = self.client.post(self.url, {'intent': 'net_worth'}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_null_limit_means_the_default_and_other_bad_limits_are_rejected(self):
+        self.ingest()
+
+        def ask(limit):
+            return self.client.post(self.url, {
+                'intent': 'top_merchants', 'parameters': {'month': '2024-02', 'limit': limit},
+            }, content_type='application/json')
+
+        self.assertEqual(ask(None).status_code, 200)
+        for limit in ([3], {'n': 3}, 'three'):
+            response = ask(limit)
+            self.assertEqual(response.status_code, 400, limit)
+            self.assertIn('Invalid limit', response.json()['error'])
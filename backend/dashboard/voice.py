@@ -0,0 +1,273 @@
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+
+from django.conf import settings
+
+from .executor import PoolSaturated, voice_executor
+
+logger = logging.getLogger(__name__)
+
+# Session lifecycle
+STARTING = 'starting'
+ACTIVE = 'active'
+STOPPING = 'stopping'
+STOPPED = 'stopped'
+FAILED = 'failed'
+LIVE_STATES = (STARTING, ACTIVE, STOPPING)
+
+
+def check_voice_config():
+    if settings.VOICE_CLIENT != 'fake' and (not settings.VAPI_API_KEY or not settings.VAPI_ASSISTANT_ID):
+        raise ValueError("Voice assistant configuration is missing")
+
+
+def create_client():
+    """Build a voice client; VOICE_CLIENT=fake gives an offline FakeVapi."""
+    if settings.VOICE_CLIENT == 'fake':
+        from .fake_vapi import FakeVapi
+        return FakeVapi()
+    from vapi_python import Vapi
+    return Vapi(api_key=settings.VAPI_API_KEY)
+
+
+class VoiceSession:
+    def __init__(self, owner):
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.state = STARTING
+        self.client = None
+        self.stop_requested = False
+        self.transcription = ''
+        self.response = ''
+        self.error = None
+        self.last_seen = time.monotonic()
+
+    def touch(self):
+        self.last_seen = time.monotonic()
+
+    def to_dict(self):
+        return {
+            'session_id': self.id,
+            'status': self.state,
+            'is_active': self.state == ACTIVE,
+            'transcription': self.transcription,
+            'response': self.response,
+            'error': self.error,
+        }
+
+
+class VoiceSessionManager:
+    """
+    Voice assistant sessions keyed by owner (a user or browser session).
+
+    ``start`` and ``stop`` only record the request and hand the blocking
+    client call to the voice worker pool, so they return at once with the
+    session; callers poll ``get`` for its state. Clients that stopped cleanly
+    are kept for reuse, up to ``pool_size``. A reaper thread stops sessions
+    that have not been touched for ``idle_timeout`` seconds and forgets
+    finished ones.
+
+    Sessions live in this process, so multi-process deployments need sticky
+    routing for the voice endpoints.
+    """
+
+    def __init__(self, executor, client_factory=create_client, pool_size=4, idle_timeout=300, reap_interval=30):
+        self.executor = executor
+        self.client_factory = client_factory
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.reap_interval = reap_interval
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._by_owner = {}
+        self._clients = deque()
+        self._reaper = None
+        self._shutdown = threading.Event()
+
+    def start(self, owner):
+        """Start a session for owner, or return the one it already has running."""
+        check_voice_config()
+        with self._lock:
+            session = self._sessions.get(self._by_owner.get(owner))
+            if session is not None and session.state in LIVE_STATES and not session.stop_requested:
+                session.touch()
+                return session
+            session = VoiceSession(owner)
+            self._sessions[session.id] = session
+            self._by_owner[owner] = session.id
+        try:
+            self.executor.submit(self._start, session)
+        except PoolSaturated:
+            with self._lock:
+                self._forget(session)
+            raise
+        self._ensure_reaper()
+        return session
+
+    def stop(self, session):
+        with self._lock:
+            session.touch()
+            if session.state == STARTING:
+                # The starting worker stops the client once it has connected
+                session.stop_requested = True
+                session.state = STOPPING
+                return session
+            if session.state != ACTIVE:
+                return session
+            session.state = STOPPING
+        try:
+            self.executor.submit(self._stop, session)
+        except PoolSaturated:
+            with self._lock:
+                session.state = ACTIVE
+            raise
+        return session
+
+    def get(self, owner, session_id=None):
+        """Owner's session by id, or its latest one when no id is given."""
+        with self._lock:
+            session = self._sessions.get(session_id or self._by_owner.get(owner))
+            if session is None or session.owner != owner:
+                return None
+            session.touch()
+            return session
+
+    def _start(self, session):
+        try:
+            client = self._acquire_client()
+            self._attach_callbacks(session, client)
+            with self._lock:
+                session.client = client
+            logger.info(f"Starting voice session {session.id}")
+            client.start(assistant_id=settings.VAPI_ASSISTANT_ID)
+        except Exception as e:
+            logger.error(f"Voice session {session.id} failed to start: {str(e)}", exc_info=True)
+            with self._lock:
+                session.state = FAILED
+                session.error = str(e)
+                session.client = None
+            return
+
+        with self._lock:
+            if not session.stop_requested:
+                session.state = ACTIVE
+                logger.info(f"Voice session {session.id} started")
+                return
+        self._stop(session)
+
+    def _stop(self, session):
+        client = session.client
+        try:
+            logger.info(f"Stopping voice session {session.id}")
+            result = client.stop() or {}
+        except Exception as e:
+            # A client that failed to stop is not reused
+            logger.error(f"Voice session {session.id} failed to stop: {str(e)}", exc_info=True)
+            with self._lock:
+                session.state = FAILED
+                session.error = str(e)
+                session.client = None
+            return
+
+        with self._lock:
+            session.transcription = result.get('transcription', session.transcription)
+            session.response = result.get('response', session.response)
+            session.state = STOPPED
+            session.client = None
+            if len(self._clients) < self.pool_size:
+                self._clients.append(client)
+        logger.info(f"Voice session {session.id} stopped")
+
+    def _acquire_client(self):
+        with self._lock:
+            if self._clients:
+                return self._clients.popleft()
+        return self.client_factory()
+
+    @staticmethod
+    def _attach_callbacks(session, client):
+        def on_speech_start():
+            logger.info(f"Voice session {session.id}: speech started")
+
+        def on_speech_end():
+            logger.info(f"Voice session {session.id}: speech ended")
+
+        def on_transcription(text):
+            logger.info(f"Voice session {session.id} transcription: {text}")
+            session.transcription = text
+
+        def on_response(response):
+            logger.info(f"Voice session {session.id} assistant response: {response}")
+            session.response = response
+
+        client.on_speech_start = on_speech_start
+        client.on_speech_end = on_speech_end
+        client.on_transcription = on_transcription
+        client.on_response = on_response
+
+    def _forget(self, session):
+        self._sessions.pop(session.id, None)
+        if self._by_owner.get(session.owner) == session.id:
+            del self._by_owner[session.owner]
+
+    def reap(self):
+        """Stop idle sessions and drop finished ones. Returns how many were stopped."""
+        cutoff = time.monotonic() - self.idle_timeout
+        idle = []
+        with self._lock:
+            for session in list(self._sessions.values()):
+                if session.last_seen > cutoff:
+                    continue
+                if session.state == ACTIVE:
+                    session.state = STOPPING
+                    idle.append(session)
+                elif session.state in (STOPPED, FAILED):
+                    self._forget(session)
+
+        stopped = 0
+        for session in idle:
+            try:
+                self.executor.submit(self._stop, session)
+                stopped += 1
+            except PoolSaturated:
+                # Try again on the next pass
+                with self._lock:
+                    session.state = ACTIVE
+        if stopped:
+            logger.info(f"Reaped {stopped} idle voice sessions")
+        return stopped
+
+    def _ensure_reaper(self):
+        with self._lock:
+            if self._reaper is not None:
+                return
+            self._reaper = threading.Thread(target=self._reap_forever, name='voice-reaper', daemon=True)
+        self._reaper.start()
+
+    def _reap_forever(self):
+        while not self._shutdown.wait(self.reap_interval):
+            try:
+                self.reap()
+            except Exception as e:
+                logger.error(f"Error reaping voice sessions: {str(e)}", exc_info=True)
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_voice_manager():
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = VoiceSessionManager(
+                    voice_executor,
+                    pool_size=settings.VOICE_CLIENT_POOL_SIZE,
+                    idle_timeout=settings.VOICE_IDLE_TIMEOUT,
+                    reap_interval=settings.VOICE_REAP_INTERVAL,
+                )
+    return _manager
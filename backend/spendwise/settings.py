@@ -36,6 +36,8 @@ ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
 # Application definition
 
 INSTALLED_APPS = [
+    # First, so runserver serves ASGI_APPLICATION (HTTP and the analytics websocket)
+    'daphne',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -76,6 +78,16 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'spendwise.wsgi.application'
+ASGI_APPLICATION = 'spendwise.asgi.application'
+
+# Channel layer for analytics websockets. The in-memory layer is enough for
+# local testing; point CHANNEL_LAYER_BACKEND at channels_redis.core.RedisChannelLayer
+# so ingest commands and multiple server processes share one layer.
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': os.getenv('CHANNEL_LAYER_BACKEND', 'channels.layers.InMemoryChannelLayer'),
+    }
+}
 
 
 # Database
@@ -138,8 +150,46 @@ CORS_ALLOWED_ORIGINS = os.getenv('CORS_ALLOWED_ORIGINS', 'http://localhost:3000,
 
 CORS_ALLOW_ALL_ORIGINS = os.getenv('CORS_ALLOW_ALL_ORIGINS', 'False') == 'True'
 
+# Processed bank statement served by the analytics API
+TRANSACTIONS_FILE = str(BASE_DIR / os.getenv('TRANSACTIONS_FILE', 'csvs/Merge_Proccessed.csv'))
+
+# Date-sorted Arrow IPC copy written by `manage.py build_columnar`; preferred when present
+TRANSACTIONS_COLUMNAR_FILE = str(BASE_DIR / os.getenv('TRANSACTIONS_COLUMNAR_FILE', 'csvs/Merge_Proccessed.arrow'))
+
+# Per-account Arrow partitions written by `manage.py ingest_statements --account`
+TRANSACTIONS_PARTITION_DIR = str(BASE_DIR / os.getenv('TRANSACTIONS_PARTITION_DIR', 'csvs/partitions'))
+
+# Accounts anyone may read; every other account only by the user named after it and staff
+PUBLIC_ACCOUNTS = [name for name in os.getenv('PUBLIC_ACCOUNTS', 'default').split(',') if name]
+
+# Memory budget for loaded account partitions; least recently used ones are dropped beyond it
+TRANSACTIONS_PARTITION_MEMORY_MB = int(os.getenv('TRANSACTIONS_PARTITION_MEMORY_MB', '512'))
+
+# Number of (account, data version, date range) analytics payloads kept in memory
+ANALYTICS_CACHE_SIZE = int(os.getenv('ANALYTICS_CACHE_SIZE', '256'))
+
+# Thread pools used by the async views; requests beyond workers + max pending get 503
+ANALYTICS_POOL_WORKERS = int(os.getenv('ANALYTICS_POOL_WORKERS', '4'))
+ANALYTICS_POOL_MAX_PENDING = int(os.getenv('ANALYTICS_POOL_MAX_PENDING', '16'))
+VOICE_POOL_WORKERS = int(os.getenv('VOICE_POOL_WORKERS', '2'))
+VOICE_POOL_MAX_PENDING = int(os.getenv('VOICE_POOL_MAX_PENDING', '4'))
+
+# Voice assistant. VOICE_CLIENT=fake swaps in an offline client for development and tests
+VAPI_API_KEY = os.getenv('VAPI_API_KEY')
+VAPI_ASSISTANT_ID = os.getenv('VAPI_ASSISTANT_ID')
+VOICE_CLIENT = os.getenv('VOICE_CLIENT', 'vapi')
+# Stopped clients kept for reuse by later sessions
+VOICE_CLIENT_POOL_SIZE = int(os.getenv('VOICE_CLIENT_POOL_SIZE', '4'))
+# Sessions not polled or stopped for this many seconds are stopped by the reaper
+VOICE_IDLE_TIMEOUT = int(os.getenv('VOICE_IDLE_TIMEOUT', '300'))
+VOICE_REAP_INTERVAL = int(os.getenv('VOICE_REAP_INTERVAL', '30'))
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
-    ]
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'dashboard.api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
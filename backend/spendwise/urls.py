@@ -18,8 +18,12 @@ from django.contrib import admin
 from django.urls import path, include
 from django.views.generic import RedirectView
 
+from dashboard.api.views import prometheus_metrics
+
 urlpatterns = [
     path('', RedirectView.as_view(url='/api/dashboard/analytics/', permanent=False)),
     path('admin/', admin.site.urls),
     path('api/dashboard/', include('dashboard.api.urls')),
+    path('api/transactions/', include('dashboard.api.transaction_urls')),
+    path('metrics', prometheus_metrics, name='metrics'),
 ]
@@ -0,0 +1,143 @@
+"""
+Bytes sent over the wire per dashboard interaction, before and after
+pattern-matching ids and the clientside modal callback.
+
+"before" is the original wiring: every figure callback also wrote its figure
+to a dcc.Store, a server callback per chart copied the store into the modal
+graph (the store travels up in the request and back down in the response),
+and a server callback per chart toggled its modal. "after" returns each
+figure once; opening a modal copies the rendered figure in the browser.
+
+Both wirings are measured by serializing the request and response bodies of
+every server callback they fire, as Dash's callback protocol sends them, with
+the figures the current callbacks return (so only the wiring differs).
+Round-trips count server callbacks fired.
+
+Usage:
+    python benchmarks/bench_dash_payload.py [--rows 100000] [--seed 0]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+from plotly.io.json import to_json_plotly
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, '..', 'ML', 'Dashboard'))
+
+from bench_suite import CallbackRecorder  # noqa: E402
+from synthetic import write_statement  # noqa: E402
+
+GENERAL_CHARTS = ['freq-bar', 'top-transactions', 'amount-pie', 'date-trend']
+
+
+def component_id(id):
+    # Dash sends pattern-matching ids as JSON with sorted keys
+    return id if isinstance(id, str) else json.dumps(id, sort_keys=True, separators=(',', ':'))
+
+
+def callback_bytes(outputs, inputs, values, state=()):
+    """
+    Request plus response body of one server callback. outputs are (id, prop),
+    inputs and state (id, prop, value), and values the returned value of each
+    output.
+    """
+    outputs = [(component_id(id), prop) for id, prop in outputs]
+    request = {
+        'output': '..' + '...'.join(f'{id}.{prop}' for id, prop in outputs) + '..',
+        'outputs': [{'id': id, 'property': prop} for id, prop in outputs],
+        'inputs': [{'id': id, 'property': prop, 'value': value} for id, prop, value in inputs],
+        'changedPropIds': [f'{id}.{prop}' for id, prop, _ in inputs[:1]],
+    }
+    if state:
+        request['state'] = [{'id': id, 'property': prop, 'value': value} for id, prop, value in state]
+    response = {'multi': True, 'response': {}}
+    for (id, prop), value in zip(outputs, values):
+        response['response'].setdefault(id, {})[prop] = value
+    return sum(len(to_json_plotly(body).encode()) for body in (request, response))
+
+
+def before(inputs, charts, figures):
+    """(bytes, round-trips) of the original wiring for one figure callback."""
+    outputs = [(name, 'figure') for name in charts] + [(f'store-{name}', 'data') for name in charts]
+    size = callback_bytes(outputs, inputs, figures + figures)
+    for name, fig in zip(charts, figures):
+        # The store change fires the copy into the chart's modal graph
+        size += callback_bytes([(f'modal-{name}', 'figure')], [(f'store-{name}', 'data', fig)], [fig])
+    return size, 1 + len(charts)
+
+
+def after(inputs, charts, figures):
+    """(bytes, round-trips) of the current wiring for one figure callback."""
+    from helpers import chart_id
+
+    return callback_bytes([(chart_id(name), 'figure') for name in charts], inputs, figures), 1
+
+
+def interactions(df, callbacks):
+    """(name, [(trigger inputs, charts, figures) per figure callback fired]) for each user interaction."""
+    start = df['Transaction_Date'].min().strftime('%Y-%m-%d')
+    end = df['Transaction_Date'].max().strftime('%Y-%m-%d')
+    year = int(df['Year'].max())
+    month = int(df.loc[df['Year'] == year, 'Month_Num'].mode()[0])
+    week = int(df.loc[(df['Year'] == year) & (df['Month_Num'] == month), 'Week_Num'].mode()[0])
+
+    dates = [('date-picker-range', 'start_date', start), ('date-picker-range', 'end_date', end)]
+    year_input = [('year-dropdown', 'value', year)]
+    month_input = year_input + [('month-dropdown', 'value', month)]
+    week_input = month_input + [('week-dropdown', 'value', week)]
+    return [
+        ('pick date range', [(dates, GENERAL_CHARTS, list(callbacks['update_general_analysis'](start, end)))]),
+        ('pick year', [(year_input, ['yearly-summary'], [callbacks['update_yearly_summary'](year)])]),
+        ('pick month', [(month_input, ['monthly-summary'], [callbacks['update_monthly_summary'](year, month)])]),
+        ('pick week', [(week_input, ['weekly-summary'], [callbacks['update_weekly_summary'](year, month, week)]),
+                       (week_input, ['daily-summary'], [callbacks['update_daily_summary'](year, month, week)])]),
+        ('open modal', []),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    from callbacks import register_callbacks
+    from data_processing import load_data
+    from figure_cache import FigureCache
+
+    path = os.path.join(tempfile.mkdtemp(prefix='spendwise-payload-'), 'statement.csv')
+    write_statement(path, args.rows, seed=args.seed)
+    df = load_data(path)
+    app = CallbackRecorder()
+    register_callbacks(app, df, figures=FigureCache(None, size_limit=0))
+
+    header = f"{'interaction':<16} | {'before':>12} {'trips':>5} | {'after':>12} {'trips':>5}"
+    print(f"{args.rows:,} rows")
+    print(header)
+    print('-' * len(header))
+    for name, fired in interactions(df, app.callbacks):
+        if fired:
+            before_bytes = before_trips = after_bytes = after_trips = 0
+            for inputs, charts, figures in fired:
+                size, trips = before(inputs, charts, figures)
+                before_bytes, before_trips = before_bytes + size, before_trips + trips
+                size, trips = after(inputs, charts, figures)
+                after_bytes, after_trips = after_bytes + size, after_trips + trips
+        else:
+            # Toggling the modal was a server callback; now it runs in the browser
+            before_bytes = callback_bytes(
+                [('modal-freq', 'is_open')],
+                [('btn-expand-freq', 'n_clicks', 1), ('close-modal-freq', 'n_clicks', None)],
+                [True],
+                state=[('modal-freq', 'is_open', False)],
+            )
+            before_trips, after_bytes, after_trips = 1, 0, 0
+        print(f"{name:<16} | {before_bytes:>12,} {before_trips:>5} | {after_bytes:>12,} {after_trips:>5}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Load time and resident memory of the dashboard's load_data, before and after
+the explicit in-memory schema.
+
+"before" is the original loader: pd.read_csv with inferred dtypes (every text
+column a Python-object column), Month from strftime('%B'), Week_Num from
+strftime('%U') and Day as Python date objects. "after" is
+ML/Dashboard/data_processing.load_data. Memory is the deep memory_usage of
+each column.
+
+Usage:
+    python benchmarks/bench_load_data.py [--rows 1000000] [--repeat 3] [--seed 0]
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, '..', 'ML', 'Dashboard'))
+
+from synthetic import write_statement  # noqa: E402
+
+
+def load_before(file_path):
+    df = pd.read_csv(file_path)
+    df['Transaction_Date'] = pd.to_datetime(df['Transaction_Date'])
+    df = df.sort_values('Transaction_Date', kind='stable', ignore_index=True)
+    df['Year'] = df['Transaction_Date'].dt.year
+    df['Month_Num'] = df['Transaction_Date'].dt.month
+    df['Month'] = df['Transaction_Date'].dt.strftime('%B')
+    df['Week_Num'] = df['Transaction_Date'].dt.strftime('%U').astype(int) + 1
+    df['Day'] = df['Transaction_Date'].dt.date
+    return df
+
+
+def best_time(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    from data_processing import load_data, memory_report
+
+    path = os.path.join(tempfile.mkdtemp(prefix='spendwise-load-'), 'statement.csv')
+    write_statement(path, args.rows, seed=args.seed)
+
+    before_df, after_df = load_before(path), load_data(path)
+    before, after = memory_report(before_df), memory_report(after_df)
+    header = f"{'column':<26} {'before dtype':>14} {'before MiB':>11} | {'after dtype':>16} {'after MiB':>10}"
+    print(f"{args.rows:,} rows")
+    print(header)
+    print('-' * len(header))
+    for col in before.index:
+        print(f"{col:<26} {str(before_df[col].dtype):>14} {before[col] / 2 ** 20:>11.1f} | "
+              f"{str(after_df[col].dtype):>16} {after[col] / 2 ** 20:>10.1f}")
+    print(f"{'total':<26} {'':>14} {before.sum() / 2 ** 20:>11.1f} | {'':>16} {after.sum() / 2 ** 20:>10.1f}"
+          f"   ({before.sum() / after.sum():.1f}x)")
+
+    del before_df, after_df
+    before_s = best_time(lambda: load_before(path), args.repeat)
+    after_s = best_time(lambda: load_data(path), args.repeat)
+    print(f"\nload time  before {before_s:.2f} s   after {after_s:.2f} s   ({before_s / after_s:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Serialization cost of the analytics API as shipped, rendered by DRF's
+JSONRenderer versus ORJSONRenderer, the API's default renderer.
+
+Requests are built with RequestFactory and sent through the real views, so
+"view" covers the snapshot lookup and the assembly of every section, and
+"render" the encoding of the response. The response cache is cleared before
+each request so nothing is served from it; the statement (generated with
+benchmarks/synthetic.py) is loaded into the transaction store once up front.
+Two endpoints are measured over date ranges ending on the statement's last
+day:
+
+  * analytics - GET /api/dashboard/analytics/ for the range
+  * batch     - POST /api/dashboard/analytics/batch/ with one range per
+                calendar month of the range
+
+Both renderers must produce the same JSON document; the benchmark checks it.
+
+Usage:
+    python benchmarks/bench_serialization.py [--rows 200000] [--years 1 3 10] [--repeat 5] [--seed 0]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, '..', 'backend'))
+
+from synthetic import write_statement  # noqa: E402
+
+WORKDIR = tempfile.mkdtemp(prefix='spendwise-serialization-')
+STATEMENT_CSV = os.path.join(WORKDIR, 'statement.csv')
+
+
+def setup_django():
+    # Point the default account at the synthetic statement before settings load
+    os.environ['TRANSACTIONS_FILE'] = STATEMENT_CSV
+    os.environ['TRANSACTIONS_COLUMNAR_FILE'] = os.path.join(WORKDIR, 'statement.arrow')
+    os.environ['TRANSACTIONS_PARTITION_DIR'] = os.path.join(WORKDIR, 'partitions')
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'spendwise.settings')
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    import django
+    django.setup()
+
+
+def time_request(view, make_request, repeat):
+    """Best view and render times of ``repeat`` requests, and the last rendered body."""
+    from dashboard.analytics import analytics_cache
+
+    best_view = best_render = float('inf')
+    for _ in range(repeat):
+        analytics_cache.clear()
+        request = make_request()
+        gc.collect()
+        start = time.perf_counter()
+        response = view(request)
+        rendered = time.perf_counter()
+        response.render()
+        done = time.perf_counter()
+        assert response.status_code == 200, response.content[:200]
+        best_view = min(best_view, rendered - start)
+        best_render = min(best_render, done - rendered)
+    return best_view, best_render, response.content
+
+
+def endpoints(start, end):
+    """(name, view class, request factory) for a date range."""
+    from rest_framework.test import APIRequestFactory
+
+    from dashboard.api.views import BatchAnalyticsView, DashboardAnalyticsView
+
+    factory = APIRequestFactory()
+    months = pd.date_range(start.to_period('M').to_timestamp(), end, freq='MS')
+    batch = {'ranges': [
+        {
+            'key': month.strftime('%Y-%m'),
+            'start_date': max(month, start).strftime('%Y-%m-%d'),
+            'end_date': min(month + pd.offsets.MonthEnd(0), end).strftime('%Y-%m-%d'),
+        }
+        for month in months
+    ]}
+    query = {'start_date': start.strftime('%Y-%m-%d'), 'end_date': end.strftime('%Y-%m-%d')}
+    return [
+        ('analytics', DashboardAnalyticsView, lambda: factory.get('/api/dashboard/analytics/', query)),
+        ('batch', BatchAnalyticsView,
+         lambda: factory.post('/api/dashboard/analytics/batch/', batch, format='json')),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--years', type=float, nargs='+', default=[1, 3, 10])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    write_statement(STATEMENT_CSV, args.rows, years=max(1, int(round(max(args.years)))), seed=args.seed)
+    setup_django()
+
+    from rest_framework.renderers import JSONRenderer
+
+    from dashboard.api.renderers import ORJSONRenderer
+    from dashboard.store import get_transaction_store
+
+    snapshot = get_transaction_store().snapshot()
+    end = pd.Timestamp(snapshot.rollup.days[-1])
+
+    header = (f"{'endpoint':<9} {'range':>6} {'rows':>9} | {'view (s)':>9} | "
+              f"{'json (s)':>9} {'orjson (s)':>10} {'speedup':>8} | {'total':>7} | {'bytes':>10}")
+    print(f"{len(snapshot.frame):,} rows")
+    print(header)
+    print('-' * len(header))
+    for years in args.years:
+        start = end - pd.DateOffset(days=int(365 * years) - 1)
+        _, _, rows = snapshot.rollup.summarize(start, end)
+        for name, view_class, make_request in endpoints(start, end):
+            json_view, json_render, json_body = time_request(
+                view_class.as_view(renderer_classes=[JSONRenderer]), make_request, args.repeat)
+            orjson_view, orjson_render, orjson_body = time_request(
+                view_class.as_view(renderer_classes=[ORJSONRenderer]), make_request, args.repeat)
+            assert json.loads(json_body) == json.loads(orjson_body), f"{name}: renderers disagree"
+
+            view = min(json_view, orjson_view)
+            total = (view + json_render) / (view + orjson_render)
+            print(f"{name:<9} {years:>5g}y {rows:>9,} | {view:>9.4f} | {json_render:>9.4f} {orjson_render:>10.4f} "
+                  f"{json_render / orjson_render:>7.1f}x | {total:>6.1f}x | {len(orjson_body):>10,}")
+
+
+if __name__ == '__main__':
+    main()
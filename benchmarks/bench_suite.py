@@ -0,0 +1,275 @@
+"""
+End-to-end benchmarks over synthetic statements of growing size.
+
+For each size a statement is generated with benchmarks/synthetic.py and
+ingested into a temporary, freshly migrated SQLite database, then these
+layers are timed:
+
+  * dash      - ML/Dashboard load_data, helpers.generate_summary and every
+                data callback registered by callbacks.register_callbacks
+  * api-cold  - DashboardAnalyticsView with an empty transaction store and
+                analytics cache, i.e. file load plus analytics
+  * api-warm  - the same request again, served from the cached snapshot
+                (a different range each round so the response cache is missed)
+  * api-list  - TransactionListView pages from the database, the newest one
+                and one halfway through the history via its cursor
+
+The analytics API is benchmarked against both the statement CSV (what is
+served before anything is ingested) and the account partition that ingest
+writes from the database. Times are the best of --repeat runs; peak memory is
+measured in a separate tracemalloc run so tracing does not skew the timings.
+
+Usage:
+    python benchmarks/bench_suite.py [--sizes 10000 100000 1000000] [--repeat 3] [--json results.json]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, '..', 'backend'))
+sys.path.insert(0, os.path.join(HERE, '..', 'ML', 'Dashboard'))
+
+from synthetic import write_statement  # noqa: E402
+
+WORKDIR = tempfile.mkdtemp(prefix='spendwise-bench-')
+STATEMENT_CSV = os.path.join(WORKDIR, 'statement.csv')
+STATEMENT_ARROW = os.path.join(WORKDIR, 'statement.arrow')
+
+
+def setup_django():
+    # Point the default account at the synthetic statement, and the database
+    # at a scratch SQLite file, before settings load
+    os.environ['TRANSACTIONS_FILE'] = STATEMENT_CSV
+    os.environ['TRANSACTIONS_COLUMNAR_FILE'] = STATEMENT_ARROW
+    os.environ['TRANSACTIONS_PARTITION_DIR'] = os.path.join(WORKDIR, 'partitions')
+    os.environ['DB_ENGINE'] = 'django.db.backends.sqlite3'
+    os.environ['DB_NAME'] = os.path.join(WORKDIR, 'db.sqlite3')
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'spendwise.settings')
+    os.environ.setdefault('ALLOWED_HOSTS', 'testserver')
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    import django
+    from django.core.management import call_command
+    django.setup()
+    call_command('migrate', verbosity=0)
+
+
+def load_database():
+    """Replace the scratch database's transactions with the synthetic statement."""
+    from django.core.management import call_command
+
+    from dashboard.ingest import ingest_transactions
+    from dashboard.store import read_transactions
+
+    # flush empties the tables without per-row delete signals
+    call_command('flush', interactive=False, verbosity=0)
+    return len(ingest_transactions(read_transactions(STATEMENT_CSV), batch_size=10000))
+
+
+def measure(fn, repeat):
+    """Best wall time of ``repeat`` calls, then peak traced memory of one more."""
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+class CallbackRecorder:
+    """Stands in for the Dash app so registered callbacks can be called directly."""
+
+    def __init__(self):
+        self.callbacks = {}
+
+    def callback(self, *args, **kwargs):
+        def register(fn):
+            self.callbacks[fn.__name__] = fn
+            return fn
+        return register
+
+    def clientside_callback(self, *args, **kwargs):
+        pass
+
+
+def dash_cases(df):
+    """(name, thunk) pairs exercising the dashboard over its busiest inputs."""
+    from callbacks import register_callbacks
+    from data_handle import DataHandle
+    from figure_cache import FigureCache
+    from helpers import generate_summary
+
+    app = CallbackRecorder()
+    data = DataHandle.static(df)
+    # Time figure construction itself, not figure cache hits on repeated runs
+    register_callbacks(app, data, figures=FigureCache(None, size_limit=0))
+    callbacks = app.callbacks
+
+    start = df['Transaction_Date'].min().strftime('%Y-%m-%d')
+    end = df['Transaction_Date'].max().strftime('%Y-%m-%d')
+    # The latest full year, and its busiest month and week
+    year = int(df['Year'].max())
+    month = int(df.loc[df['Year'] == year, 'Month_Num'].mode()[0])
+    week = int(df.loc[(df['Year'] == year) & (df['Month_Num'] == month), 'Week_Num'].mode()[0])
+
+    cases = [
+        ('generate_summary[Month]', lambda: generate_summary(df, 'Month')),
+        ('generate_summary[Day]', lambda: generate_summary(df, 'Day')),
+    ]
+    by_inputs = {
+        'update_summary_boxes': (start, end),
+        'update_general_analysis': (start, end),
+        'update_month_dropdown': (year,),
+        'update_week_dropdown': (year, month),
+        'update_yearly_summary': (year,),
+        'update_monthly_summary': (year, month),
+        'update_weekly_summary': (year, month, week),
+        'update_daily_summary': (year, month, week),
+    }
+
+    def cold(fn, args):
+        # Nor slice cache hits: every run filters and summarizes from scratch
+        data.slices.clear()
+        return fn(*args)
+
+    for name, args in by_inputs.items():
+        if name in callbacks:
+            cases.append((name, lambda fn=callbacks[name], args=args: cold(fn, args)))
+    return cases
+
+
+def api_cases(df, source):
+    """Cold and warm DashboardAnalyticsView requests over the whole statement."""
+    from rest_framework.test import APIRequestFactory
+
+    from dashboard.analytics import analytics_cache
+    from dashboard.api.views import DashboardAnalyticsView
+    from dashboard.store import get_transaction_store
+
+    factory = APIRequestFactory()
+    view = DashboardAnalyticsView.as_view()
+    first = df['Transaction_Date'].min()
+    last = df['Transaction_Date'].max()
+    rounds = iter(range(1_000_000))
+
+    def request(offset_days=0):
+        start = (first + pd.Timedelta(days=offset_days)).strftime('%Y-%m-%d')
+        response = view(factory.get('/api/dashboard/analytics/', {
+            'start_date': start, 'end_date': last.strftime('%Y-%m-%d'),
+        }))
+        response.render()
+        if response.status_code != 200:
+            raise RuntimeError(f"analytics returned {response.status_code}: {response.content[:200]!r}")
+        return response
+
+    def cold():
+        get_transaction_store().clear()
+        analytics_cache.clear()
+        request()
+
+    def warm():
+        # A new range each call, so only the response cache is missed
+        request(next(rounds) % 28)
+
+    return [(f'api-cold[{source}]', cold), (f'api-warm[{source}]', warm)]
+
+
+def list_cases():
+    """The newest page of transactions, and a page halfway through the history."""
+    from rest_framework.test import APIRequestFactory
+
+    from dashboard.api.pagination import encode_cursor
+    from dashboard.api.views import TransactionListView
+    from dashboard.models import Transaction
+
+    factory = APIRequestFactory()
+    view = TransactionListView.as_view()
+    transactions = Transaction.objects.order_by('-transaction_date', '-id')
+    middle = transactions[transactions.count() // 2]
+    cursor = encode_cursor(middle.transaction_date, middle.id)
+
+    def page(**params):
+        response = view(factory.get('/api/transactions/', params))
+        response.render()
+        if response.status_code != 200:
+            raise RuntimeError(f"transactions returned {response.status_code}: {response.content[:200]!r}")
+        return response
+
+    return [('api-list[first]', lambda: page()), ('api-list[middle]', lambda: page(cursor=cursor))]
+
+
+def run_size(rows, repeat, seed):
+    from data_processing import load_data
+    from dashboard.ingest import refresh_partition
+
+    start = time.perf_counter()
+    write_statement(STATEMENT_CSV, rows, seed=seed)
+    generated = time.perf_counter() - start
+    start = time.perf_counter()
+    ingested = load_database()
+    print(f"\n{rows:,} rows (generated in {generated:.1f}s, {ingested:,} ingested in {time.perf_counter() - start:.1f}s)")
+
+    results = []
+
+    def record(name, fn):
+        seconds, peak = measure(fn, repeat)
+        results.append({'rows': rows, 'case': name, 'seconds': seconds, 'peak_bytes': peak})
+        print(f"  {name:<32} {seconds * 1000:>10.1f} ms {peak / 2 ** 20:>10.1f} MiB")
+
+    record('load_data[csv]', lambda: load_data(STATEMENT_CSV))
+    df = load_data(STATEMENT_CSV)
+    for name, fn in dash_cases(df):
+        record(name, fn)
+
+    for source in ('csv', 'arrow'):
+        if source == 'arrow':
+            # The partition ingest writes from the database
+            refresh_partition()
+        elif os.path.exists(STATEMENT_ARROW):
+            os.remove(STATEMENT_ARROW)
+        for name, fn in api_cases(df, source):
+            record(name, fn)
+    os.remove(STATEMENT_ARROW)
+    for name, fn in list_cases():
+        record(name, fn)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    setup_django()
+    print(f"{'case':<34} {'best time':>13} {'peak memory':>14}")
+    results = []
+    for rows in args.sizes:
+        results += run_size(rows, args.repeat, args.seed)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nWrote {len(results)} results to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,305 @@
+"""
+Synthetic bank statements in the Merge_Proccessed.csv and
+Categorized_Transactions.csv schemas, for capacity planning and benchmarks.
+
+Rows follow the shapes seen in the processed SBI statements: UPI debits to
+merchants and people (``TO TRANSFER-UPI/DR/...``), UPI and IMPS credits, ATM
+withdrawals, net-banking bill payments, card purchases and a monthly NEFT
+salary. Merchant popularity is Zipf-distributed and amounts are log-normal
+per merchant. Statements are generated one calendar month at a time; each
+month opens with a salary credit large enough to keep the running balance
+above a floor, so Balance always equals the previous balance plus Credit
+minus Debit.
+
+Usage:
+    python benchmarks/synthetic.py out.csv --rows 1000000 [--schema categorized] [--years 3] [--seed 0] [--end 2024-12]
+"""
+import argparse
+import string
+import sys
+
+import numpy as np
+import pandas as pd
+
+MERGE_COLUMNS = [
+    'Transaction_Date', 'Description', 'Reference No./Cheque No.', 'Debit', 'Credit', 'Balance',
+    'Transaction_Type', 'Transaction_Mode', 'DR/CR_Indicator', 'Transaction_ID', 'Recipient_Name',
+    'Bank', 'UPI_ID', 'Note',
+]
+CATEGORIZED_COLUMNS = MERGE_COLUMNS + ['merged_text', 'Company', 'Transaction_Category', 'Sub_Category']
+SCHEMAS = {'merge': MERGE_COLUMNS, 'categorized': CATEGORIZED_COLUMNS}
+
+# Last month of generated statements unless another is given
+DEFAULT_END = '2024-12'
+
+# Recipient (statement-truncated to 8 chars), bank, UPI handle (10 chars), note, company,
+# category, sub-category, log-normal mu and sigma of the amount
+MERCHANTS = [
+    ('BHARTI A', 'AIRP', 'airtelprep', 'Payme', 'Airtel', 'Essentials (Daily Necessities)', 'Utilities & Bills', 6.3, 0.5),
+    ('NETFLIX ', 'HDFC', 'netflixupi', 'Month', 'Netflix', 'Lifestyle & Shopping', 'Entertainment & Subscriptions', 5.3, 0.2),
+    ('IndianR', 'SBIN', 'railsbiupi', 'UPI', 'SBI', 'Financial & Investments', 'Loan & EMI Payments', 6.5, 0.9),
+    ('MumbaiM', 'YESB', 'q06492713@', 'UPI', 'MumbaiMetro', 'Essentials (Daily Necessities)', 'Transportation', 3.7, 0.4),
+    ('HARDCAST', 'ICIC', 'mcdonaldsi', 'UPI', "McDonald's", 'Lifestyle & Shopping', 'Dining & Restaurants', 5.4, 0.5),
+    ('IRCTCUTS', 'PYTM', 'paytm-8727', 'UPI', 'IRCTC', 'Essentials (Daily Necessities)', 'Transportation', 4.2, 0.8),
+    ('RESTAURA', 'ICIC', 'burgerking', 'UPI', 'BurgerKing', 'Lifestyle & Shopping', 'Dining & Restaurants', 5.5, 0.4),
+    ('JioCinema', 'ICIC', 'viacom18on', 'UPI', 'Jio', 'Essentials (Daily Necessities)', 'Utilities & Bills', 4.4, 0.3),
+    ('ZOMATO L', 'HDFC', 'zomatoorde', 'UPI', 'Zomato', 'Lifestyle & Shopping', 'Dining & Restaurants', 5.6, 0.5),
+    ('PIZZAHUT', 'YESB', 'pizzahut.2', 'UPI', 'PizzaHut', 'Lifestyle & Shopping', 'Dining & Restaurants', 5.9, 0.4),
+    ('SWIGGY', 'AXIS', 'swiggyupi@', 'UPI', 'Swiggy', 'Lifestyle & Shopping', 'Dining & Restaurants', 5.6, 0.5),
+    ('BLINKIT', 'YESB', 'blinkit.pa', 'UPI', 'Blinkit', 'Essentials (Daily Necessities)', 'Groceries', 5.8, 0.6),
+    ('UBER IND', 'UTIB', 'uber.rides', 'UPI', 'Uber', 'Essentials (Daily Necessities)', 'Transportation', 5.2, 0.5),
+    ('AMAZON P', 'YESB', 'amazonupi@', 'UPI', 'Amazon', 'Lifestyle & Shopping', 'Online Shopping', 6.6, 0.9),
+]
+SHOP_WORDS = ['SRI', 'LAXMI', 'GANESH', 'SAI', 'OM', 'NEW', 'JAI', 'BALAJI', 'SHREE', 'ROYAL']
+SHOP_KINDS = [
+    ('STORES', 'Essentials (Daily Necessities)', 'Groceries', 5.0, 0.7),
+    ('MEDICAL', 'Health & Wellness', 'Pharmacy', 5.3, 0.6),
+    ('DAIRY', 'Essentials (Daily Necessities)', 'Groceries', 3.9, 0.5),
+    ('BAKERY', 'Lifestyle & Shopping', 'Dining & Restaurants', 4.0, 0.6),
+    ('TEA', 'Lifestyle & Shopping', 'Dining & Restaurants', 3.0, 0.4),
+    ('FASHION', 'Lifestyle & Shopping', 'Clothing', 7.0, 0.7),
+    ('PETROL', 'Essentials (Daily Necessities)', 'Fuel', 6.2, 0.4),
+]
+QR_BANKS = ['YESB', 'PYTM', 'ICIC', 'UTIB']
+PEER_BANKS = ['SBIN', 'HDFC', 'CBIN', 'BKID', 'KKBK', 'UTIB', 'ICIC', 'YESB']
+FIRST_NAMES = [
+    'VINAYAK', 'ANUSHKA', 'SHUBHAM', 'PRACHI', 'SUNIL', 'PRATHAM', 'ROHAN', 'SNEHA', 'ADITYA', 'POOJA',
+    'KUNAL', 'NEHA', 'AMIT', 'RIYA', 'SAGAR', 'TANVI', 'NIKHIL', 'ISHA', 'OMKAR', 'SAYALI',
+]
+SURNAME_INITIALS = 'ABCDGJKMPRSTVY'
+PEER_NOTES = ['UPI', 'UPI', 'UPI', 'food', 'rent', 'trip', 'Pay t', 'gift']
+FAMILY_NOTES = ['Son-', 'Family-', 'Home-']
+BILLERS = ['GirirajEnterprises', 'IRCTCUTS', 'IITMIITM_GATE Payments', 'MSEDCL BILLDESK', 'LIC PREMIUM', 'MAHANAGAR GAS']
+ATM_LOCATIONS = ['VASAI STATION WESTMUMBAI', 'VASAI EASTEVERSHINEPALGHAR', 'ANDHERI EASTMUMBAI', 'DADAR WESTMUMBAI']
+POS_MERCHANTS = ['SRILAKSHMI NARSIMHAPTHANE', 'DMART AVENUE SUPERMVASAI', 'RELIANCE SMART POINTMUMBAI']
+EMPLOYERS = ['SAMEERBALIRAM S', 'TECHNOVA SOLUTIONS', 'ACME ANALYTICS PVT']
+
+# Row kinds and their share of non-salary rows
+UPI_DR_MERCHANT, UPI_DR_PEER, UPI_CR_PEER, IMPS_CR_FAMILY, ATM, INB_DR_BILL, POS = range(7)
+KIND_WEIGHTS = np.array([0.55, 0.17, 0.13, 0.08, 0.02, 0.03, 0.02])
+SALARY = 7
+
+# Balance the monthly salary keeps the account above
+BALANCE_FLOOR = 500.0
+
+
+def _merchant_catalogue(rng, size):
+    """The named merchants plus generated shops and QR vendors, most popular first."""
+    rows = list(MERCHANTS)
+    for i in range(max(0, size - len(rows))):
+        word = SHOP_WORDS[rng.integers(len(SHOP_WORDS))]
+        kind, category, sub_category, mu, sigma = SHOP_KINDS[rng.integers(len(SHOP_KINDS))]
+        name = f"{word}{kind}"[:8]
+        handle = f"paytmqr{i:03x}"[:10]
+        rows.append((name, QR_BANKS[i % len(QR_BANKS)], handle, 'UPI', f"{word.title()} {kind.title()}",
+                     category, sub_category, mu, sigma))
+    return rows
+
+
+def _peers(rng, size):
+    peers = []
+    for i in range(size):
+        first = FIRST_NAMES[i % len(FIRST_NAMES)]
+        initial = SURNAME_INITIALS[(i // len(FIRST_NAMES)) % len(SURNAME_INITIALS)]
+        name = f"{first} {initial}"[:8]
+        handle = (first.lower() + ''.join(rng.choice(list(string.ascii_lowercase + string.digits), 4)))[:10]
+        peers.append((name, PEER_BANKS[rng.integers(len(PEER_BANKS))], handle))
+    return peers
+
+
+def _zipf_choice(rng, size, count, exponent=1.1):
+    weights = 1.0 / np.arange(1, size + 1) ** exponent
+    return rng.choice(size, size=count, p=weights / weights.sum())
+
+
+def _digits(rng, count, width):
+    return [f"{value:0{width}d}" for value in rng.integers(0, 10 ** width, count, dtype=np.int64)]
+
+
+class StatementGenerator:
+    """
+    Generate one account's statement month by month.
+
+    ``rows`` transactions are spread over ``years`` years ending with the
+    month of ``end``, and the number of merchants and peers grows with the
+    row count so high-volume statements keep a realistic long tail. The end
+    is fixed rather than taken from today, so a seed always gives the same
+    statement.
+    """
+
+    def __init__(self, rows, years=3, seed=0, schema='merge', opening_balance=2000.0, end=DEFAULT_END):
+        if schema not in SCHEMAS:
+            raise ValueError(f"Unknown schema {schema!r}, expected one of: {', '.join(SCHEMAS)}")
+        self.rows = rows
+        self.schema = schema
+        self.rng = np.random.default_rng(seed)
+        self.balance = opening_balance
+
+        last_month = pd.Timestamp(end).to_period('M').to_timestamp()
+        self.months = pd.date_range(end=last_month, periods=max(1, int(years * 12)), freq='MS')
+        # One salary row per month; the rest spread evenly in expectation
+        other = max(0, rows - len(self.months))
+        self.month_rows = self.rng.multinomial(other, np.full(len(self.months), 1 / len(self.months)))
+
+        scale = int(np.clip(np.sqrt(rows) * 2, 50, 20000))
+        self.merchants = _merchant_catalogue(self.rng, scale)
+        self.peers = _peers(self.rng, max(20, scale // 4))
+        self.family_phone = f"98{self.rng.integers(10 ** 7, 10 ** 8)}"
+        self.card_suffix = f"{self.rng.integers(1000, 10000)}"
+
+    def __iter__(self):
+        for month, count in zip(self.months, self.month_rows):
+            yield self._month(month, int(count))
+
+    def frame(self):
+        return pd.concat(list(self), ignore_index=True)
+
+    def _month(self, month, count):
+        rng = self.rng
+        days_in_month = month.days_in_month
+        dates = np.sort(month.to_datetime64() + rng.integers(0, days_in_month, count).astype('timedelta64[D]'))
+        kinds = rng.choice(len(KIND_WEIGHTS), size=count, p=KIND_WEIGHTS)
+        # Salary lands on the first of the month, ahead of that day's other rows
+        dates = np.concatenate(([month.to_datetime64()], dates)).astype('datetime64[ns]')
+        kinds = np.concatenate(([SALARY], kinds))
+        n = count + 1
+
+        merchant_idx = _zipf_choice(rng, len(self.merchants), n)
+        peer_idx = _zipf_choice(rng, len(self.peers), n, exponent=0.9)
+        mu = np.array([self.merchants[i][7] for i in merchant_idx])
+        sigma = np.array([self.merchants[i][8] for i in merchant_idx])
+
+        amount = np.round(rng.lognormal(mu, sigma), 0)
+        amount = np.where(kinds == UPI_DR_PEER, np.round(rng.lognormal(5.3, 1.0, n), 0), amount)
+        amount = np.where(kinds == UPI_CR_PEER, np.round(rng.lognormal(5.8, 1.0, n), 2), amount)
+        amount = np.where(kinds == IMPS_CR_FAMILY, rng.choice([500, 1000, 1500, 2000, 2500, 5000], n), amount)
+        amount = np.where(kinds == ATM, rng.choice([200, 300, 400, 500, 1000, 2000], n), amount)
+        amount = np.where(kinds == INB_DR_BILL, np.round(rng.lognormal(7.2, 0.9, n), 2), amount)
+        amount = np.where(kinds == POS, np.round(rng.lognormal(5.4, 0.6, n), 2), amount)
+        amount = np.maximum(amount, 1.0)
+
+        is_credit = np.isin(kinds, (UPI_CR_PEER, IMPS_CR_FAMILY, SALARY))
+        debit = np.where(is_credit, 0.0, amount)
+        credit = np.where(is_credit, amount, 0.0)
+        credit[0] = 0.0
+
+        # Size the salary so spending plus a margin is covered and the running
+        # balance never falls below the floor
+        running = self.balance + np.cumsum(credit - debit)
+        shortfall = max(0.0, BALANCE_FLOOR - running.min())
+        salary = max(debit.sum() * rng.uniform(1.0, 1.15) - credit.sum(), shortfall)
+        credit[0] = float(np.ceil(salary / 100) * 100)
+        balance = np.round(running + credit[0], 2)
+        self.balance = float(balance[-1])
+
+        frame = self._describe(dates, kinds, merchant_idx, peer_idx, n)
+        frame['Debit'] = np.round(debit, 2)
+        frame['Credit'] = np.round(credit, 2)
+        frame['Balance'] = balance
+        return frame[SCHEMAS[self.schema]]
+
+    def _describe(self, dates, kinds, merchant_idx, peer_idx, n):
+        rng = self.rng
+        txn_ids = _digits(rng, n, 12)
+        refs = _digits(rng, n, 13)
+        four = _digits(rng, n, 4)
+        five = _digits(rng, n, 5)
+        peer_notes = rng.choice(PEER_NOTES, n)
+        family_notes = rng.choice(FAMILY_NOTES, n)
+        billers = rng.choice(BILLERS, n)
+        atms = rng.choice(ATM_LOCATIONS, n)
+        pos = rng.choice(POS_MERCHANTS, n)
+        employers = rng.choice(EMPLOYERS, n)
+
+        columns = {name: [None] * n for name in (
+            'Description', 'Reference No./Cheque No.', 'Transaction_Type', 'Transaction_Mode', 'DR/CR_Indicator',
+            'Transaction_ID', 'Recipient_Name', 'Bank', 'UPI_ID', 'Note', 'merged_text', 'Company',
+            'Transaction_Category', 'Sub_Category',
+        )}
+
+        def put(i, **values):
+            for key, value in values.items():
+                columns[key][i] = value
+
+        for i, kind in enumerate(kinds.tolist()):
+            if kind == UPI_DR_MERCHANT:
+                name, bank, handle, note, company, category, sub_category, _, _ = self.merchants[merchant_idx[i]]
+                put(i, Description=f"TO TRANSFER-UPI/DR/{txn_ids[i]}/{name}/{bank}/{handle}/{note}-",
+                    **{'Reference No./Cheque No.': f"TRANSFER TO{refs[i]}"},
+                    Transaction_Type='TO', Transaction_Mode='UPI', Transaction_ID=txn_ids[i],
+                    Recipient_Name=name, Bank=bank, UPI_ID=handle, Note=note,
+                    merged_text=f"{name.lower()} {handle}", Company=company,
+                    Transaction_Category=category, Sub_Category=sub_category)
+                columns['DR/CR_Indicator'][i] = 'DR'
+            elif kind in (UPI_DR_PEER, UPI_CR_PEER):
+                name, bank, handle = self.peers[peer_idx[i]]
+                debit = kind == UPI_DR_PEER
+                put(i, Description=f"{'TO' if debit else 'BY'} TRANSFER-UPI/{'DR' if debit else 'CR'}/"
+                                   f"{txn_ids[i]}/{name}/{bank}/{handle}/{peer_notes[i]}-",
+                    **{'Reference No./Cheque No.': f"{'TRANSFER TO' if debit else 'TRANSFERFROM'}{refs[i]}",
+                       'DR/CR_Indicator': 'DR' if debit else 'CR'},
+                    Transaction_Type='TO' if debit else 'BY', Transaction_Mode='UPI', Transaction_ID=txn_ids[i],
+                    Recipient_Name=name, Bank=bank, UPI_ID=handle, Note=peer_notes[i],
+                    merged_text=f"{name.lower()} {handle}", Company=name.strip().title(),
+                    Transaction_Category='Transfers', Sub_Category='Friends & Family')
+            elif kind == IMPS_CR_FAMILY:
+                put(i, Description=f"BY TRANSFER-INBIMPS{txn_ids[i]}/{self.family_phone}/XX{four[i]}/{family_notes[i]}",
+                    **{'Reference No./Cheque No.': f"MAM0000{refs[i][:8]}MAM0000{refs[i][:8]}", 'DR/CR_Indicator': 'CR'},
+                    Transaction_Type='BY', Transaction_Mode='INB', Transaction_ID=f"XX{four[i]}",
+                    Recipient_Name=self.family_phone, UPI_ID=self.family_phone, Note=family_notes[i],
+                    merged_text=f"{self.family_phone} {self.family_phone}",
+                    Transaction_Category='Transfers', Sub_Category='Friends & Family')
+            elif kind == ATM:
+                put(i, Description=f"ATM WDL-ATM CASH {five[i]}+{atms[i]}-",
+                    **{'DR/CR_Indicator': 'DR'}, Transaction_Type='TO', Transaction_Mode='ATM',
+                    Transaction_Category='Cash', Sub_Category='ATM Withdrawal')
+            elif kind == INB_DR_BILL:
+                put(i, Description=f"TO TRANSFER-INB {billers[i]}-",
+                    **{'Reference No./Cheque No.': f"{refs[i]}IGA{five[i]}TRANSFER TO", 'DR/CR_Indicator': 'DR'},
+                    Transaction_Type='TO', Transaction_Mode='INB',
+                    Transaction_Category='Essentials (Daily Necessities)', Sub_Category='Utilities & Bills')
+            elif kind == POS:
+                put(i, Description=f"by debit card-OTHPOS{txn_ids[i]}{pos[i]}-",
+                    **{'DR/CR_Indicator': 'DR'}, Transaction_Type='TO', Transaction_Mode='POS',
+                    Transaction_Category='Lifestyle & Shopping', Sub_Category='In-store Purchases')
+            else:
+                put(i, Description=f"BY TRANSFER-NEFT*HDFC0000001*N{refs[i]}{four[i][:2]}*{employers[i]}-",
+                    **{'Reference No./Cheque No.': f"TRANSFERFROM{refs[i]}", 'DR/CR_Indicator': 'CR'},
+                    Transaction_Type='BY', Transaction_Mode='NEFT',
+                    Transaction_Category='Income', Sub_Category='Salary')
+
+        frame = pd.DataFrame(columns)
+        frame.insert(0, 'Transaction_Date', dates)
+        return frame
+
+
+def generate_statement(rows, years=3, seed=0, schema='merge', end=DEFAULT_END):
+    """Return a whole synthetic statement as one DataFrame."""
+    return StatementGenerator(rows, years=years, seed=seed, schema=schema, end=end).frame()
+
+
+def write_statement(path, rows, years=3, seed=0, schema='merge', end=DEFAULT_END):
+    """Stream a synthetic statement to CSV a month at a time; returns the row count."""
+    written = 0
+    for i, month in enumerate(StatementGenerator(rows, years=years, seed=seed, schema=schema, end=end)):
+        month.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False, date_format='%Y-%m-%d')
+        written += len(month)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('output', help='CSV file to write')
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--years', type=float, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--schema', choices=sorted(SCHEMAS), default='merge')
+    parser.add_argument('--end', default=DEFAULT_END, help='last month of the statement, YYYY-MM')
+    args = parser.parse_args(argv)
+    written = write_statement(args.output, args.rows, years=args.years, seed=args.seed, schema=args.schema,
+                              end=args.end)
+    print(f"Wrote {written} transactions to {args.output}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())